@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks, run under pytest with --benchmarks. See docs/development.rst
+"""
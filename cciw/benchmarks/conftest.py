@@ -0,0 +1,17 @@
+import pytest
+
+from cciw.test_utils.benchmarks import run_benchmark
+
+
+@pytest.fixture
+def benchmark(request):
+    """
+    Returns a function that runs a benchmark of the passed in callable,
+    named after the current test, and returns the callable's return value.
+    """
+
+    def benchmark(func, *, rounds: int = 10):
+        retval, result = run_benchmark(request.node.name, func, rounds=rounds)
+        return retval
+
+    return benchmark
@@ -0,0 +1,212 @@
+import itertools
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+import time_machine
+
+from cciw.bookings import factories
+from cciw.bookings.email import PlaceAllocationMailer
+from cciw.bookings.mailchimp import RateLimiter, sync_newsletter_subscriptions
+from cciw.bookings.models import Booking, BookingAccount, BookingState
+from cciw.bookings.models.constants import Sex
+from cciw.bookings.models.newsletter import record_newsletter_change
+from cciw.bookings.models.queue import QueueCutoff, add_queue_cutoffs, rank_queue_bookings
+from cciw.bookings.models.reports import outstanding_bookings_with_fees
+from cciw.bookings.models.yearconfig import YearConfig
+from cciw.bookings.queue_simulation import CapacityScenario, QueueSimulation
+from cciw.cciwmain.models import Camp
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.utils.functional import partition
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+YEAR = 2026
+
+
+def create_year_config() -> YearConfig:
+    return factories.create_year_config(
+        year=YEAR,
+        bookings_open_for_entry_on=date(YEAR, 2, 1),
+        bookings_open_for_booking_on=date(YEAR, 3, 1),
+        bookings_initial_notifications_on=date(YEAR, 4, 1),
+        bookings_close_for_initial_period_on=date(YEAR, 4, 15),
+        payments_due_on=date(YEAR, 4, 30),
+    )
+
+
+def create_families(*, camp: Camp, count: int, previous_camp: Camp | None = None) -> list[Booking]:
+    """
+    Creates `count` bookings for `camp`, in families of 1 to 3 siblings, with
+    every other family having been on `previous_camp`.
+    """
+    bookings = []
+    family = 0
+    while len(bookings) < count:
+        account = factories.create_booking_account(name=f"Parent {family}")
+        for child in range(min(family % 3 + 1, count - len(bookings))):
+            sex = Sex.MALE if (len(bookings) % 2) else Sex.FEMALE
+            first_name = f"Child{child}"
+            last_name = f"Family{family}"
+            bookings.append(
+                factories.create_booking(
+                    account=account, camp=camp, first_name=first_name, last_name=last_name, sex=sex
+                )
+            )
+            if previous_camp is not None and family % 2 == 0:
+                factories.create_booking(
+                    account=account,
+                    camp=previous_camp,
+                    first_name=first_name,
+                    last_name=last_name,
+                    sex=sex,
+                    state=BookingState.BOOKED,
+                )
+        family += 1
+    return bookings
+
+
+@pytest.fixture(params=[20, 200])
+def queue_camp(request) -> tuple[Camp, YearConfig]:
+    year_config = create_year_config()
+    previous_camp = camps_factories.create_camp(camp_name="Blue", year=YEAR - 1)
+    camp = camps_factories.create_camp(
+        camp_name="Blue", year=YEAR, max_campers=request.param // 2, max_male_campers=request.param // 4
+    )
+    with time_machine.travel(year_config.bookings_open_for_entry_on + timedelta(days=1)):
+        bookings = create_families(camp=camp, count=request.param, previous_camp=previous_camp)
+    with time_machine.travel(year_config.bookings_open_for_booking_on + timedelta(days=1)):
+        for booking in bookings:
+            booking.add_to_queue(by_user=booking.account)
+    return camp, year_config
+
+
+def test_rank_queue_bookings(benchmark, queue_camp):
+    camp, year_config = queue_camp
+    ranked = benchmark(lambda: rank_queue_bookings(camp=camp, year_config=year_config))
+    assert len(ranked) == camp.bookings.count()
+
+
+def test_add_queue_cutoffs(benchmark, queue_camp):
+    camp, year_config = queue_camp
+    ranked = rank_queue_bookings(camp=camp, year_config=year_config)
+    places_left = camp.get_places_left()
+    benchmark(lambda: add_queue_cutoffs(ranked_queue_bookings=ranked, places_left=places_left))
+
+
+def capacity_scenarios(camp: Camp) -> list[CapacityScenario]:
+    # 50 options around the current settings
+    return [
+        CapacityScenario(max_campers=camp.max_campers + extra, max_male_campers=camp.max_male_campers + extra_male)
+        for extra in range(0, 10)
+        for extra_male in range(-2, 3)
+    ]
+
+
+def test_add_queue_cutoffs_per_scenario(benchmark, queue_camp):
+    # Baseline for test_queue_simulation
+    camp, year_config = queue_camp
+    ranked = rank_queue_bookings(camp=camp, year_config=year_config)
+    simulation = QueueSimulation(camp=camp, ranked_queue_bookings=ranked, places_booked=camp.get_places_booked())
+    all_places_left = [simulation.get_places_left(scenario) for scenario in capacity_scenarios(camp)]
+    benchmark(
+        lambda: [
+            add_queue_cutoffs(ranked_queue_bookings=ranked, places_left=places_left) for places_left in all_places_left
+        ]
+    )
+
+
+def test_queue_simulation(benchmark, queue_camp):
+    camp, year_config = queue_camp
+    ranked = rank_queue_bookings(camp=camp, year_config=year_config)
+    places_booked = camp.get_places_booked()
+    scenarios = capacity_scenarios(camp)
+    outcomes = benchmark(
+        lambda: QueueSimulation(camp=camp, ranked_queue_bookings=ranked, places_booked=places_booked).run(scenarios)
+    )
+    assert len(outcomes) == len(scenarios)
+
+
+def test_place_allocation_mailer(benchmark, queue_camp):
+    camp, year_config = queue_camp
+    ranked = sorted(rank_queue_bookings(camp=camp, year_config=year_config), key=lambda b: b.account_id)
+    add_queue_cutoffs(ranked_queue_bookings=ranked, places_left=camp.get_places_left())
+    to_book, to_decline = partition(ranked, key=lambda b: b.rank_info.cutoff_state == QueueCutoff.ACCEPTED)
+    to_book_by_account = [(a, list(g)) for a, g in itertools.groupby(to_book, key=lambda b: b.account)]
+    to_decline_by_account = [(a, list(g)) for a, g in itertools.groupby(to_decline, key=lambda b: b.account)]
+
+    def send_all():
+        mailer = PlaceAllocationMailer()
+        for account, bookings in to_book_by_account:
+            mailer.add_places_allocated(account, bookings)
+        for account, bookings in to_decline_by_account:
+            mailer.add_places_declined(account, bookings)
+        return mailer.send()
+
+    assert benchmark(send_all) >= len(to_book_by_account) + len(to_decline_by_account)
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_get_booking_problems(benchmark, count):
+    camp = camps_factories.create_camp(year=YEAR)
+    bookings = create_families(camp=camp, count=count)
+
+    def get_all_problems():
+        return [booking.get_booking_problems(booking_sec=True) for booking in Booking.objects.filter(camp=camp)]
+
+    assert len(benchmark(get_all_problems)) == len(bookings)
+
+
+@pytest.fixture(params=[10, 100])
+def accounts_with_fees(request) -> list[BookingAccount]:
+    factories.create_prices(year=YEAR)
+    create_year_config()
+    camp = camps_factories.create_camp(year=YEAR)
+    bookings = create_families(camp=camp, count=request.param)
+    for booking in bookings:
+        booking.state = BookingState.BOOKED
+        booking.save()
+    return list({booking.account for booking in bookings})
+
+
+def test_get_balance(benchmark, accounts_with_fees):
+    def get_balances():
+        return [account.get_balance(today=date.today()) for account in BookingAccount.objects.all()]
+
+    balances = benchmark(get_balances)
+    assert len(balances) == len(accounts_with_fees)
+
+
+def test_get_financial_summary(benchmark, accounts_with_fees):
+    def get_summaries():
+        return [account.get_financial_summary() for account in BookingAccount.objects.all()]
+
+    summaries = benchmark(get_summaries)
+    assert len(summaries) == len(accounts_with_fees)
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_sync_newsletter_subscriptions(benchmark, mailchimp_stub, count):
+    accounts = [factories.create_booking_account() for i in range(count)]
+    for account in accounts:
+        account.subscribe_to_newsletter = True
+        account.save()
+
+    def sync():
+        for account in accounts:
+            record_newsletter_change(account)
+        return sync_newsletter_subscriptions()
+
+    # We're measuring our side, not the rate limit
+    with mock.patch("cciw.bookings.mailchimp._rate_limiter", RateLimiter(per_second=1_000_000)):
+        assert benchmark(sync) == count
+
+
+def test_payments_due(benchmark, accounts_with_fees):
+    due = benchmark(lambda: BookingAccount.objects.payments_due())
+    assert len(due) == len(accounts_with_fees)
+
+
+def test_outstanding_bookings_with_fees(benchmark, accounts_with_fees):
+    bookings = benchmark(lambda: outstanding_bookings_with_fees(YEAR))
+    assert len(bookings) > 0
@@ -0,0 +1,50 @@
+import email
+import itertools
+
+import pytest
+from django.core import mail
+
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.mail.lists import find_list, forward_email_to_list, handle_mail_from_s3
+from cciw.mail.test_mailing_lists import make_message
+from cciw.officers.tests import factories as officers_factories
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("members", [10, 100])
+def test_forward_email_to_list(benchmark, members):
+    leader = officers_factories.create_officer(email="leader@example.com")
+    camp = camps_factories.create_camp(year=2026, camp_name="Pink", leader=leader)
+    officers_factories.add_officers_to_camp(camp, [officers_factories.create_officer() for i in range(members)])
+    to_email = "camp-2026-pink-officers@mailtest.cciw.co.uk"
+    message_bytes = make_message(from_email="Leader <leader@example.com>", to_email=to_email)
+
+    def forward():
+        mail.outbox.clear()
+        message = email.message_from_bytes(message_bytes)
+        forward_email_to_list(message, find_list(to_email, leader.email))
+
+    benchmark(forward)
+    assert len(mail.outbox) == members
+
+
+@pytest.mark.parametrize("members", [10, 100])
+def test_handle_mail_from_s3(benchmark, local_s3, members):
+    # End to end, from the SNS notification task to forwarding.
+    leader = officers_factories.create_officer(email="leader@example.com")
+    camp = camps_factories.create_camp(year=2026, camp_name="Pink", leader=leader)
+    officers_factories.add_officers_to_camp(camp, [officers_factories.create_officer() for i in range(members)])
+    message_bytes = make_message(
+        from_email="Leader <leader@example.com>", to_email="camp-2026-pink-officers@mailtest.cciw.co.uk"
+    )
+    message_ids = (f"message-{i}" for i in itertools.count())
+
+    def handle():
+        mail.outbox.clear()
+        message_id = next(message_ids)
+        local_s3.objects[message_id] = message_bytes
+        handle_mail_from_s3(message_id)
+
+    benchmark(handle)
+    assert len(mail.outbox) == members
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+import pytest
+
+from cciw.cciwmain.models import Camp
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.officers.dbs import get_officers_with_dbs_info_for_camps
+from cciw.officers.email import send_application_emails
+from cciw.officers.models import DBSCheck, Qualification, QualificationType
+from cciw.officers.templatetags.rtf import rtfescape
+from cciw.officers.tests import factories as officers_factories
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("officers_per_camp", [10, 50])
+def test_get_officers_with_dbs_info_for_camps(benchmark, officers_per_camp):
+    year = 2026
+    camps = [camps_factories.create_camp(camp_name=name, year=year) for name in ["Blue", "Red", "Green"]]
+    for camp in camps:
+        officers = [officers_factories.create_officer() for i in range(officers_per_camp)]
+        officers_factories.add_officers_to_camp(camp, officers)
+        for i, officer in enumerate(officers):
+            # A mixture of officers with and without application forms and DBS checks
+            if i % 3 == 0:
+                continue
+            application = officers_factories.create_application(officer, year=year)
+            if i % 3 == 1:
+                officer.dbs_checks.create(
+                    completed_on=application.saved_on - timedelta(days=365),
+                    dbs_number=f"00{officer.id}",
+                    check_type=DBSCheck.CheckType.FORM,
+                    registered_with_dbs_update=True,
+                    applicant_accepted=True,
+                )
+
+    year_camps = list(Camp.objects.filter(year=year))
+    results = benchmark(lambda: get_officers_with_dbs_info_for_camps(year_camps, set(year_camps)))
+    assert len(results) == officers_per_camp * len(camps)
+
+
+@pytest.mark.parametrize("camp_count", [1, 3])
+def test_send_application_emails(benchmark, camp_count):
+    # The work done when an officer submits their application form.
+    officer = officers_factories.create_officer()
+    for i in range(camp_count):
+        camp = camps_factories.create_camp(
+            start_date=date.today() + timedelta(days=30 + i), leader=officers_factories.create_officer()
+        )
+        officers_factories.add_officers_to_camp(camp, [officer])
+    qualification_types = [QualificationType.objects.create(name=f"Qualification {i}") for i in range(5)]
+    application = officers_factories.create_application(
+        officer,
+        full_name="Zoë Brontë",
+        qualifications=[Qualification(type=qt, issued_on=date(2020, 1, 1)) for qt in qualification_types],
+    )
+    application.christian_experience = "Lots of experience {with braces} and “quotes” – and accents: café. " * 50
+    application.save()
+
+    notices = []
+    benchmark(lambda: send_application_emails(application, notice_callback=notices.append))
+    assert any("The leaders" in notice for notice in notices)
+
+
+def test_rtfescape(benchmark):
+    text = "Some plain text with {braces}, back\\slashes, “smart quotes” and café accents.\n" * 200
+    result = benchmark(lambda: rtfescape(text), rounds=50)
+    assert "\\'e9" in result
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+import time_machine
+from django.core import signing
+from django.urls import reverse
+
+from cciw.bookings import factories as bookings_factories
+from cciw.bookings.middleware import BOOKING_COOKIE_SALT
+from cciw.bookings.models import BookingState
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.officers.tests import factories as officers_factories
+
+from .test_bookings import YEAR, create_families, create_year_config
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+HTMX_HEADERS = {"HX-Request": "true"}
+
+
+@pytest.mark.parametrize("count", [20, 200])
+def test_booking_queue_htmx(benchmark, client, count):
+    year_config = create_year_config()
+    camp = camps_factories.create_camp(camp_name="Blue", year=YEAR, max_campers=count // 2)
+    with time_machine.travel(year_config.bookings_open_for_entry_on + timedelta(days=1)):
+        bookings = create_families(camp=camp, count=count)
+    with time_machine.travel(year_config.bookings_open_for_booking_on + timedelta(days=1)):
+        for booking in bookings:
+            booking.add_to_queue(by_user=booking.account)
+    client.force_login(officers_factories.create_booking_secretary())
+    url = reverse("cciw-officers-booking_queue", kwargs={"camp_id": camp.url_id})
+
+    response = benchmark(lambda: client.get(url, {"use_partial": "main-content"}, headers=HTMX_HEADERS))
+    assert response.status_code == 200
+
+
+@pytest.fixture(params=[10, 50])
+def dbs_camps(request):
+    camps = [camps_factories.create_camp(camp_name=name, year=YEAR) for name in ["Blue", "Red"]]
+    for camp in camps:
+        officers = [officers_factories.create_officer() for i in range(request.param)]
+        officers_factories.add_officers_to_camp(camp, officers)
+        for officer in officers:
+            officers_factories.create_application(officer, year=YEAR)
+    return camps
+
+
+def test_manage_dbss_htmx_content(benchmark, client, dbs_camps):
+    client.force_login(officers_factories.create_dbs_officer())
+    url = reverse("cciw-officers-manage_dbss", kwargs={"year": YEAR})
+    camp_slugs = [camp.slug_name for camp in dbs_camps]
+
+    response = benchmark(lambda: client.get(url, {"use_partial": "content", "camp": camp_slugs}, headers=HTMX_HEADERS))
+    assert response.status_code == 200
+
+
+def test_manage_dbss_htmx_officer_row(benchmark, client, dbs_camps):
+    # Refreshing a single officer, which happens after each DBS action
+    client.force_login(officers_factories.create_dbs_officer())
+    url = reverse("cciw-officers-manage_dbss", kwargs={"year": YEAR})
+    officer = dbs_camps[0].invitations.all()[0].officer
+
+    response = benchmark(
+        lambda: client.get(url, {"use_partial": "table-body", "officer_id": officer.id}, headers=HTMX_HEADERS)
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("officers", [10, 50])
+def test_officer_list_htmx_multiple_partials(benchmark, client, officers):
+    camp = camps_factories.create_camp(leader=(leader := officers_factories.create_officer()))
+    officers_factories.add_officers_to_camp(camp, [officers_factories.create_officer() for i in range(officers)])
+    client.force_login(leader)
+    url = reverse("cciw-officers-officer_list", kwargs={"camp_id": camp.url_id})
+
+    response = benchmark(
+        lambda: client.get(url, {"use_partial": ["currentofficers", "chooseofficers__form"]}, headers=HTMX_HEADERS)
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("field", ["name", "address_post_code", "phone_number"])
+def test_account_details_htmx_validate_field(benchmark, client, field):
+    account = bookings_factories.create_booking_account()
+    client.cookies["bookingaccount"] = signing.get_cookie_signer(salt="bookingaccount" + BOOKING_COOKIE_SALT).sign(
+        account.id
+    )
+    url = reverse("cciw-bookings-account_details")
+
+    response = benchmark(lambda: client.get(url, {field: "X", "_validate_field": field}, headers=HTMX_HEADERS))
+    assert response.status_code == 200
+
+
+def test_account_overview(benchmark, client):
+    booking = bookings_factories.create_booking()
+    for i in range(4):
+        bookings_factories.create_booking(account=booking.account, camp=booking.camp)
+    client.cookies["bookingaccount"] = signing.get_cookie_signer(salt="bookingaccount" + BOOKING_COOKIE_SALT).sign(
+        booking.account.id
+    )
+    url = reverse("cciw-bookings-account_overview")
+
+    response = benchmark(lambda: client.get(url))
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("count", [20, 200])
+@pytest.mark.parametrize("params", [{}, {"bookings_year": str(YEAR)}, {"final_balance": "non-zero"}])
+def test_booking_account_admin_changelist(benchmark, client, count, params):
+    camp = camps_factories.create_camp(camp_name="Blue", year=YEAR)
+    for booking in create_families(camp=camp, count=count):
+        booking.state = BookingState.BOOKED
+        booking.save()
+    client.force_login(officers_factories.create_booking_secretary())
+    url = reverse("admin:bookings_bookingaccount_changelist")
+
+    response = benchmark(lambda: client.get(url, params))
+    assert response.status_code == 200
@@ -3,13 +3,14 @@
 from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from datetime import datetime
+from decimal import Decimal
 
 from django import forms
 from django.contrib import admin, messages
 from django.contrib.admin.models import LogEntry
 from django.contrib.admin.options import PermissionDenied, get_content_type_for_model, unquote
 from django.contrib.admin.utils import capfirst
-from django.db.models import GeneratedField, ManyToOneRel, Value
+from django.db.models import Exists, GeneratedField, ManyToOneRel, OuterRef, Value
 from django.db.models.functions import Concat
 from django.http import HttpRequest, HttpResponse
 from django.template.response import TemplateResponse
@@ -23,7 +24,7 @@
 from cciw.cciwmain.models import Camp
 from cciw.documents.admin import DocumentAdmin, DocumentRelatedModelAdminMixin
 from cciw.middleware.threadlocals import get_current_user
-from cciw.utils.admin import RerouteResponseAdminMixin
+from cciw.utils.admin import EstimatedCountPaginator, RerouteResponseAdminMixin
 
 from .models import (
     AccountTransferPayment,
@@ -191,7 +192,8 @@ def queryset(self, request: HttpRequest, queryset: BookingAccountQuerySet) -> Bo
         val = self.value()
         if val is None:
             return queryset
-        return queryset.filter(bookings__camp__year=val)
+        # Exists rather than a join, which would need `.distinct()`
+        return queryset.filter(Exists(Booking.objects.filter(account=OuterRef("pk"), camp__year=val)))
 
 
 class FinalBalanceFilter(admin.SimpleListFilter):
@@ -215,11 +217,13 @@ def queryset(self, request: HttpRequest, queryset: BookingAccountQuerySet) -> Bo
 
 @admin.register(BookingAccount)
 class BookingAccountAdmin(admin.ModelAdmin):
-    list_display = ["id", "name", "email", "address_post_code", "phone_number"]
+    list_display = ["id", "name", "email", "address_post_code", "phone_number", "balance"]
     list_filter = [LoggedInFilter, BookingsYearFilter, FinalBalanceFilter, "subscribe_to_newsletter"]
     ordering = ["email"]
     search_fields = ["email", "name", "address_post_code"]
-    readonly_fields = ["first_login_at", "last_login_at", "total_received", "admin_balance"]
+    readonly_fields = ["first_login_at", "last_login_at", "total_received", "balance"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     form = BookingAccountForm
 
     inlines = [
@@ -259,7 +263,7 @@ def get_fieldsets(self, request: HttpRequest, obj: BookingAccount | None = None)
                             "first_login_at",
                             "last_login_at",
                             "total_received",
-                            "admin_balance",
+                            "balance",
                         ]
                     },
                 )
@@ -267,8 +271,11 @@ def get_fieldsets(self, request: HttpRequest, obj: BookingAccount | None = None)
         return fieldsets
 
     def get_queryset(self, request: HttpRequest) -> BookingAccountQuerySet:
-        # Distinct needed because of BookingsYearFilter
-        return super().get_queryset(request).distinct()
+        return super().get_queryset(request).with_final_balance()
+
+    @admin.display(ordering="final_balance")
+    def balance(self, account: BookingAccount) -> Decimal:
+        return account.final_balance
 
     def response_change(self, request: HttpRequest, obj: BookingAccount) -> HttpResponse:
         # Little hack to allow popups for changing BookingAccount
@@ -529,6 +536,9 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ["first_name", "last_name", "sex", "account", camp_admin_display_for_booking, "state", "created_at"]
     search_fields = ["first_name", "last_name"]
     ordering = ["-created_at"]
+    list_select_related = ["account", "camp__camp_name"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = [
         YearFilter,
         "camp__camp_name",
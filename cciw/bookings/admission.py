@@ -0,0 +1,215 @@
+"""
+Admission control ("virtual waiting room") for the booking pages.
+
+On the morning bookings open we get sharp spikes of traffic, nearly all of it
+in the add place/basket pages. When `YearConfig.admission_capacity` is set, a
+visitor needs to have been admitted before they can use those pages.
+
+Each browser session is given a numbered ticket, in order of arrival, when it
+first hits the booking start page (or one of the controlled pages). Tickets
+are numbered using a counter in the cache. The first `admission_capacity`
+tickets are admitted straight away, and then `admission_drain_per_minute` more
+for each whole minute that has passed since the first ticket was issued - the
+assumption being that roughly that many people will finish booking each
+minute. Everyone else gets a lightweight holding page that refreshes itself.
+
+The ticket is stored in a signed cookie, and once a session has been admitted
+this is recorded in the cookie, so admitted visitors need no further cache
+lookups. If the cache is cleared (e.g. memcached restarts), the queue starts
+again and existing ticket holders are admitted, i.e. we fail open.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from cciw.cciwmain import common
+
+from .models.yearconfig import YearConfig
+
+ADMISSION_COOKIE_NAME = "bookingadmission"
+ADMISSION_COOKIE_SALT = "cciw.bookings.admission cookie"
+ADMISSION_COOKIE_MAX_AGE = timedelta(days=1)
+
+# How long the queue counters are kept in the cache. Booking-open spikes last
+# hours not days, and this means the queue resets itself for the next day.
+ADMISSION_QUEUE_TIMEOUT = timedelta(days=1)
+
+# How long to cache the YearConfig settings. Changes to the settings in the
+# admin take up to this long to be noticed.
+ADMISSION_SETTINGS_TIMEOUT = timedelta(minutes=1)
+
+ADMISSION_REFRESH_SECONDS = 30
+
+# Views that require admission when the waiting room is enabled. These must
+# be decorated with `booking_account_required`.
+ADMISSION_CONTROLLED_VIEWS = [
+    "cciw-bookings-add_place",
+    "cciw-bookings-edit_place",
+    "cciw-bookings-basket_list_bookings",
+]
+
+_ADMITTED = "admitted"
+
+
+@dataclass(frozen=True)
+class AdmissionSettings:
+    capacity: int
+    drain_per_minute: int
+
+    def admitted_count(self, *, opened_at: datetime, now: datetime) -> int:
+        """
+        The number of tickets admitted by `now`, for a queue that started at `opened_at`
+        """
+        minutes = max(0, int((now - opened_at).total_seconds() // 60))
+        return self.capacity + minutes * self.drain_per_minute
+
+
+def get_admission_settings(year: int) -> AdmissionSettings | None:
+    """
+    Returns the admission settings for the year, or None if the waiting room is not enabled.
+    """
+    key = _cache_key(year, "settings")
+    values = cache.get(key)
+    if values is None:
+        values = YearConfig.objects.filter(year=year).values_list(
+            "admission_capacity", "admission_drain_per_minute"
+        ).first() or (None, None)
+        cache.set(key, values, timeout=ADMISSION_SETTINGS_TIMEOUT.total_seconds())
+    capacity, drain_per_minute = values
+    if capacity is None:
+        return None
+    return AdmissionSettings(capacity=capacity, drain_per_minute=drain_per_minute)
+
+
+@dataclass
+class Admission:
+    admitted: bool
+    ticket: int | None = None
+    position: int | None = None  # Position in the waiting room, 1-based
+    wait_minutes: int | None = None
+    cookie_value: str | None = None  # Set if the cookie needs updating
+
+    def set_cookie(self, response: HttpResponse) -> None:
+        if self.cookie_value is not None:
+            response.set_signed_cookie(
+                ADMISSION_COOKIE_NAME,
+                self.cookie_value,
+                salt=ADMISSION_COOKIE_SALT,
+                max_age=ADMISSION_COOKIE_MAX_AGE.total_seconds(),
+                httponly=True,
+                samesite="Lax",
+            )
+
+
+def check_admission(request: HttpRequest) -> Admission:
+    """
+    Checks whether the request's session has been admitted, issuing a ticket
+    if it doesn't have one. The returned `Admission.set_cookie` must be called
+    on the response.
+    """
+    year = common.get_thisyear()
+    cookie_year, cookie_ticket = _parse_cookie(request)
+    if cookie_year == year and cookie_ticket == _ADMITTED:
+        return Admission(admitted=True)
+
+    admission_settings = get_admission_settings(year)
+    if admission_settings is None:
+        return Admission(admitted=True)
+
+    now = timezone.now()
+    opened_at: datetime | None = cache.get(_cache_key(year, "opened_at"))
+    if cookie_year == year and isinstance(cookie_ticket, int):
+        if opened_at is None:
+            # Queue has been reset, fail open.
+            return _admit(year)
+        ticket = cookie_ticket
+        new_cookie = None
+    else:
+        ticket = issue_ticket(year)
+        if opened_at is None:
+            opened_at = cache.get(_cache_key(year, "opened_at"), now)
+        new_cookie = f"{year}:{ticket}"
+
+    admitted_count = admission_settings.admitted_count(opened_at=opened_at, now=now)
+    if ticket <= admitted_count:
+        return _admit(year)
+
+    position = ticket - admitted_count
+    return Admission(
+        admitted=False,
+        ticket=ticket,
+        position=position,
+        wait_minutes=math.ceil(position / admission_settings.drain_per_minute)
+        if admission_settings.drain_per_minute
+        else None,
+        cookie_value=new_cookie,
+    )
+
+
+def issue_ticket(year: int) -> int:
+    """
+    Returns a new ticket number for the year's queue, starting the queue if needed.
+    """
+    timeout = ADMISSION_QUEUE_TIMEOUT.total_seconds()
+    counter_key = _cache_key(year, "issued")
+    # `add` does nothing if the key exists, so these are safe under concurrency.
+    if cache.add(counter_key, 0, timeout=timeout):
+        cache.add(_cache_key(year, "opened_at"), timezone.now(), timeout=timeout)
+    try:
+        return cache.incr(counter_key)
+    except ValueError:
+        # Expired between `add` and `incr`
+        cache.add(counter_key, 1, timeout=timeout)
+        return 1
+
+
+def waiting_room_response(request: HttpRequest, admission: Admission) -> HttpResponse:
+    # This deliberately doesn't use the standard page templates, which need
+    # database queries, so it is cheap to serve to large numbers of people.
+    response = HttpResponse(
+        render_to_string(
+            "cciw/bookings/waiting_room.html",
+            {
+                "position": admission.position,
+                "wait_minutes": admission.wait_minutes,
+                "refresh_seconds": ADMISSION_REFRESH_SECONDS,
+            },
+        ),
+        status=503,
+    )
+    response["Retry-After"] = str(ADMISSION_REFRESH_SECONDS)
+    response["Cache-Control"] = "no-store"
+    admission.set_cookie(response)
+    return response
+
+
+def _admit(year: int) -> Admission:
+    return Admission(admitted=True, cookie_value=f"{year}:{_ADMITTED}")
+
+
+def _parse_cookie(request: HttpRequest) -> tuple[int | None, int | str | None]:
+    value = request.get_signed_cookie(
+        ADMISSION_COOKIE_NAME,
+        salt=ADMISSION_COOKIE_SALT,
+        default=None,
+        max_age=ADMISSION_COOKIE_MAX_AGE.total_seconds(),
+    )
+    if value is None:
+        return None, None
+    try:
+        year, ticket = value.split(":")
+        return int(year), (ticket if ticket == _ADMITTED else int(ticket))
+    except ValueError:
+        return None, None
+
+
+def _cache_key(year: int, name: str) -> str:
+    return f"cciw.bookings.admission.{year}.{name}"
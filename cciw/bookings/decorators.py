@@ -7,6 +7,7 @@
 
 from cciw.utils.views import ViewFunc
 
+from .admission import ADMISSION_CONTROLLED_VIEWS, check_admission, waiting_room_response
 from .middleware import EXPECTED_BOOKING_LOGIN_VIEWS, get_booking_account_from_request
 
 if TYPE_CHECKING:
@@ -25,6 +26,9 @@ def booking_account_required[V: ViewFunc](view_func: V) -> V:
     Requires a signed cookie that verifies the booking account,
     redirecting if this is not satisfied,
     and attaches the BookingAccount object as request.booking_account_required
+
+    For views in ADMISSION_CONTROLLED_VIEWS, this also applies admission
+    control (see `cciw.bookings.admission`).
     """
 
     @wraps(view_func)
@@ -38,6 +42,15 @@ def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
             ) and resolver_match.url_name in EXPECTED_BOOKING_LOGIN_VIEWS:
                 url = url.add(query_params={"goto": resolver_match.url_name})
             return HttpResponseRedirect(str(url))
+        if (
+            resolver_match := getattr(request, "resolver_match", None)
+        ) and resolver_match.url_name in ADMISSION_CONTROLLED_VIEWS:
+            admission = check_admission(request)
+            if not admission.admitted:
+                return waiting_room_response(request, admission)
+            response = view_func(request, *args, **kwargs)
+            admission.set_cookie(response)
+            return response
         return view_func(request, *args, **kwargs)
 
     setattr(view, _BOOKING_DECORATOR_APPLIED, True)
@@ -8,14 +8,15 @@
 from django.conf import settings
 from django.core import mail
 from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
+from django.db import transaction
 from django.template import loader
 from django.urls import reverse
 from django.utils import timezone
 from paypal.standard.ipn.models import PayPalIPN
 
-from cciw.bookings.models.yearconfig import get_booking_open_data
+from cciw.bookings.models.yearconfig import BookingOpenData, get_booking_open_data
 from cciw.cciwmain import common
-from cciw.mail.models import RepeatAfter, send_mails_for_items_according_to_schedule
+from cciw.mail.models import RepeatAfter, ScheduledMailReport, send_mails_for_items_according_to_schedule
 from cciw.utils.functional import partition
 
 from .models.accounts import BookingAccount
@@ -137,83 +138,138 @@ def send_payment_received_email(account: BookingAccount, ipn_obj: PayPalIPN):
     mail.send_mail(subject, body, settings.WEBMASTER_FROM_EMAIL, [account.email])
 
 
-def send_places_allocated_emails(account: BookingAccount, bookings: Sequence[Booking]) -> None:
-    assert bookings
-    assert all(booking.account == account for booking in bookings)
-    if not account.email:
-        return
+class PlaceAllocationMailer:
+    """
+    Builds the emails sent when places are allocated or declined from the
+    booking queue, and sends them all together.
 
-    year = bookings[0].camp.year
-    booking_open_data = get_booking_open_data(year)
-    expiring_bookings, non_expiring_bookings = partition(bookings, lambda b: b.will_expire)
+    On allocation day there can be hundreds of accounts to email, so everything
+    shared between the emails (domain, templates, URLs, year config) is
+    computed once, and the emails are sent using a single connection, which
+    for django-mailer means a single bulk insert.
+    """
 
-    for booking in expiring_bookings:
-        # Send individual emails, because there are actions are we don't
-        # want to confuse things.
-        c = {
-            "domain": common.get_current_domain(),
-            "account": account,
-            "booking": booking,
-            "booking_expires_after_display": settings.BOOKING_EXPIRES_FOR_UNCONFIRMED_BOOKING_AFTER_DISPLAY,
-            "accept_place_url": make_accept_place_url(booking),
-            "reject_place_url": make_reject_place_url(booking),
-        }
-        body = loader.render_to_string("cciw/bookings/expiring_place_allocated_email.txt", c)
-        subject = f"[CCIW] Booking - place allocated for {booking.name}"
-        mail.send_mail(subject, body, settings.WEBMASTER_FROM_EMAIL, [account.email])
+    def __init__(self):
+        self.domain = common.get_current_domain()
+        self.token_generator = EmailVerifyTokenGenerator()
+        self.expiring_place_allocated_template = loader.get_template("cciw/bookings/expiring_place_allocated_email.txt")
+        self.places_confirmed_template = loader.get_template("cciw/bookings/places_confirmed_email.txt")
+        self.places_declined_template = loader.get_template("cciw/bookings/places_declined_email.txt")
+        self.contact_url = build_url(view_name="cciw-contact_us-send", domain=self.domain) + "?bookings"
+        self.pay_url = build_url(view_name="cciw-bookings-pay", domain=self.domain)
+        self.account_overview_url = build_url(view_name="cciw-bookings-account_overview", domain=self.domain)
+        self.booking_open_data: dict[int, BookingOpenData] = {}
+        self.tokens: dict[str, str] = {}
+        self.messages: list[mail.EmailMessage] = []
+        self.accepted_queue_entry_ids: list[int] = []
+        self.declined_queue_entry_ids: list[int] = []
+
+    def add_places_allocated(self, account: BookingAccount, bookings: Sequence[Booking]) -> None:
+        assert bookings
+        assert all(booking.account == account for booking in bookings)
+        if not account.email:
+            return
+
+        expiring_bookings, non_expiring_bookings = partition(bookings, lambda b: b.will_expire)
+
+        for booking in expiring_bookings:
+            # Send individual emails, because there are actions are we don't
+            # want to confuse things.
+            c = {
+                "domain": self.domain,
+                "account": account,
+                "booking": booking,
+                "booking_expires_after_display": settings.BOOKING_EXPIRES_FOR_UNCONFIRMED_BOOKING_AFTER_DISPLAY,
+                "accept_place_url": self.url_with_token(
+                    view_name="cciw-bookings-accept_place", email=account.email, view_kwargs={"booking_id": booking.id}
+                ),
+                "reject_place_url": self.url_with_token(
+                    view_name="cciw-bookings-reject_place", email=account.email, view_kwargs={"booking_id": booking.id}
+                ),
+            }
+            self.add_message(
+                subject=f"[CCIW] Booking - place allocated for {booking.name}",
+                body=self.expiring_place_allocated_template.render(c),
+                to=account.email,
+            )
+
+        if non_expiring_bookings:
+            # We can send these all together, there are no actions to take.
+            c = {
+                "domain": self.domain,
+                "account": account,
+                "bookings": bookings,
+                "booking_open_data": self.get_booking_open_data(bookings[0].camp.year),
+                "pay_url": self.add_token(self.pay_url, account.email),
+                "contact_url": self.contact_url,
+            }
+            self.add_message(
+                subject="[CCIW] Booking - places confirmed",
+                body=self.places_confirmed_template.render(c),
+                to=account.email,
+            )
+
+        self.accepted_queue_entry_ids.extend(b.queue_entry.id for b in bookings)
+
+    def add_places_declined(self, account: BookingAccount, bookings: Sequence[Booking]) -> None:
+        assert bookings
+        assert all(booking.account == account for booking in bookings)
+        if not account.email:
+            return
 
-    if non_expiring_bookings:
-        # We can send these all together, there are no actions to take.
         c = {
-            "domain": common.get_current_domain(),
+            "domain": self.domain,
             "account": account,
             "bookings": bookings,
-            "booking_open_data": booking_open_data,
-            "pay_url": build_url_with_booking_token(view_name="cciw-bookings-pay", email=account.email),
-            "contact_url": build_url(view_name="cciw-contact_us-send") + "?bookings",
+            "account_overview_url": self.add_token(self.account_overview_url, account.email),
         }
-        body = loader.render_to_string("cciw/bookings/places_confirmed_email.txt", c)
-        subject = "[CCIW] Booking - places confirmed"
-        mail.send_mail(subject, body, settings.WEBMASTER_FROM_EMAIL, [account.email])
-
-    BookingQueueEntry.objects.filter(id__in=[b.queue_entry.id for b in bookings]).update(
-        accepted_notification_sent_at=timezone.now()
-    )
-
-
-def make_accept_place_url(booking: Booking) -> str:
-    return build_url_with_booking_token(
-        view_name="cciw-bookings-accept_place", email=booking.account.email, view_kwargs={"booking_id": booking.id}
-    )
-
-
-def make_reject_place_url(booking: Booking) -> str:
-    return build_url_with_booking_token(
-        view_name="cciw-bookings-reject_place", email=booking.account.email, view_kwargs={"booking_id": booking.id}
-    )
+        self.add_message(
+            subject="[CCIW] Booking - places declined",
+            body=self.places_declined_template.render(c),
+            to=account.email,
+        )
+        self.declined_queue_entry_ids.extend(b.queue_entry.id for b in bookings)
 
+    def send(self) -> int:
+        """
+        Sends all the emails, and records the notifications against the queue
+        entries. Returns the number of emails sent.
+        """
+        with transaction.atomic():
+            sent = mail.get_connection().send_messages(self.messages) if self.messages else 0
+            now = timezone.now()
+            if self.accepted_queue_entry_ids:
+                BookingQueueEntry.objects.filter(id__in=self.accepted_queue_entry_ids).update(
+                    accepted_notification_sent_at=now
+                )
+            if self.declined_queue_entry_ids:
+                BookingQueueEntry.objects.filter(id__in=self.declined_queue_entry_ids).update(
+                    declined_notification_sent_at=now
+                )
+        self.messages = []
+        self.accepted_queue_entry_ids = []
+        self.declined_queue_entry_ids = []
+        return sent or 0
+
+    def add_message(self, *, subject: str, body: str, to: str) -> None:
+        self.messages.append(
+            mail.EmailMessage(subject=subject, body=body, from_email=settings.WEBMASTER_FROM_EMAIL, to=[to])
+        )
 
-def send_places_declined_email(account: BookingAccount, bookings: Sequence[Booking]) -> None:
-    assert bookings
-    assert all(booking.account == account for booking in bookings)
-    if not account.email:
-        return
+    def get_booking_open_data(self, year: int) -> BookingOpenData:
+        if year not in self.booking_open_data:
+            self.booking_open_data[year] = get_booking_open_data(year)
+        return self.booking_open_data[year]
 
-    c = {
-        "domain": common.get_current_domain(),
-        "account": account,
-        "bookings": bookings,
-        "account_overview_url": build_url_with_booking_token(
-            view_name="cciw-bookings-account_overview", email=account.email
-        ),
-    }
-    body = loader.render_to_string("cciw/bookings/places_declined_email.txt", c)
-    subject = "[CCIW] Booking - places declined"
+    def add_token(self, url: str, email: str) -> str:
+        # Tokens depend only on the email address (and the time), so one per
+        # account is enough.
+        if email not in self.tokens:
+            self.tokens[email] = self.token_generator.token_for_email(email)
+        return f"{url}?bt={self.tokens[email]}"
 
-    mail.send_mail(subject, body, settings.WEBMASTER_FROM_EMAIL, [account.email])
-    BookingQueueEntry.objects.filter(id__in=[b.queue_entry.id for b in bookings]).update(
-        declined_notification_sent_at=timezone.now()
-    )
+    def url_with_token(self, *, view_name: str, email: str, view_kwargs: dict | None = None) -> str:
+        return self.add_token(build_url(view_name=view_name, view_kwargs=view_kwargs, domain=self.domain), email)
 
 
 def send_booking_approved_mail(booking: Booking):
@@ -260,25 +316,30 @@ def send_booking_expired_mail_to_booker(booking: Booking):
     mail.send_mail(subject, body, settings.WEBMASTER_FROM_EMAIL, [account.email])
 
 
-def send_payment_reminder_emails():
+def send_payment_reminder_emails() -> ScheduledMailReport:
     from cciw.bookings.models import BookingAccount
 
     accounts: list[BookingAccount] = [
         account for account in BookingAccount.objects.payments_due() if account.email != ""
     ]
 
+    # Shared by all the emails:
+    template = loader.get_template("cciw/bookings/payments_due_email.txt")
+    domain = common.get_current_domain()
+    start_url = build_url(view_name="cciw-bookings-start", domain=domain)
+
     def build_email(account: BookingAccount) -> mail.EmailMessage:
         c = {
-            "pay_url": build_url_with_booking_token(view_name="cciw-bookings-pay", email=account.email),
-            "start_url": build_url(view_name="cciw-bookings-start"),
+            "pay_url": build_url_with_booking_token(view_name="cciw-bookings-pay", email=account.email, domain=domain),
+            "start_url": start_url,
             "account": account,
         }
-        body = loader.render_to_string("cciw/bookings/payments_due_email.txt", c)
+        body = template.render(c)
         return mail.EmailMessage(
             subject="[CCIW] Payment due", body=body, from_email=settings.WEBMASTER_FROM_EMAIL, to=[account.email]
         )
 
-    send_mails_for_items_according_to_schedule(
+    return send_mails_for_items_according_to_schedule(
         items=accounts,
         tracking_id_format=lambda item: f"booking-account-payment-reminder-{item.id}",
         builder=build_email,
@@ -153,7 +153,7 @@ def create_processed_payment(
     manual_payment = create_manual_payment(account=account, amount=amount)
     payment = manual_payment.paymentsource.payment
     payment.refresh_from_db()
-    assert payment.processed_at  # should have been done via process_all_payments via signals
+    assert payment.processed_at  # should have been done via process_payments via signals
     return payment
 
 
@@ -2,6 +2,7 @@
 from django.utils.html import format_html
 
 from cciw.bookings.models import Booking, BookingAccount, Price
+from cciw.bookings.models.newsletter import record_newsletter_change
 from cciw.cciwmain import common
 from cciw.cciwmain.forms import CciwFormMixin
 from cciw.cciwmain.models import Camp
@@ -30,14 +31,14 @@ class Meta:
         ]
 
     do_htmx_validation = True
+    htmx_validation_cacheable = True
 
     def save(self, *args, **kwargs) -> BookingAccount:
         old_subscription = BookingAccount.objects.get(id=self.instance.id).subscribe_to_newsletter
         retval = super().save(*args, **kwargs)
         if old_subscription != self.instance.subscribe_to_newsletter:
-            from cciw.bookings.mailchimp import update_newsletter_subscription
-
-            update_newsletter_subscription(self.instance)
+            # Sent to Mailchimp later, by `sync_newsletter_subscriptions`
+            record_newsletter_change(self.instance)
         return retval
 
 
@@ -1,43 +1,206 @@
+"""
+Syncing of newsletter subscriptions to Mailchimp.
+
+Changes to `BookingAccount.subscribe_to_newsletter` are recorded as
+`PendingNewsletterChange` rows (see `record_newsletter_change`), and sent in
+batches by `sync_newsletter_subscriptions`, which is run as a scheduled django-q
+task (created by a data migration, and changed with `schedule_newsletter_sync`).
+This keeps HTTP requests to Mailchimp out of the request/response cycle, and
+means many changes cost a single request to Mailchimp's batch operations
+endpoint.
+
+`reconcile_newsletter_subscriptions` does a full comparison of local accounts
+against the members in Mailchimp, and sends whatever changes are needed.
+"""
+
+import functools
 import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
 
 import requests
 from django.conf import settings
+from django.db.models import Q
+from django_q.models import Schedule
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from requests.models import Response
+from urllib3.util.retry import Retry
 
 from cciw.bookings.models.accounts import BookingAccount
+from cciw.bookings.models.newsletter import PendingNewsletterChange
 
+logger = logging.getLogger(__name__)
 
-def update_newsletter_subscription(booking_account: BookingAccount) -> Response | None:
-    status = get_status(booking_account)
-    if booking_account.subscribe_to_newsletter:
-        if status is None or status != "subscribed":
-            return _update(booking_account, status, "subscribed")
-    else:
-        if status is not None and (status in ["subscribed", "pending"]):
-            return _update(booking_account, status, "unsubscribed")
-    return None
-
-
-def _update(booking_account: BookingAccount, current_status: str | None, desired_status: str) -> Response:
-    if current_status is None:
-        return mailchimp_request(
-            "POST",
-            f"/lists/{settings.MAILCHIMP_NEWSLETTER_LIST_ID}/members/",
-            json={
-                "email_address": booking_account.email,
-                "status": desired_status,
-            },
+# Mailchimp allows up to 500 pending batches, each with any number of
+# operations, but we keep batches modest so that a failure doesn't lose much.
+BATCH_SIZE = 500
+
+# Page size for reading the member list. Mailchimp's maximum is 1000.
+MEMBERS_PAGE_SIZE = 1000
+
+# We stay well within Mailchimp's limit of 10 simultaneous connections.
+MAX_REQUESTS_PER_SECOND = 5
+
+NEWSLETTER_SYNC_SCHEDULE_NAME = "sync_newsletter_subscriptions"
+
+
+# Sending pending changes
+
+
+def sync_newsletter_subscriptions() -> int:
+    """
+    Sends all pending newsletter subscription changes to Mailchimp, returning
+    the number of changes sent.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        pending = list(
+            PendingNewsletterChange.objects.filter(id__gt=last_id).select_related("account").order_by("id")[:BATCH_SIZE]
         )
+        if not pending:
+            return total
+        last_id = pending[-1].id
+
+        operations = [subscription_operation(change.account) for change in pending if change.account.email]
+        if operations:
+            submit_batch(operations)
+        total += len(operations)
+
+        # If the account was changed again while we were doing this, the
+        # `changed_at` will differ, and the change will be picked up next time.
+        PendingNewsletterChange.objects.filter(
+            Q(*[Q(id=change.id, changed_at=change.changed_at) for change in pending], _connector=Q.OR)
+        ).delete()
+
+
+def subscription_operation(account: BookingAccount) -> dict:
+    """
+    Returns a batch operation that will set the member status to match the account.
+    """
+    path = f"/lists/{settings.MAILCHIMP_NEWSLETTER_LIST_ID}/members/{email_to_mailchimp_id(account.email)}"
+    if account.subscribe_to_newsletter:
+        # Create or update
+        return {
+            "method": "PUT",
+            "path": path,
+            "operation_id": str(account.id),
+            "body": json.dumps({"email_address": account.email, "status_if_new": "subscribed", "status": "subscribed"}),
+        }
     else:
-        mailchimp_id = email_to_mailchimp_id(booking_account.email)
-        return mailchimp_request(
-            "PATCH",
-            f"/lists/{settings.MAILCHIMP_NEWSLETTER_LIST_ID}/members/{mailchimp_id}",
-            json={
-                "status": desired_status,
+        # Only updates existing members. For people who were never subscribed,
+        # this operation fails with a 404 inside the batch, which is fine.
+        return {
+            "method": "PATCH",
+            "path": path,
+            "operation_id": str(account.id),
+            "body": json.dumps({"status": "unsubscribed"}),
+        }
+
+
+def submit_batch(operations: list[dict]) -> str:
+    """
+    Submits operations to Mailchimp's batch endpoint, returning the batch ID.
+    """
+    response = mailchimp_request("POST", "/batches", json={"operations": operations})
+    batch_id = response.json()["id"]
+    logger.info("Submitted Mailchimp batch %s with %s operations", batch_id, len(operations))
+    return batch_id
+
+
+# Reconciliation
+
+
+def reconcile_newsletter_subscriptions() -> int:
+    """
+    Compares all booking accounts with the list members in Mailchimp, and sends
+    changes for any that don't match. Returns the number of changes sent.
+
+    Members who are "unsubscribed" or "cleaned" in Mailchimp are never
+    re-subscribed, since they may have used Mailchimp's unsubscribe link, or
+    have an address that bounces, and we don't record that locally. We only
+    add subscribed accounts that are missing from the list.
+    """
+    remote_statuses = {
+        email_to_mailchimp_id(member["email_address"]): member["status"] for member in get_all_list_members()
+    }
+    # There can be more than one account with the same email address apart
+    # from case, in which case we want them subscribed if any account is, so we
+    # order those last.
+    accounts_by_mailchimp_id: dict[str, BookingAccount] = {}
+    for account in (
+        BookingAccount.objects.exclude(email="")
+        .exclude(email__isnull=True)
+        .only("id", "email", "subscribe_to_newsletter")
+        .order_by("subscribe_to_newsletter")
+    ):
+        accounts_by_mailchimp_id[email_to_mailchimp_id(account.email)] = account
+
+    operations = []
+    for mailchimp_id, account in accounts_by_mailchimp_id.items():
+        status = remote_statuses.get(mailchimp_id)
+        if account.subscribe_to_newsletter:
+            needs_change = status is None
+        else:
+            needs_change = status in ["subscribed", "pending"]
+        if needs_change:
+            operations.append(subscription_operation(account))
+
+    for chunk in itertools.batched(operations, BATCH_SIZE):
+        submit_batch(list(chunk))
+    return len(operations)
+
+
+def get_all_list_members() -> Iterator[dict]:
+    """
+    Yields all members of the newsletter list, as dicts containing
+    `email_address` and `status`.
+    """
+    for offset in itertools.count(step=MEMBERS_PAGE_SIZE):
+        data = mailchimp_request(
+            "GET",
+            f"/lists/{settings.MAILCHIMP_NEWSLETTER_LIST_ID}/members",
+            params={
+                "count": MEMBERS_PAGE_SIZE,
+                "offset": offset,
+                "fields": "members.email_address,members.status,total_items",
             },
-        )
+        ).json()
+        yield from data["members"]
+        if offset + MEMBERS_PAGE_SIZE >= data["total_items"]:
+            return
+
+
+# Scheduling
+
+
+def schedule_newsletter_sync(*, minutes: int) -> Schedule:
+    """
+    Create or update the django-q schedule that runs `sync_newsletter_subscriptions`
+    every `minutes` minutes.
+    """
+    schedule, _ = Schedule.objects.update_or_create(
+        name=NEWSLETTER_SYNC_SCHEDULE_NAME,
+        defaults={
+            "func": "cciw.bookings.mailchimp.sync_newsletter_subscriptions",
+            "schedule_type": Schedule.MINUTES,
+            "minutes": minutes,
+            "repeats": -1,
+        },
+    )
+    return schedule
+
+
+def unschedule_newsletter_sync() -> None:
+    Schedule.objects.filter(name=NEWSLETTER_SYNC_SCHEDULE_NAME).delete()
+
+
+# Individual members
 
 
 def email_to_mailchimp_id(email: str) -> str:
@@ -55,10 +218,56 @@ def get_status(booking_account: BookingAccount) -> str | None:
     return response.json()["status"]
 
 
+# HTTP
+
+
+class RateLimiter:
+    """
+    Blocks to keep calls to `wait` to no more than `per_second` per second.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second
+        self.next_allowed = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            if now < self.next_allowed:
+                time.sleep(self.next_allowed - now)
+                now = self.next_allowed
+            self.next_allowed = now + self.interval
+
+
+_rate_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+
+@functools.cache
+def get_session() -> requests.Session:
+    # A single session keeps connections alive between requests, so we don't
+    # pay for a TLS handshake on every request.
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # All our requests are idempotent, including POST to /batches, since
+        # the operations are.
+        allowed_methods=None,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def mailchimp_request_unchecked(method: str, path: str, **kwargs) -> Response:
     url = settings.MAILCHIMP_URL_BASE + path
     auth = HTTPBasicAuth("user", settings.MAILCHIMP_API_KEY)
-    return requests.request(method, url, auth=auth, **kwargs)
+    _rate_limiter.wait()
+    return get_session().request(method, url, auth=auth, timeout=30, **kwargs)
 
 
 def mailchimp_request(*args, **kwargs) -> Response:
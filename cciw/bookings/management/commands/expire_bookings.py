@@ -1,8 +1,27 @@
 from django.core.management.base import BaseCommand
 
-from cciw.bookings.models.expiry import expire_bookings
+from cciw.bookings.models.expiry import expire_bookings, schedule_expire_bookings, unschedule_expire_bookings
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **options):
-        expire_bookings()
+    help = "Expire booked places that were not confirmed in time, or manage the django-q schedule that does this."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--schedule",
+            type=int,
+            metavar="MINUTES",
+            help="Instead of running now, schedule the task to run via django-q every MINUTES minutes",
+        )
+        group.add_argument("--unschedule", action="store_true", help="Remove the django-q schedule")
+
+    def handle(self, *args, schedule: int | None = None, unschedule: bool = False, **options):
+        if schedule is not None:
+            schedule_expire_bookings(minutes=schedule)
+        elif unschedule:
+            unschedule_expire_bookings()
+        else:
+            count = expire_bookings()
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Expired {count} booking(s)\n")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from cciw.bookings.mailchimp import (
+    reconcile_newsletter_subscriptions,
+    schedule_newsletter_sync,
+    sync_newsletter_subscriptions,
+    unschedule_newsletter_sync,
+)
+
+
+class Command(BaseCommand):
+    help = "Send pending newsletter subscription changes to Mailchimp, or manage the django-q schedule that does this."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--schedule",
+            type=int,
+            metavar="MINUTES",
+            help="Instead of running now, schedule the task to run via django-q every MINUTES minutes",
+        )
+        group.add_argument("--unschedule", action="store_true", help="Remove the django-q schedule")
+        group.add_argument(
+            "--reconcile",
+            action="store_true",
+            help="Compare all accounts with the Mailchimp list, and send any changes needed",
+        )
+
+    def handle(self, *args, schedule: int | None = None, unschedule: bool = False, reconcile: bool = False, **options):
+        if schedule is not None:
+            schedule_newsletter_sync(minutes=schedule)
+        elif unschedule:
+            unschedule_newsletter_sync()
+        elif reconcile:
+            count = reconcile_newsletter_subscriptions()
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Sent {count} change(s)\n")
+        else:
+            count = sync_newsletter_subscriptions()
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Sent {count} change(s)\n")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cciw.bookings.models import BookingAccount
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the trigger-maintained total amount due on booking accounts against their bookings, "
+        "and report any differences."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Correct any differences found")
+
+    def handle(self, *args, fix: bool = False, **options):
+        drifted = list(
+            BookingAccount.objects.with_total_amount_due_drift().only("id", "total_amount_due").order_by("id")
+        )
+        for account in drifted:
+            self.stdout.write(
+                f"Account {account.id}: stored total_amount_due {account.total_amount_due}, "
+                f"calculated {account.computed_total_amount_due}\n"
+            )
+        if not drifted:
+            if options["verbosity"] > 1:
+                self.stdout.write("No differences found\n")
+            return
+
+        if fix:
+            BookingAccount.objects.filter(id__in=[account.id for account in drifted]).recalculate_total_amount_due()
+            self.stdout.write(f"Fixed {len(drifted)} account(s)\n")
+        else:
+            raise CommandError(f"{len(drifted)} account(s) have an incorrect total_amount_due")
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.9 on 2026-10-19 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0131_remove_bookingaccount_last_payment_reminder_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="yearconfig",
+            name="admission_capacity",
+            field=models.PositiveIntegerField(
+                blank=True,
+                default=None,
+                help_text="If set, only this many visitors at a time are let into the pages for adding places, and everyone else is shown a waiting page. Leave blank for no waiting room.",
+                null=True,
+                verbose_name="waiting room capacity",
+            ),
+        ),
+        migrations.AddField(
+            model_name="yearconfig",
+            name="admission_drain_per_minute",
+            field=models.PositiveIntegerField(
+                default=50,
+                help_text="Number of extra visitors let in from the waiting room each minute",
+                verbose_name="waiting room rate",
+            ),
+        ),
+    ]
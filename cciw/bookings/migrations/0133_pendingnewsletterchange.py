@@ -0,0 +1,29 @@
+# Generated by Django 6.0.9 on 2026-10-19 05:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0132_yearconfig_admission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingNewsletterChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_newsletter_change",
+                        to="bookings.bookingaccount",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.9 on 2026-10-19 05:22
+
+from decimal import Decimal
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0133_pendingnewsletterchange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookingaccount",
+            name="total_amount_due",
+            field=models.DecimalField(decimal_places=2, default=Decimal("0.00"), editable=False, max_digits=10),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE bookings_bookingaccount AS account
+            SET total_amount_due = COALESCE(
+              (SELECT SUM(booking.amount_due)
+                 FROM bookings_booking AS booking
+                WHERE booking.account_id = account.id
+                  AND booking.state NOT IN ('cancelled_full_refund', 'info_complete')),
+              0);
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="bookingaccount",
+            index=models.Index(
+                condition=models.Q(("total_amount_due", models.F("total_received")), _negated=True),
+                fields=["id"],
+                name="bookingaccount_nonzero_balance",
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="booking",
+            trigger=pgtrigger.compiler.Trigger(
+                name="update_account_total_amount_due",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n                IF TG_OP = 'UPDATE'\n                   AND OLD.account_id = NEW.account_id\n                   AND OLD.amount_due = NEW.amount_due\n                   AND OLD.state = NEW.state THEN\n                  RETURN NULL;\n                END IF;\n                IF TG_OP <> 'INSERT' THEN\n                  UPDATE bookings_bookingaccount\n                    SET total_amount_due = total_amount_due - (CASE WHEN OLD.state IN ('cancelled_full_refund', 'info_complete') THEN 0 ELSE OLD.amount_due END)\n                    WHERE id = OLD.account_id;\n                END IF;\n                IF TG_OP <> 'DELETE' THEN\n                  UPDATE bookings_bookingaccount\n                    SET total_amount_due = total_amount_due + (CASE WHEN NEW.state IN ('cancelled_full_refund', 'info_complete') THEN 0 ELSE NEW.amount_due END)\n                    WHERE id = NEW.account_id;\n                END IF;\n                RETURN NULL;\n                ",
+                    hash="216f7ecf1e49046e7ed1d8f73046b7591c11148b",
+                    operation="UPDATE OR INSERT OR DELETE",
+                    pgid="pgtrigger_update_account_total_amount_due_f8230",
+                    table="bookings_booking",
+                    when="AFTER",
+                ),
+            ),
+        ),
+    ]
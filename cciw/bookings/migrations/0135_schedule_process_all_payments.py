@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Copied from cciw.bookings.models.payments, since migrations shouldn't depend
+# on code that may change.
+PROCESS_PAYMENTS_SCHEDULE_NAME = "process_all_payments"
+
+
+def forwards(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.update_or_create(
+        name=PROCESS_PAYMENTS_SCHEDULE_NAME,
+        defaults={
+            "func": "cciw.bookings.models.payments.process_all_payments",
+            "schedule_type": "I",  # Schedule.MINUTES
+            "minutes": 5,
+            "repeats": -1,
+        },
+    )
+
+
+def backwards(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(name=PROCESS_PAYMENTS_SCHEDULE_NAME).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0134_bookingaccount_total_amount_due"),
+        ("django_q", "0019_alter_task_options_alter_ormq_key_alter_ormq_lock_and_more"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Copied from cciw.bookings.mailchimp, since migrations shouldn't depend on
+# code that may change.
+NEWSLETTER_SYNC_SCHEDULE_NAME = "sync_newsletter_subscriptions"
+
+
+def forwards(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.update_or_create(
+        name=NEWSLETTER_SYNC_SCHEDULE_NAME,
+        defaults={
+            "func": "cciw.bookings.mailchimp.sync_newsletter_subscriptions",
+            "schedule_type": "I",  # Schedule.MINUTES
+            "minutes": 5,
+            "repeats": -1,
+        },
+    )
+
+
+def backwards(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(name=NEWSLETTER_SYNC_SCHEDULE_NAME).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0135_schedule_process_all_payments"),
+        ("django_q", "0019_alter_task_options_alter_ormq_key_alter_ormq_lock_and_more"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.9 on 2026-10-19 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookings", "0136_schedule_newsletter_sync"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="yearconfig",
+            name="admission_capacity",
+            field=models.PositiveIntegerField(
+                blank=True,
+                default=None,
+                help_text="If set, visitors to the pages for adding places are queued in a waiting room. This many are let in straight away, then more are let in each minute (see 'waiting room rate'). Admitted visitors are not counted out again. Leave blank for no waiting room.",
+                null=True,
+                verbose_name="waiting room first batch",
+            ),
+        ),
+    ]
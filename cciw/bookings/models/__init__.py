@@ -14,6 +14,7 @@
     Booking,
 )
 from .constants import KEEP_FINANCIAL_RECORDS_FOR, Sex
+from .newsletter import PendingNewsletterChange
 from .payments import (
     AccountTransferPayment,
     ManualPayment,
@@ -50,8 +51,8 @@
     "ManualPaymentType",
     "PayPalIPN",
     "Payment",
-    "Payment",
     "PaymentSource",
+    "PendingNewsletterChange",
     "Price",
     "PriceType",
     "RefundPayment",
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
 from django.db import models
-from django.db.models import Q, functions
+from django.db.models import OuterRef, Q, Subquery, Sum, functions
 from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from django_countries.fields import CountryField
@@ -14,7 +15,7 @@
 
 from .constants import DEFAULT_COUNTRY
 from .states import BOOKING_STATES_NO_FEE_DUE
-from .yearconfig import YearConfigFetcher
+from .yearconfig import YearConfig, YearConfigFetcher
 
 if TYPE_CHECKING:
     from .bookings import Booking
@@ -60,24 +61,52 @@ def older_than(self, before_datetime: datetime) -> BookingAccountQuerySet:
             .filter(Q(last_booking_camp_end_date__isnull=True) | Q(last_booking_camp_end_date__lt=before_datetime))
         )
 
-    def _with_total_amount_due(self) -> BookingAccountQuerySet:
-        return self.alias(
-            total_amount_due=functions.Coalesce(
-                models.Sum(
-                    "bookings__amount_due",
-                    filter=~Q(bookings__state__in=BOOKING_STATES_NO_FEE_DUE),
-                ),
-                models.Value(Decimal(0)),
-            )
-        )
-
     def zero_final_balance(self) -> BookingAccountQuerySet:
         # See also below
-        return self._with_total_amount_due().filter(total_amount_due=models.F("total_received"))
+        return self.filter(total_amount_due=models.F("total_received"))
 
     def non_zero_final_balance(self) -> BookingAccountQuerySet:
         # See also above
-        return self._with_total_amount_due().exclude(total_amount_due=models.F("total_received"))
+        return self.exclude(total_amount_due=models.F("total_received"))
+
+    def with_final_balance(self) -> BookingAccountQuerySet:
+        """
+        Annotates `final_balance`, the same value as `get_balance_full()`.
+        """
+        return self.annotate(final_balance=models.F("total_amount_due") - models.F("total_received"))
+
+    def with_total_amount_due_drift(self) -> BookingAccountQuerySet:
+        """
+        Annotates `computed_total_amount_due` calculated from bookings, and
+        filters to accounts where it differs from the stored `total_amount_due`.
+        """
+        return self.annotate(computed_total_amount_due=total_amount_due_subquery()).exclude(
+            total_amount_due=models.F("computed_total_amount_due")
+        )
+
+    def recalculate_total_amount_due(self) -> int:
+        return self.update(total_amount_due=total_amount_due_subquery())
+
+
+def total_amount_due_subquery() -> functions.Coalesce:
+    """
+    Calculates the total amount due from bookings, for checking the
+    trigger-maintained `BookingAccount.total_amount_due`.
+    """
+    from .bookings import Booking
+
+    return functions.Coalesce(
+        Subquery(
+            Booking.objects.filter(account=OuterRef("pk"))
+            .exclude(state__in=BOOKING_STATES_NO_FEE_DUE)
+            .order_by()
+            .values("account")
+            .annotate(total=Sum("amount_due"))
+            .values("total"),
+            output_field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        models.Value(Decimal(0)),
+    )
 
 
 class BookingAccountManagerBase(models.Manager):
@@ -124,6 +153,17 @@ def payments_due(self) -> Sequence[BookingAccount]:
 ]
 
 
+@dataclass(frozen=True)
+class AccountFinancialSummary:
+    balance_full: Decimal
+    balance_due_now: Decimal
+    pending_payment_total: Decimal
+
+    @property
+    def payment_required(self) -> bool:
+        return self.balance_due_now > 0
+
+
 class BookingAccount(models.Model):
     """
     Login account for camp bookings system.
@@ -155,6 +195,8 @@ class BookingAccount(models.Model):
     )
     subscribe_to_newsletter = models.BooleanField("Subscribe to email newsletter", default=False)
     total_received = models.DecimalField(default=Decimal("0.00"), decimal_places=2, max_digits=10)
+    # Sum of `amount_due` for payable bookings, maintained by a trigger on Booking
+    total_amount_due = models.DecimalField(default=Decimal("0.00"), decimal_places=2, max_digits=10, editable=False)
     created_at = models.DateTimeField(blank=False)
     first_login_at = models.DateTimeField(null=True, blank=True)
     last_login_at = models.DateTimeField(null=True, blank=True)
@@ -163,6 +205,16 @@ class BookingAccount(models.Model):
 
     objects = BookingAccountManager()
 
+    class Meta:
+        indexes = [
+            # For `non_zero_final_balance()`, which is a small minority of accounts
+            models.Index(
+                fields=["id"],
+                condition=~Q(total_amount_due=models.F("total_received")),
+                name="bookingaccount_nonzero_balance",
+            ),
+        ]
+
     def has_account_details(self) -> bool:
         return not any(
             att == ""
@@ -182,13 +234,16 @@ def __str__(self) -> str:
         return ", ".join(out)
 
     def save(self, **kwargs) -> None:
-        # We have to ensure that only receive_payment touches the total_received
-        # field when doing updates
+        # We have to ensure that only process_payments touches
+        # the total_received field when doing updates, and only the database trigger touches
+        # total_amount_due
         if self.id is None:
             self.created_at = timezone.now()
             return super().save(**kwargs)
         else:
-            update_fields = [f.name for f in self._meta.fields if f.name != "id" and f.name != "total_received"]
+            update_fields = [
+                f.name for f in self._meta.fields if f.name not in ["id", "total_received", "total_amount_due"]
+            ]
             return super().save(update_fields=update_fields, **kwargs)
 
     # Business methods:
@@ -225,36 +280,36 @@ def get_balance_due_now(self) -> Decimal:
         today = date.today()
         return self.get_balance(today=today)
 
-    def admin_balance(self) -> Decimal:
-        return self.get_balance_full()
-
-    admin_balance.short_description = "balance"
-    admin_balance = property(admin_balance)
-
-    def receive_payment(self, amount: Decimal):
+    def get_financial_summary(
+        self, *, today: date | None = None, now: datetime | None = None
+    ) -> AccountFinancialSummary:
         """
-        Adds the amount to the account's total_received field.  This should only
-        ever be called by the 'process_all_payments' function. Client code
-        should use the 'send_payment' function.
+        Returns the final balance, balance due now and pending payment total,
+        using aggregate queries rather than loading bookings.
         """
-        # See process_all_payments function for an explanation of the above
-
-        # = Receiving payments =
-        #
-        # When an online payment is received, django-paypal creates a record
-        # and a signal handler indirectly calls this method which must update
-        # the 'total_received' field.
-        #
-        # The manual booking process, which uses the admin to record cheque
-        # payments, uses exactly the same process, although it is a different
-        # payment object which triggers the process.
-
-        # Use update and F objects to avoid concurrency problems
-        BookingAccount.objects.filter(id=self.id).update(total_received=models.F("total_received") + amount)
-
-        # Need new data from DB:
-        acc = BookingAccount.objects.get(id=self.id)
-        self.total_received = acc.total_received
+        if today is None:
+            today = date.today()
+        # This must match the logic in Booking.get_amount_due
+        payments_due_on = YearConfig.objects.filter(year=OuterRef("camp__year")).values("payments_due_on")[:1]
+        totals = (
+            self.bookings.payable()
+            .annotate(payments_due_on=Subquery(payments_due_on))
+            .aggregate(
+                full=Sum("amount_due"),
+                due_now=Sum(
+                    "amount_due",
+                    filter=Q(camp__end_date__lt=today)
+                    | Q(payments_due_on__isnull=True)
+                    | Q(payments_due_on__lte=today),
+                ),
+            )
+        )
+        zero = Decimal("0.00")
+        return AccountFinancialSummary(
+            balance_full=(totals["full"] or zero) - self.total_received,
+            balance_due_now=(totals["due_now"] or zero) - self.total_received,
+            pending_payment_total=self.get_pending_payment_total(now=now),
+        )
 
     def get_pending_payment_total(self, now: datetime | None = None) -> Decimal:
         from .payments import build_paypal_custom_field
@@ -273,7 +328,8 @@ def get_pending_payment_total(self, now: datetime | None = None) -> Decimal:
         completed_payments = all_payments.filter(
             payment_status="Completed",
         )
-        uncompleted_pending_payments = pending_payments.exclude(txn_id__in=[ipn.txn_id for ipn in completed_payments])
+        # Using a subquery, so that this is done in a single query.
+        uncompleted_pending_payments = pending_payments.exclude(txn_id__in=completed_payments.values("txn_id"))
 
         total = uncompleted_pending_payments.aggregate(total=models.Sum("mc_gross"))["total"]
         if total is None:
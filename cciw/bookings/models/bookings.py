@@ -42,6 +42,15 @@ class Array(models.Func):
     function = "ARRAY"
 
 
+def _amount_payable_sql(row: str) -> str:
+    """
+    SQL for the amount a booking row adds to its account's total amount due,
+    matching `Booking.is_payable()`.
+    """
+    states = ", ".join(f"'{state}'" for state in sorted(BOOKING_STATES_NO_FEE_DUE))
+    return f"(CASE WHEN {row}.state IN ({states}) THEN 0 ELSE {row}.amount_due END)"
+
+
 class BookingQuerySet(AfterFetchQuerySetMixin, models.QuerySet):
     def for_year(self, year: int) -> BookingQuerySet:
         return self.filter(camp__year__exact=year)
@@ -347,7 +356,37 @@ class Meta:
                 );
                 RETURN NEW;
                 """,
-            )
+            ),
+            pgtrigger.Trigger(
+                name="update_account_total_amount_due",
+                operation=pgtrigger.Update | pgtrigger.Insert | pgtrigger.Delete,
+                when=pgtrigger.After,
+                # Maintains BookingAccount.total_amount_due, which must match
+                # BookingQuerySet.payable(). See `verify_account_balances`.
+                #
+                # We apply differences rather than recalculating the sum, so
+                # that concurrent changes to bookings on the same account
+                # can't overwrite each other.
+                func=f"""
+                IF TG_OP = 'UPDATE'
+                   AND OLD.account_id = NEW.account_id
+                   AND OLD.amount_due = NEW.amount_due
+                   AND OLD.state = NEW.state THEN
+                  RETURN NULL;
+                END IF;
+                IF TG_OP <> 'INSERT' THEN
+                  UPDATE bookings_bookingaccount
+                    SET total_amount_due = total_amount_due - {_amount_payable_sql("OLD")}
+                    WHERE id = OLD.account_id;
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                  UPDATE bookings_bookingaccount
+                    SET total_amount_due = total_amount_due + {_amount_payable_sql("NEW")}
+                    WHERE id = NEW.account_id;
+                END IF;
+                RETURN NULL;
+                """,
+            ),
         ]
 
     # Methods
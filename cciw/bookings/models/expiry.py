@@ -1,17 +1,107 @@
-from collections.abc import Sequence
+"""
+Expiry of places that were offered but not confirmed in time.
 
+This is designed to be run frequently (e.g. as a django-q scheduled task - see
+`schedule_expire_bookings`), and to be safe if runs overlap: each chunk of
+bookings is locked with `SELECT ... FOR UPDATE SKIP LOCKED`, so a concurrent
+run will skip rows that are being processed, and once a chunk is committed the
+bookings no longer match `expiry_due()`.
+"""
+
+from django.db import transaction
 from django.utils import timezone
+from django_q.models import Schedule
+from django_q.tasks import async_task
 
 from ..email import send_booking_expired_mail_to_booker, send_booking_expired_notification_to_booking_secretary
 from .bookings import Booking
+from .queue import BookingQueueEntry, QueueEntryActionLog, QueueEntryActionLogType
+from .states import BookingState
+
+EXPIRE_BOOKINGS_CHUNK_SIZE = 100
+
+EXPIRE_BOOKINGS_SCHEDULE_NAME = "expire_bookings"
+
 
+def expire_bookings(*, chunk_size: int = EXPIRE_BOOKINGS_CHUNK_SIZE) -> int:
+    """
+    Expire all bookings that are due, returning the number expired.
+    """
+    total = 0
+    while True:
+        expired_count = _expire_bookings_chunk(chunk_size)
+        total += expired_count
+        if expired_count < chunk_size:
+            return total
 
-def expire_bookings():
+
+@transaction.atomic
+def _expire_bookings_chunk(chunk_size: int) -> int:
     now = timezone.now()
+    booking_ids: list[int] = list(
+        Booking.objects.booked()
+        .expiry_due(now=now)
+        .order_by("id")
+        .select_for_update(skip_locked=True, of=("self",))
+        .values_list("id", flat=True)[:chunk_size]
+    )
+    if not booking_ids:
+        return 0
+
+    # This is the bulk equivalent of `Booking.expire_expiring_place()`
+    Booking.objects.filter(id__in=booking_ids).update(
+        booking_expires_at=None,
+        state=BookingState.CANCELLED_FULL_REFUND,
+        shelved=True,
+    )
+
+    queue_entries = list(BookingQueueEntry.objects.filter(booking_id__in=booking_ids).select_for_update())
+    active_entries = [entry for entry in queue_entries if entry.is_active]
+    BookingQueueEntry.objects.filter(id__in=[entry.id for entry in active_entries]).update(is_active=False)
 
-    will_expire: Sequence[Booking] = Booking.objects.booked().expiry_due(now=now)
+    # Action logs, matching what `make_inactive()` and `save_action_log()`
+    # would create. No user, because this is a system action.
+    action_logs: list[QueueEntryActionLog] = []
+    for entry in queue_entries:
+        if entry.is_active:
+            action_logs.append(
+                QueueEntryActionLog(
+                    queue_entry=entry,
+                    action_type=QueueEntryActionLogType.FIELDS_CHANGED,
+                    details={"fields_changed": [{"name": "is_active", "old_value": True, "new_value": False}]},
+                )
+            )
+        action_logs.append(QueueEntryActionLog(queue_entry=entry, action_type=QueueEntryActionLogType.EXPIRED))
+    QueueEntryActionLog.objects.bulk_create(action_logs)
 
-    for booking in will_expire:
-        booking.expire_expiring_place()
+    # With the ORM broker, the task is queued in the same transaction, so it
+    # only runs if the expiry is committed.
+    async_task(send_booking_expired_emails, booking_ids)
+    return len(booking_ids)
+
+
+def send_booking_expired_emails(booking_ids: list[int]) -> None:
+    for booking in Booking.objects.filter(id__in=booking_ids).select_related("account", "camp", "camp__camp_name"):
         send_booking_expired_mail_to_booker(booking)
         send_booking_expired_notification_to_booking_secretary(booking)
+
+
+def schedule_expire_bookings(*, minutes: int) -> Schedule:
+    """
+    Create or update the django-q schedule that runs `expire_bookings`
+    every `minutes` minutes.
+    """
+    schedule, _ = Schedule.objects.update_or_create(
+        name=EXPIRE_BOOKINGS_SCHEDULE_NAME,
+        defaults={
+            "func": "cciw.bookings.models.expiry.expire_bookings",
+            "schedule_type": Schedule.MINUTES,
+            "minutes": minutes,
+            "repeats": -1,
+        },
+    )
+    return schedule
+
+
+def unschedule_expire_bookings() -> None:
+    Schedule.objects.filter(name=EXPIRE_BOOKINGS_SCHEDULE_NAME).delete()
@@ -0,0 +1,28 @@
+"""
+Pending changes to newsletter subscriptions, to be sent to Mailchimp.
+
+See `cciw.bookings.mailchimp`.
+"""
+
+from django.db import models
+from django.utils import timezone
+
+from .accounts import BookingAccount
+
+
+class PendingNewsletterChange(models.Model):
+    """
+    Records that the newsletter subscription of a BookingAccount has changed
+    and needs to be sent to Mailchimp. The desired status is read from the
+    account when the change is sent, so repeated changes are combined.
+    """
+
+    account = models.OneToOneField(BookingAccount, on_delete=models.CASCADE, related_name="pending_newsletter_change")
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.account_id} at {self.changed_at}"
+
+
+def record_newsletter_change(account: BookingAccount) -> None:
+    PendingNewsletterChange.objects.update_or_create(account=account, defaults={"changed_at": timezone.now()})
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import re
+from collections import defaultdict
+from collections.abc import Collection
 from datetime import datetime
 from decimal import Decimal
 
 from django.db import models, transaction
+from django.db.models import Case, F, Value, When
 from django.db.models.query import QuerySet
 from django.utils import timezone
 from paypal.standard.ipn.models import PayPalIPN
@@ -241,11 +244,12 @@ def from_source_instance(cls, source_instance: PaymentModel) -> PaymentSource:
         return cls.objects.create(**{attr_name_for_model: source_instance})
 
 
+@transaction.atomic()
 def credit_account(amount: Decimal, to_account: BookingAccount, from_obj: PaymentModel | None):
     Payment.objects.create(
         amount=amount, account=to_account, source_instance=from_obj, processed_at=None, created_at=timezone.now()
     )
-    process_all_payments()
+    process_payments(account_ids=[to_account.id])
 
 
 def build_paypal_custom_field(account: BookingAccount) -> str:
@@ -263,34 +267,76 @@ def parse_paypal_custom_field(custom: str) -> BookingAccount | None:
         return None
 
 
-@transaction.atomic()
-def process_one_payment(payment: Payment):
-    payment.account.receive_payment(payment.amount)
-    payment.processed_at = timezone.now()
-    # Payment uses NoEditMixin which disables save(), so do update()
-    Payment.objects.filter(id=payment.id).update(processed_at=payment.processed_at)
-
-
 # When processing payments, we need to alter the BookingAccount.total_received
 # field, and may need to deal with concurrency, to avoid race conditions that
 # would cause this field to have the wrong value.
 #
-# We arrange for updates to BookingAccount.total_received to be serialised
-# using the function below.
+# We arrange for updates to BookingAccount.total_received to be serialised per
+# account, by taking a row lock on the BookingAccount while its pending
+# payments are processed. Payments to different accounts (e.g. a burst of
+# PayPal IPNs) can therefore be processed concurrently.
 #
 # To support this, the Payment model keeps track of payments to be credited
 # against an account. Any function that needs to transfer funds into an account
-# uses 'cciw.bookings.models.send_payment', which creates Payment objects for
-# later processing, rather than calling BookingAccount.receive_payment directly.
+# uses `credit_account`, which creates Payment objects for later processing,
+# rather than updating BookingAccount.total_received directly.
 
 
 @transaction.atomic()
-def process_all_payments():
-    # Use select_for_update to serialize usages of this function.
-    for payment in (
+def process_payments(*, account_ids: Collection[int] | None = None, skip_locked: bool = False) -> int:
+    """
+    Process all pending payments for the given accounts (or for all accounts
+    if `account_ids` is None), returning the number of payments processed.
+
+    With `skip_locked=True`, accounts that are currently locked by another
+    process are skipped - this is suitable for a background sweep, but not
+    for a caller that needs its own payment to be processed.
+    """
+    accounts = BookingAccount.objects.select_for_update(skip_locked=skip_locked).order_by("id")
+    if account_ids is None:
+        accounts = accounts.filter(id__in=Payment.objects.filter(processed_at__isnull=True).values("account_id"))
+    else:
+        accounts = accounts.filter(id__in=account_ids)
+    locked_account_ids = list(accounts.values_list("id", flat=True))
+    if not locked_account_ids:
+        return 0
+
+    # Since all changes to these accounts are serialised by the lock we have,
+    # no-one else can process these payments.
+    pending_payments = list(
         Payment.objects.select_related(None)
-        .select_for_update()
-        .filter(processed_at__isnull=True)
-        .order_by("created_at")
-    ):
-        process_one_payment(payment)
+        .filter(account_id__in=locked_account_ids, processed_at__isnull=True)
+        .values_list("id", "account_id", "amount")
+    )
+    if not pending_payments:
+        return 0
+
+    totals: dict[int, Decimal] = defaultdict(Decimal)
+    for _, account_id, amount in pending_payments:
+        totals[account_id] += amount
+
+    # Payment uses NoEditMixin which disables save(), so do update()
+    Payment.objects.filter(id__in=[payment_id for payment_id, _, _ in pending_payments]).update(
+        processed_at=timezone.now()
+    )
+    # A single UPDATE for all the accounts:
+    BookingAccount.objects.filter(id__in=totals.keys()).update(
+        total_received=F("total_received")
+        + Case(
+            *[When(id=account_id, then=Value(total)) for account_id, total in totals.items()],
+            output_field=models.DecimalField(decimal_places=2, max_digits=10),
+        )
+    )
+    return len(pending_payments)
+
+
+def process_all_payments() -> int:
+    """
+    Process any pending payments for all accounts, skipping any accounts that
+    are being processed elsewhere.
+
+    This is run every few minutes by django-q, as a safety net for any
+    payments that were recorded without being processed. The schedule is
+    created by a data migration.
+    """
+    return process_payments(skip_locked=True)
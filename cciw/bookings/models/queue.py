@@ -736,7 +736,7 @@ def declined_and_notified_account_count(self) -> int:
 def allocate_places_and_notify(
     ranked_queue_bookings: Sequence[Booking], *, by_user: User | BookingAccount
 ) -> AllocationResult:
-    from cciw.bookings.email import send_places_allocated_emails, send_places_declined_email
+    from cciw.bookings.email import PlaceAllocationMailer
 
     by_account_key: Callable[[Booking], BookingAccount] = lambda b: b.account
     by_account_id_key: Callable[[Booking], int] = lambda b: b.account_id
@@ -752,9 +752,10 @@ def allocate_places_and_notify(
     for booking in to_book:
         booking.queue_entry.save_action_log(action_type=QueueEntryActionLogType.ALLOCATED, by_user=by_user)
 
+    mailer = PlaceAllocationMailer()
     to_book_grouped_by_account = [(a, list(g)) for a, g in itertools.groupby(to_book, key=by_account_key)]
     for account, bookings in to_book_grouped_by_account:
-        send_places_allocated_emails(account, bookings)
+        mailer.add_places_allocated(account, bookings)
     to_book_accounts: list[BookingAccount] = [a for a, _ in to_book_grouped_by_account]
 
     # Decline:
@@ -772,7 +773,9 @@ def allocate_places_and_notify(
     to_decline_and_notify_accounts = [a for a, _ in to_decline_and_notify_grouped_by_account]
 
     for account, bookings in to_decline_and_notify_grouped_by_account:
-        send_places_declined_email(account, bookings)
+        mailer.add_places_declined(account, bookings)
+
+    mailer.send()
 
     return AllocationResult(
         accepted_bookings=to_book,
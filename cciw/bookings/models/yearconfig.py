@@ -43,6 +43,20 @@ class YearConfig(models.Model):
         default=None,
         blank=True,
     )
+    admission_capacity = models.PositiveIntegerField(
+        verbose_name="waiting room first batch",
+        help_text="If set, visitors to the pages for adding places are queued in a waiting room. "
+        "This many are let in straight away, then more are let in each minute (see 'waiting room rate'). "
+        "Admitted visitors are not counted out again. Leave blank for no waiting room.",
+        null=True,
+        default=None,
+        blank=True,
+    )
+    admission_drain_per_minute = models.PositiveIntegerField(
+        verbose_name="waiting room rate",
+        help_text="Number of extra visitors let in from the waiting room each minute",
+        default=50,
+    )
 
     def __str__(self) -> str:
         return f"Config for {self.year}"
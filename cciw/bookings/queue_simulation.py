@@ -0,0 +1,240 @@
+"""
+"What if" simulation of the booking queue, for allocation planning.
+
+`add_queue_cutoffs` decides who gets a place for a camp's current capacity.
+To compare different capacities (more places, different male/female limits,
+places moved between camps), we rank the queue once with
+`rank_queue_bookings`, turn it into arrays, and then evaluate any number of
+scenarios together, without going back to the database.
+
+The cutoffs are worked out without stepping through the queue. Going down the
+ranked queue, a booking is accepted if it is within the limit for its sex, and
+fewer than the total limit have been accepted before it. Before the total limit
+is reached, the number accepted from the first `i` bookings is just
+`min(males_i, male_limit) + min(females_i, female_limit)`, so we can calculate
+that for every position and every scenario at once.
+
+The ranking itself is not re-done for each scenario, so effects of one
+scenario on another camp's ranking (such as `has_other_place_booked`) are not
+included.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from cciw.bookings.models.constants import Sex
+from cciw.bookings.models.queue import PlacesToAllocate, QueueCutoff, rank_queue_bookings
+from cciw.bookings.models.yearconfig import YearConfig
+from cciw.cciwmain.models import Camp, PlacesBooked, PlacesLeft
+
+if TYPE_CHECKING:
+    # numpy is imported inside the functions that need it, to keep it out of
+    # worker startup.
+    import numpy as np
+
+    from cciw.bookings.models import Booking
+
+
+@dataclass(frozen=True)
+class CapacityScenario:
+    """
+    Capacity settings for a camp, with `None` meaning the camp's current value.
+    """
+
+    max_campers: int | None = None
+    max_male_campers: int | None = None
+    max_female_campers: int | None = None
+
+
+@dataclass(frozen=True)
+class ScenarioOutcome:
+    scenario: CapacityScenario
+    places_left: PlacesLeft
+    places_to_allocate: PlacesToAllocate
+    # Groups of siblings in the queue where some get places and some don't:
+    split_sibling_group_count: int
+    rejected_officer_children: Sequence[Booking]
+
+
+class QueueSimulation:
+    """
+    A camp's ranked queue in columnar form, for evaluating capacity scenarios.
+    """
+
+    def __init__(self, *, camp: Camp, ranked_queue_bookings: Sequence[Booking], places_booked: PlacesBooked):
+        import numpy as np
+
+        self.camp = camp
+        self.bookings = list(ranked_queue_bookings)
+        self.places_booked = places_booked
+
+        self.is_male = np.array([b.sex == Sex.MALE for b in self.bookings], dtype=bool)
+        self.is_female = np.array([b.sex == Sex.FEMALE for b in self.bookings], dtype=bool)
+        # add_queue_cutoffs applies the female limit to anyone not male
+        not_male = ~self.is_male
+        # Number of each sex before each position in the queue
+        self.males_before = np.cumsum(self.is_male) - self.is_male
+        self.not_males_before = np.cumsum(not_male) - not_male
+        # Position of each booking among those of the same sex, starting at 1
+        self.sex_rank = np.where(self.is_male, self.males_before, self.not_males_before) + 1
+        self.is_officer_child = np.array([b.queue_entry.officer_child for b in self.bookings], dtype=bool)
+
+        # Sibling groups with more than one booking in the queue, as a
+        # (booking, group) membership matrix.
+        group_indices: dict[str, int] = {}
+        booking_groups = []
+        for b in self.bookings:
+            booking_groups.append(group_indices.setdefault(b.queue_entry.sibling_fuzzy_id, len(group_indices)))
+        booking_groups_array = np.array(booking_groups, dtype=np.intp)
+        group_sizes = np.bincount(booking_groups_array, minlength=len(group_indices))
+        sibling_group_ids = np.flatnonzero(group_sizes > 1)
+        self.sibling_membership = (booking_groups_array[:, None] == sibling_group_ids[None, :]).astype(np.int32)
+        self.sibling_group_sizes = group_sizes[sibling_group_ids]
+
+    @classmethod
+    def for_camp(cls, *, camp: Camp, year_config: YearConfig) -> QueueSimulation:
+        return cls(
+            camp=camp,
+            ranked_queue_bookings=rank_queue_bookings(camp=camp, year_config=year_config),
+            places_booked=camp.get_places_booked(),
+        )
+
+    def get_places_left(self, scenario: CapacityScenario) -> PlacesLeft:
+        camp = self.camp
+        booked = self.places_booked
+        # Same as Camp.get_places_left
+        return PlacesLeft(
+            total=max(_or_default(scenario.max_campers, camp.max_campers) - booked.total, 0),
+            male=max(_or_default(scenario.max_male_campers, camp.max_male_campers) - booked.male, 0),
+            female=max(_or_default(scenario.max_female_campers, camp.max_female_campers) - booked.female, 0),
+        )
+
+    def cutoff_matrices(self, places_left: Sequence[PlacesLeft]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns boolean arrays of shape (scenarios, bookings), for bookings
+        that are after the total cutoff, and after the cutoff for their sex.
+        """
+        import numpy as np
+
+        total, male, female = (
+            np.array([getattr(p, attr) for p in places_left], dtype=np.int64)[:, None]
+            for attr in ["total", "male", "female"]
+        )
+        accepted_before = np.minimum(self.males_before, male) + np.minimum(self.not_males_before, female)
+        sex_limit = np.where(self.is_male, male, female)
+        return (accepted_before >= total), (self.sex_rank > sex_limit)
+
+    def cutoff_states(self, scenario: CapacityScenario) -> list[QueueCutoff]:
+        """
+        The `QueueCutoff` for each booking in the queue, for a single scenario,
+        matching what `add_queue_cutoffs` would set.
+        """
+        after_total, after_sex = self.cutoff_matrices([self.get_places_left(scenario)])
+        states = []
+        for is_after_total, is_after_sex, is_male in zip(
+            after_total[0].tolist(), after_sex[0].tolist(), self.is_male.tolist()
+        ):
+            if is_after_total:
+                states.append(QueueCutoff.AFTER_TOTAL_CUTOFF)
+            elif is_after_sex:
+                states.append(QueueCutoff.AFTER_MALE_CUTOFF if is_male else QueueCutoff.AFTER_FEMALE_CUTOFF)
+            else:
+                states.append(QueueCutoff.ACCEPTED)
+        return states
+
+    def run(self, scenarios: Sequence[CapacityScenario]) -> list[ScenarioOutcome]:
+        places_left = [self.get_places_left(scenario) for scenario in scenarios]
+        after_total, after_sex = self.cutoff_matrices(places_left)
+        accepted = ~after_total & ~after_sex
+        male_counts = (accepted & self.is_male).sum(axis=1).tolist()
+        female_counts = (accepted & self.is_female).sum(axis=1).tolist()
+        total_counts = accepted.sum(axis=1).tolist()
+
+        accepted_per_group = accepted.astype(self.sibling_membership.dtype) @ self.sibling_membership
+        split_counts = ((accepted_per_group > 0) & (accepted_per_group < self.sibling_group_sizes)).sum(axis=1).tolist()
+        rejected_officer_children = ~accepted & self.is_officer_child
+
+        return [
+            ScenarioOutcome(
+                scenario=scenario,
+                places_left=scenario_places_left,
+                places_to_allocate=PlacesToAllocate(
+                    total=total_counts[i],
+                    male=male_counts[i],
+                    female=female_counts[i],
+                ),
+                split_sibling_group_count=split_counts[i],
+                rejected_officer_children=[
+                    self.bookings[j] for j in rejected_officer_children[i].nonzero()[0].tolist()
+                ],
+            )
+            for i, (scenario, scenario_places_left) in enumerate(zip(scenarios, places_left))
+        ]
+
+
+@dataclass(frozen=True)
+class YearScenarioOutcome:
+    outcomes: dict[Camp, ScenarioOutcome] = field(default_factory=dict)
+
+    @property
+    def accepted_count(self) -> int:
+        return sum(outcome.places_to_allocate.total for outcome in self.outcomes.values())
+
+    @property
+    def split_sibling_group_count(self) -> int:
+        return sum(outcome.split_sibling_group_count for outcome in self.outcomes.values())
+
+    @property
+    def rejected_officer_children(self) -> list[Booking]:
+        return [booking for outcome in self.outcomes.values() for booking in outcome.rejected_officer_children]
+
+
+class YearQueueSimulation:
+    """
+    Simulations for all the camps in a year, for scenarios that change the
+    capacity of several camps at once, such as moving places between camps.
+    """
+
+    def __init__(self, simulations: Sequence[QueueSimulation]):
+        self.simulations = list(simulations)
+
+    @classmethod
+    def for_year(cls, *, year_config: YearConfig) -> YearQueueSimulation:
+        camps = Camp.objects.filter(year=year_config.year).order_by("start_date", "camp_name__name")
+        return cls([QueueSimulation.for_camp(camp=camp, year_config=year_config) for camp in camps])
+
+    def run(self, scenarios: Sequence[Mapping[Camp, CapacityScenario]]) -> list[YearScenarioOutcome]:
+        """
+        Each scenario is a mapping from camp to the capacity for that camp.
+        Camps not in the mapping keep their current capacity.
+        """
+        results = [YearScenarioOutcome() for _ in scenarios]
+        for simulation in self.simulations:
+            camp = simulation.camp
+            camp_outcomes = simulation.run([scenario.get(camp, CapacityScenario()) for scenario in scenarios])
+            for result, outcome in zip(results, camp_outcomes):
+                result.outcomes[camp] = outcome
+        return results
+
+
+def transfer_places_scenarios(
+    *, from_camp: Camp, to_camp: Camp, amounts: Iterable[int]
+) -> list[dict[Camp, CapacityScenario]]:
+    """
+    Scenarios for moving each of `amounts` places (in `max_campers`) from one
+    camp to another, for use with `YearQueueSimulation.run`.
+    """
+    return [
+        {
+            from_camp: CapacityScenario(max_campers=from_camp.max_campers - amount),
+            to_camp: CapacityScenario(max_campers=to_camp.max_campers + amount),
+        }
+        for amount in amounts
+    ]
+
+
+def _or_default(value: int | None, default: int) -> int:
+    return default if value is None else value
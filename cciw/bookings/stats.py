@@ -1,15 +1,22 @@
+from __future__ import annotations
+
 from datetime import timedelta
+from typing import TYPE_CHECKING
 
 import datedelta
-import pandas as pd
 from django.db import models
 
 from cciw.utils.stats import accumulate, accumulate_dates, counts
 
 from .models import Booking
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def get_booking_progress_stats(start_year=None, end_year=None, camps=None, overlay_years=False):
+    import pandas as pd
+
     data_dates = {}
     data_rel_days = {}
     if camps:
@@ -42,6 +49,8 @@ def get_booking_progress_stats(start_year=None, end_year=None, camps=None, overl
 
 
 def _fill_gaps(series):
+    import pandas as pd
+
     # pandas 'fillna' method not good enough for us - we want the current year
     # not to be filled until the end of the chart, just missing in-between values
     # to be filled.
@@ -69,6 +78,8 @@ def _fill_gaps(series):
 
 
 def get_booking_summary_stats(start_year, end_year) -> pd.DataFrame:
+    import pandas as pd
+
     rows = (
         Booking.objects.booked()
         .select_related("camp")
@@ -93,6 +104,8 @@ def get_booking_summary_stats(start_year, end_year) -> pd.DataFrame:
 
 
 def get_booking_ages_stats(start_year=None, end_year=None, camps=None, include_total=True) -> pd.DataFrame:
+    import pandas as pd
+
     if camps:
         items = camps
         query_filter = lambda qs, camp: qs.filter(camp=camp)
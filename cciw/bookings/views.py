@@ -17,6 +17,7 @@
 from django.views.decorators.http import require_GET
 from paypal.standard.forms import PayPalPaymentsForm
 
+from cciw.bookings.admission import check_admission
 from cciw.bookings.email import (
     send_added_to_queue_confirmation,
     send_place_cancelled_notification_to_booking_secretary,
@@ -33,6 +34,7 @@
     BOOKING_PLACE_GP_DETAILS,
     Booking,
     BookingAccount,
+    BookingState,
     any_bookings_possible,
     build_paypal_custom_field,
     get_booking_open_data,
@@ -114,18 +116,25 @@ def start(request: HttpRequest) -> HttpResponse:
     target_view_name = "cciw-bookings-verify_and_continue"
     if goto and goto in EXPECTED_BOOKING_LOGIN_VIEWS:
         target_view_name = goto
+    # Issue a waiting room ticket as early as possible, so that the queue is
+    # in order of arrival.
+    admission = check_admission(request)
     if account is not None:
-        return next_step(account)
+        response = next_step(account)
+        admission.set_cookie(response)
+        return response
     if request.method == "POST":
         form = form_class(request.POST)
         if form.is_valid():
             email = form.cleaned_data["email"]
             send_verify_email(booking_account_email=email, target_view_name=target_view_name)
-            return HttpResponseRedirect(reverse("cciw-bookings-email_sent"))
+            response = HttpResponseRedirect(reverse("cciw-bookings-email_sent"))
+            admission.set_cookie(response)
+            return response
     else:
         form = form_class()
 
-    return TemplateResponse(
+    response = TemplateResponse(
         request,
         "cciw/bookings/start.html",
         {
@@ -135,6 +144,8 @@ def start(request: HttpRequest) -> HttpResponse:
             "any_bookings_possible": any_bookings_possible(common.get_thisyear()),
         },
     )
+    admission.set_cookie(response)
+    return response
 
 
 @booking_account_optional
@@ -597,8 +608,9 @@ def mk_paypal_form(
 @booking_account_required
 def pay(request: HttpRequest, *, installment: bool = False) -> TemplateResponse:
     acc: BookingAccount = request.booking_account
-    balance_due_now = acc.get_balance_due_now()
-    balance_full = acc.get_balance_full()
+    financial_summary = acc.get_financial_summary()
+    balance_due_now = financial_summary.balance_due_now
+    balance_full = financial_summary.balance_full
 
     domain = get_current_domain()
     protocol = "https" if request.is_secure() else "http"
@@ -615,7 +627,7 @@ def pay(request: HttpRequest, *, installment: bool = False) -> TemplateResponse:
             "balance_due_now": balance_due_now,
             "balance_full": balance_full,
             "account_id": acc.id,
-            "pending_payment_total": acc.get_pending_payment_total(),
+            "pending_payment_total": financial_summary.pending_payment_total,
             "paypal_form": mk_paypal_form(acc, balance_due_now, protocol, domain),
             "paypal_form_full": mk_paypal_form(acc, balance_full, protocol, domain),
             "paypal_form_custom": mk_paypal_form(
@@ -676,14 +688,20 @@ def account_overview(request: HttpRequest) -> HttpResponse:
     account: BookingAccount = request.booking_account
     year = common.get_thisyear()
     booking_open_data = get_booking_open_data(year)
-    bookings = account.bookings.for_year(year)
-
-    booked_places = bookings.booked().with_prefetch_camp_info()
-    waiting_places = bookings.waiting_in_queue().with_prefetch_camp_info()
-    not_in_queue_places = bookings.not_in_queue()
-    basket_or_shelf_places = (
-        not_in_queue_places.in_basket() | not_in_queue_places.on_shelf()
-    ).with_prefetch_camp_info()
+    # One query for all the bookings, which we partition in memory. The
+    # conditions match the BookingQuerySet methods booked(), waiting_in_queue(),
+    # cancelled(), not_in_queue(), in_basket() and on_shelf().
+    bookings = list(account.bookings.for_year(year).with_prefetch_camp_info().with_queue_info())
+    booked_places = [b for b in bookings if b.state == BookingState.BOOKED]
+    waiting_places = [b for b in bookings if b.is_in_queue and b.state == BookingState.INFO_COMPLETE]
+    cancelled_states = [
+        BookingState.CANCELLED_DEPOSIT_KEPT,
+        BookingState.CANCELLED_HALF_REFUND,
+        BookingState.CANCELLED_FULL_REFUND,
+    ]
+    cancelled_places = [b for b in bookings if b.state in cancelled_states]
+    basket_or_shelf_places = [b for b in bookings if not b.is_in_queue and b.state == BookingState.INFO_COMPLETE]
+    financial_summary = account.get_financial_summary()
     return TemplateResponse(
         request,
         "cciw/bookings/account_overview.html",
@@ -692,12 +710,12 @@ def account_overview(request: HttpRequest) -> HttpResponse:
             "stage": BookingStage.OVERVIEW,
             "booked_places": booked_places,
             "waiting_places": waiting_places,
-            "cancelled_places": bookings.cancelled().with_prefetch_camp_info(),
+            "cancelled_places": cancelled_places,
             "basket_or_shelf_places": basket_or_shelf_places,
-            "balance_due_now": (balance_due_now := account.get_balance_due_now()),
-            "payment_required": balance_due_now > 0,
-            "balance_full": account.get_balance_full(),
-            "pending_payment_total": account.get_pending_payment_total(),
+            "balance_due_now": financial_summary.balance_due_now,
+            "payment_required": financial_summary.payment_required,
+            "balance_full": financial_summary.balance_full,
+            "pending_payment_total": financial_summary.pending_payment_total,
             "booking_open_data": booking_open_data,
         },
     )
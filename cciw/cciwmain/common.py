@@ -10,11 +10,11 @@
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
 from django.utils import timezone
 from django.utils.html import format_html_join
 
-from cciw.cciwmain.forms import render_single_form_field
+from cciw.cciwmain.forms import render_validated_form_field
 
 
 @dataclass
@@ -33,6 +33,9 @@ def htmx_form_validate(*, form_class: type) -> Callable:
     Instead of a normal view, just do htmx validation using the given form class,
     for a single field and return the single div that needs to be replaced.
     Normally the form class will be the same class used in the view body.
+
+    Only the field's own validation is run - see `validate_single_form_field`.
+    Cross-field validation happens when the whole form is submitted.
     """
 
     def decorator(view_func):
@@ -43,9 +46,9 @@ def wrapper(request, *args, **kwargs):
                 and "Hx-Request" in request.headers
                 and (htmx_validation_field := request.GET.get("_validate_field", None))
             ):
-                form = form_class(request.GET)
-                form.is_valid()  # trigger validation
-                return HttpResponse(render_single_form_field(form, htmx_validation_field))
+                if htmx_validation_field not in form_class.base_fields:
+                    return HttpResponseBadRequest()
+                return HttpResponse(render_validated_form_field(form_class, request.GET, htmx_validation_field))
             return view_func(request, *args, **kwargs)
 
         return wrapper
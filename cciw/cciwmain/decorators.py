@@ -37,3 +37,21 @@ def _inner(request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> HttpRespo
         return resp
 
     return _inner
+
+
+def cache_compressed[**P](
+    view_func: Callable[Concatenate[HttpRequest, P], HttpResponse],
+) -> Callable[Concatenate[HttpRequest, P], HttpResponse]:
+    """
+    Marks the response so that `cciw.middleware.compression` caches compressed
+    versions of it. Use for pages that usually have the same content for every
+    visitor.
+    """
+
+    @wraps(view_func)
+    def _inner(request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> HttpResponse:
+        response = view_func(request, *args, **kwargs)
+        response.cache_compressed = True
+        return response
+
+    return _inner
@@ -1,6 +1,10 @@
+from functools import lru_cache
 from typing import Any
 
+from django.core.exceptions import ValidationError
 from django.forms import Form, renderers
+from django.forms.utils import ErrorDict
+from django.http import QueryDict
 from django.utils.safestring import SafeString
 
 
@@ -24,6 +28,14 @@ class CciwFormMixin:
     # Dictionary from field name to label to override normal labels easily
     label_overrides: dict = {}
 
+    # For htmx validation, a dictionary from field name to other fields whose
+    # cleaned values are needed to validate it (e.g. in a `clean_<field>` method)
+    htmx_validation_dependencies: dict[str, list[str]] = {}
+
+    # Set to True if validation of single fields depends only on the submitted
+    # data (not on the database etc.), so results of htmx validation can be cached.
+    htmx_validation_cacheable: bool = False
+
     def should_do_htmx_validation(self) -> bool:
         return self.do_htmx_validation
 
@@ -47,3 +59,58 @@ def render_single_form_field(form: Form, field_name: str) -> SafeString:
         | ({"label_tag": bound_field.label_tag(contents=label_text)} if label_text else {}),
         template_name=form.template_name_p_formrow,
     )
+
+
+def validate_single_form_field(form: Form, field_name: str) -> None:
+    """
+    Validate a single field of a bound form, plus the fields it depends on
+    (see `htmx_validation_dependencies`), populating `form.errors` for just
+    that field. Other fields, and the form's `clean()` method, are not run.
+    """
+    form._errors = ErrorDict()
+    form.cleaned_data = {}
+    for name in form.htmx_validation_dependencies.get(field_name, []) + [field_name]:
+        bound_field = form[name]
+        try:
+            form.cleaned_data[name] = bound_field.field.clean(bound_field.value())
+            if hasattr(form, f"clean_{name}"):
+                form.cleaned_data[name] = getattr(form, f"clean_{name}")()
+        except ValidationError as e:
+            if name == field_name:
+                form.add_error(name, e)
+
+
+def render_validated_form_field(form_class: type[Form], data: QueryDict, field_name: str) -> SafeString:
+    """
+    Validate a single field using the given data, and render the form row for it.
+    """
+    if not form_class.htmx_validation_cacheable:
+        return _render_validated_form_field(form_class, data, field_name)
+
+    # Only the data for the field and its dependencies is relevant. Some
+    # widgets use multiple names with suffixes, so include those.
+    names = form_class.htmx_validation_dependencies.get(field_name, []) + [field_name]
+    relevant_data = tuple(
+        sorted(
+            (key, tuple(values))
+            for key, values in data.lists()
+            if any(key == name or key.startswith(f"{name}_") for name in names)
+        )
+    )
+    return _render_validated_form_field_cached(form_class, relevant_data, field_name)
+
+
+def _render_validated_form_field(form_class: type[Form], data: QueryDict, field_name: str) -> SafeString:
+    form = form_class(data)
+    validate_single_form_field(form, field_name)
+    return render_single_form_field(form, field_name)
+
+
+@lru_cache(maxsize=2000)
+def _render_validated_form_field_cached(
+    form_class: type[Form], relevant_data: tuple[tuple[str, tuple[str, ...]], ...], field_name: str
+) -> SafeString:
+    data = QueryDict(mutable=True)
+    for key, values in relevant_data:
+        data.setlist(key, list(values))
+    return _render_validated_form_field(form_class, data, field_name)
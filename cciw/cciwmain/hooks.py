@@ -1,9 +1,12 @@
 from django.conf import settings
 from django.core.signals import request_started
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django_q.signals import post_spawn
 from django_q.tasks import async_task
 
+from cciw.cciwmain import page_cache
 from cciw.cciwmain.models import Camp, CampName, generate_colors_css
+from cciw.cciwmain.warmup import warm_up_task_worker
 
 
 def generate_colors_css_w(sender: type[CampName], **kwargs):
@@ -34,6 +37,8 @@ def server_startup(sender: type, **kwargs):
 
 request_started.connect(server_startup)
 
+post_spawn.connect(warm_up_task_worker)
+
 
 def recreate_ses_routes_for_camp_creation(sender: type[Camp], created: bool | None = None, **kwargs):
     if not settings.RECREATE_ROUTES_AUTOMATICALLY:
@@ -45,3 +50,14 @@ def recreate_ses_routes_for_camp_creation(sender: type[Camp], created: bool | No
 
 
 post_save.connect(recreate_ses_routes_for_camp_creation, sender=Camp)
+
+
+def invalidate_camp_pages(sender: type, **kwargs):
+    page_cache.invalidate_for_model(Camp)
+
+
+for model in page_cache.get_dependency_models():
+    post_save.connect(page_cache.invalidate_for_model, sender=model)
+    post_delete.connect(page_cache.invalidate_for_model, sender=model)
+
+m2m_changed.connect(invalidate_camp_pages, sender=Camp.leaders.through)
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cciw.utils.loadtests.data import LoadTestDataExists, LoadTestPhase, generate_load_test_year, set_load_test_phase
+
+
+class Command(BaseCommand):
+    help = "Generate a realistic booking year in the local database, for load testing. See docs/development.rst"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=date.today().year + 1)
+        parser.add_argument("--accounts", type=int, default=3000, help="Number of booking accounts to create")
+        parser.add_argument(
+            "--phase",
+            choices=[phase.value for phase in LoadTestPhase],
+            default=LoadTestPhase.BOOKING_OPEN.value,
+            help="The point in the booking year to set up data for",
+        )
+        parser.add_argument("--seed", type=int, default=1, help="Random seed, for reproducible data")
+        parser.add_argument(
+            "--set-phase-only",
+            action="store_true",
+            help="Don't generate any data, just change the dates in the year config to match the phase",
+        )
+
+    def handle(self, *args, year, accounts, phase, seed, set_phase_only, **options):
+        if settings.DEPLOYED:
+            raise CommandError("This command is only for use on a local development database")
+        phase = LoadTestPhase(phase)
+        if set_phase_only:
+            set_load_test_phase(year=year, phase=phase)
+            return
+        try:
+            summary = generate_load_test_year(
+                year=year,
+                accounts=accounts,
+                phase=phase,
+                random_seed=seed,
+                progress=lambda message: self.stdout.write(message + "\n"),
+            )
+        except LoadTestDataExists as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Created {summary}\n")
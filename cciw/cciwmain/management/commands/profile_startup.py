@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter, so that we see everything a new worker imports.
+# Loading the URLconf imports all the view modules.
+STARTUP_SCRIPT = """
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+WARM_UP_SCRIPT = """
+import json, sys
+from cciw.cciwmain.warmup import warm_up
+sys.stdout.write(json.dumps(warm_up()))
+"""
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    # Nesting level, 0 for modules imported directly by the script
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """
+    Parses the output of `python -X importtime`
+    """
+    results = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, module = parts
+        if not self_us.strip().isdigit():
+            # Header line
+            continue
+        name = module.lstrip()
+        results.append(
+            ImportTime(
+                module=name.rstrip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(module) - len(name) - 1) // 2,
+            )
+        )
+    return results
+
+
+class Command(BaseCommand):
+    help = "Show which modules take the most time to import when a worker process starts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=30, help="Number of modules to show")
+        parser.add_argument(
+            "--sort",
+            choices=["self", "cumulative"],
+            default="cumulative",
+            help="Sort by time importing the module itself, or including the modules it imports",
+        )
+        parser.add_argument("--warm-up", action="store_true", help="Also time the warm-up steps")
+
+    def handle(self, *args, limit: int, sort: str, warm_up: bool = False, **options):
+        script = STARTUP_SCRIPT + (WARM_UP_SCRIPT if warm_up else "")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        times = parse_importtime(result.stderr)
+        total_us = sum(t.cumulative_us for t in times if t.depth == 0)
+        key = (lambda t: t.self_us) if sort == "self" else (lambda t: t.cumulative_us)
+        self.stdout.write(f"{'self [ms]':>10} {'cumul [ms]':>10}  module\n")
+        for t in sorted(times, key=key, reverse=True)[:limit]:
+            self.stdout.write(f"{t.self_us / 1000:10.1f} {t.cumulative_us / 1000:10.1f}  {t.module}\n")
+        self.stdout.write(f"\n{len(times)} modules imported, {total_us / 1000:.0f}ms total\n")
+
+        if warm_up:
+            timings = json.loads(result.stdout.strip().splitlines()[-1])
+            self.stdout.write("\nWarm-up:\n")
+            for name, seconds in timings.items():
+                self.stdout.write(f"{seconds * 1000:10.1f}  {name}\n")
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.9 on 2026-10-19 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cciwmain", "0003_alter_campname_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ViewStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("view_name", models.CharField(max_length=255)),
+                ("recorded_on", models.DateField()),
+                ("request_count", models.PositiveIntegerField(default=0)),
+                ("query_count_total", models.PositiveIntegerField(default=0)),
+                ("query_count_max", models.PositiveIntegerField(default=0)),
+                ("duplicate_query_count_total", models.PositiveIntegerField(default=0)),
+                ("duplicate_query_count_max", models.PositiveIntegerField(default=0)),
+                ("worst_duplicate_sql", models.TextField(blank=True, default="")),
+                ("sql_time_total", models.FloatField(default=0)),
+                ("render_time_total", models.FloatField(default=0)),
+                ("response_time_total", models.FloatField(default=0)),
+                ("response_time_histogram", models.JSONField(default=list)),
+                ("query_count_histogram", models.JSONField(default=list)),
+            ],
+            options={
+                "verbose_name_plural": "view stats",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("view_name", "recorded_on"), name="view_stats_unique_view_name_recorded_on"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.9 on 2026-10-19 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cciwmain", "0004_viewstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatabasePoolStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("recorded_on", models.DateField(unique=True)),
+                ("request_count", models.PositiveBigIntegerField(default=0)),
+                ("queued_count", models.PositiveBigIntegerField(default=0)),
+                ("wait_time_total_ms", models.PositiveBigIntegerField(default=0)),
+                ("timeout_count", models.PositiveIntegerField(default=0)),
+                ("connection_count", models.PositiveIntegerField(default=0)),
+                ("connection_time_total_ms", models.PositiveBigIntegerField(default=0)),
+                ("connection_error_count", models.PositiveIntegerField(default=0)),
+                ("connection_lost_count", models.PositiveIntegerField(default=0)),
+                ("max_checked_out", models.PositiveIntegerField(default=0)),
+                ("max_waiting", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "database pool stats",
+            },
+        ),
+    ]
@@ -360,3 +360,69 @@ def generate_colors_css(update_existing=False):
             if update_existing or not os.path.exists(p):
                 with open(p, "wb") as f:
                     f.write(colors_css)
+
+
+class ViewStats(models.Model):
+    """
+    Performance stats for a view on a given day, aggregated from a sample of
+    requests. See `cciw.view_stats`.
+    """
+
+    view_name = models.CharField(max_length=255)
+    recorded_on = models.DateField()
+    request_count = models.PositiveIntegerField(default=0)
+    query_count_total = models.PositiveIntegerField(default=0)
+    query_count_max = models.PositiveIntegerField(default=0)
+    # Queries that were repeats of the same SQL in the same request - usually
+    # an indication of an N+1 problem.
+    duplicate_query_count_total = models.PositiveIntegerField(default=0)
+    duplicate_query_count_max = models.PositiveIntegerField(default=0)
+    worst_duplicate_sql = models.TextField(default="", blank=True)
+    # Times in seconds:
+    sql_time_total = models.FloatField(default=0)
+    render_time_total = models.FloatField(default=0)
+    response_time_total = models.FloatField(default=0)
+    response_time_histogram = models.JSONField(default=list)
+    query_count_histogram = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name_plural = "view stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["view_name", "recorded_on"], name="view_stats_unique_view_name_recorded_on"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.view_name} {self.recorded_on}"
+
+
+class DatabasePoolStats(models.Model):
+    """
+    Database connection pool stats for a day, added up over all processes.
+    See `cciw.view_stats`.
+    """
+
+    recorded_on = models.DateField(unique=True)
+    # Requests for a connection from the pool, those that had to wait, and
+    # total time waiting (ms):
+    request_count = models.PositiveBigIntegerField(default=0)
+    queued_count = models.PositiveBigIntegerField(default=0)
+    wait_time_total_ms = models.PositiveBigIntegerField(default=0)
+    # Requests that timed out or failed waiting for a connection:
+    timeout_count = models.PositiveIntegerField(default=0)
+    # New connections made by the pool, and total time taken (ms):
+    connection_count = models.PositiveIntegerField(default=0)
+    connection_time_total_ms = models.PositiveBigIntegerField(default=0)
+    connection_error_count = models.PositiveIntegerField(default=0)
+    # Connections found to be broken when checked:
+    connection_lost_count = models.PositiveIntegerField(default=0)
+    # Highest values seen in any one process, when sampled:
+    max_checked_out = models.PositiveIntegerField(default=0)
+    max_waiting = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "database pool stats"
+
+    def __str__(self) -> str:
+        return f"Database pool stats {self.recorded_on}"
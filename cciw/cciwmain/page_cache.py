@@ -0,0 +1,153 @@
+"""
+Full-page cache of public pages, for anonymous visitors.
+
+Public pages change only when something is edited in the admin, but without
+caching every visit renders the page, running the context processor and the
+menu, chunk and camp queries. Views decorated with `anonymous_page_cache`
+have their rendered content stored in the cache, and served to visitors who
+have none of the cookies that could make the page different for them (logged
+in users, booking accounts, pending messages).
+
+Pages are invalidated using dependency tags. Each page depends on some models,
+and saving or deleting any instance of one of them increments that model's
+version number in the cache. A page's cache key includes the current versions
+of its tags, so the next request after a save renders a fresh page. The key
+also includes today's date, since some content (such as whether a camp is open
+for bookings) depends on it.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from functools import wraps
+from hashlib import md5
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import models, transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+# Backstop, in case a change is not covered by the tags.
+PAGE_CACHE_TIMEOUT = timedelta(hours=6)
+
+# All models that can be used as dependencies.
+PAGE_CACHE_DEPENDENCIES = [
+    "bookings.YearConfig",
+    "cciwmain.Camp",
+    "cciwmain.CampName",
+    "cciwmain.Person",
+    "cciwmain.Site",
+    "sitecontent.HtmlChunk",
+    "sitecontent.MenuLink",
+]
+
+# Dependencies of every page, because of the menu and `thisyear` (which is
+# calculated from camps) in the standard templates.
+BASE_DEPENDENCIES = ["cciwmain.Camp", "sitecontent.MenuLink"]
+
+# Any of these cookies mean the page could be different for the visitor.
+BYPASS_COOKIES = [
+    settings.SESSION_COOKIE_NAME,
+    "bookingaccount",  # See cciw.bookings.middleware
+    CookieStorage.cookie_name,
+]
+
+
+def anonymous_page_cache[**P](*, depends_on: list[str]) -> Callable:
+    """
+    Caches the view's response for anonymous visitors. `depends_on` is a list
+    of model labels from PAGE_CACHE_DEPENDENCIES that the page content comes
+    from, in addition to BASE_DEPENDENCIES.
+    """
+    tags = sorted(set(BASE_DEPENDENCIES + depends_on))
+    for tag in tags:
+        if tag not in PAGE_CACHE_DEPENDENCIES:
+            raise ValueError(f"{tag} is not in PAGE_CACHE_DEPENDENCIES")
+
+    def decorator(view_func: Callable[P, HttpResponse]) -> Callable[P, HttpResponse]:
+        @wraps(view_func)
+        def _inner(request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> HttpResponse:
+            if not is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            key = get_page_cache_key(request, tags)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, (response.content, response["Content-Type"]), PAGE_CACHE_TIMEOUT.total_seconds())
+            return response
+
+        return _inner
+
+    return decorator
+
+
+def is_cacheable_request(request: HttpRequest) -> bool:
+    return (
+        settings.ANONYMOUS_PAGE_CACHE
+        and request.method in ("GET", "HEAD")
+        # Query strings are rare on these pages, and allowing them would let
+        # anyone fill the cache with junk.
+        and not request.GET
+        and "HX-Request" not in request.headers
+        and not any(cookie in request.COOKIES for cookie in BYPASS_COOKIES)
+    )
+
+
+def get_page_cache_key(request: HttpRequest, tags: list[str]) -> str:
+    versions = get_tag_versions(tags)
+    url_hash = md5(request.build_absolute_uri().encode("utf-8"), usedforsecurity=False).hexdigest()
+    version_str = ":".join(str(versions[tag]) for tag in tags)
+    return f"cciw.page_cache:{timezone.localdate().isoformat()}:{url_hash}:{version_str}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"cciw.page_cache.tag:{tag}"
+
+
+def get_tag_versions(tags: list[str]) -> dict[str, int]:
+    keys = {tag: _tag_key(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        if key in found:
+            versions[tag] = found[key]
+        else:
+            # We start from a time-based value rather than zero, so that if the
+            # version is evicted from the cache we don't go back to a version
+            # that might have stale pages stored under it.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[tag] = cache.get(key)
+    return versions
+
+
+def invalidate_tag(tag: str) -> None:
+    key = _tag_key(tag)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not in cache
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_for_model(sender: type[models.Model], **kwargs) -> None:
+    tag = sender._meta.label
+    invalidate_tag(tag)
+    # A request between now and the commit could cache a page with the old
+    # data under the new version, so we invalidate again after the commit.
+    transaction.on_commit(lambda: invalidate_tag(tag))
+
+
+def get_dependency_models() -> list[type[models.Model]]:
+    return [apps.get_model(label) for label in PAGE_CACHE_DEPENDENCIES]
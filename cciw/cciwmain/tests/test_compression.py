@@ -0,0 +1,101 @@
+import gzip
+
+import brotli
+import pytest
+import zstandard
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import reverse
+
+from cciw.cciwmain.decorators import cache_compressed
+from cciw.middleware.compression import choose_encoding, compress_response, compression_middleware, is_compressible
+
+from . import factories
+
+ENCODINGS = ["zstd", "br", "gzip"]
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate, br, zstd", ENCODINGS) == "zstd"
+    assert choose_encoding("gzip, deflate, br", ENCODINGS) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", ENCODINGS) == "gzip"
+    assert choose_encoding("br;q=0, *", ENCODINGS) == "zstd"
+    assert choose_encoding("deflate", ENCODINGS) is None
+    assert choose_encoding("", ENCODINGS) is None
+    assert choose_encoding("gzip;q=0", ENCODINGS) is None
+    assert choose_encoding("br, gzip", ["gzip"]) == "gzip"
+
+
+def test_is_compressible():
+    assert is_compressible("text/html; charset=utf-8")
+    assert is_compressible("application/json")
+    assert is_compressible("image/svg+xml")
+    assert not is_compressible("image/png")
+    assert not is_compressible("application/pdf")
+    assert not is_compressible("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+def test_already_compressed_content_type_skipped():
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "gzip"})
+    response = compress_response(
+        request,
+        HttpResponse(b"x" * 1000, content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    )
+    assert not response.has_header("Content-Encoding")
+    assert response.content == b"x" * 1000
+
+
+def test_streaming_uses_gzip():
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "br, gzip"})
+    response = compress_response(request, StreamingHttpResponse([b"x" * 1000] * 3))
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)) == b"x" * 3000
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "encoding,decompress",
+    [("zstd", zstandard.ZstdDecompressor().decompress), ("br", brotli.decompress), ("gzip", gzip.decompress)],
+)
+def test_cached_compressed_page(client, encoding, decompress):
+    camp = factories.create_camp()
+    url = reverse("cciw-cciwmain-camps_detail", kwargs=dict(year=camp.year, slug=camp.slug_name))
+    plain = client.get(url)
+    assert not plain.has_header("Content-Encoding")
+
+    response = client.get(url, headers={"Accept-Encoding": encoding})
+    assert response["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response["Vary"]
+    assert decompress(response.content) == plain.content
+    etag = response["ETag"]
+    assert etag.startswith('W/"')
+    assert cache.get(f"cciw.middleware.compression:{encoding}:{etag[3:-1]}") == response.content
+
+    # Same bytes from the cache the second time
+    assert client.get(url, headers={"Accept-Encoding": encoding}).content == response.content
+
+
+def test_uncached_response_uses_gzip():
+    # zstd and Brotli have no BREACH mitigation, so aren't used for dynamic responses
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "zstd, br, gzip"})
+    response = compress_response(request, HttpResponse(b"x" * 1000))
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == b"x" * 1000
+
+
+@pytest.mark.django_db
+def test_cached_page_with_csrf_token_uses_gzip():
+    # A CSRF token makes the page specific to the visitor, even if the view is
+    # marked with cache_compressed.
+    @cache_compressed
+    def view(request):
+        template = engines["django"].from_string("{% csrf_token %}" + "x" * 1000)
+        return HttpResponse(template.render({}, request))
+
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "zstd, br, gzip"})
+    response = compression_middleware(CsrfViewMiddleware(view))(request)
+    assert response["Content-Encoding"] == "gzip"
+    assert b"csrfmiddlewaretoken" in gzip.decompress(response.content)
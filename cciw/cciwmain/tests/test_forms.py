@@ -0,0 +1,41 @@
+from django import forms
+
+from cciw.cciwmain.forms import CciwFormMixin, validate_single_form_field
+
+
+class DatesForm(CciwFormMixin, forms.Form):
+    start_date = forms.DateField()
+    end_date = forms.DateField()
+    notes = forms.CharField()
+
+    htmx_validation_dependencies = {"end_date": ["start_date"]}
+
+    def clean_end_date(self):
+        start_date = self.cleaned_data.get("start_date")
+        end_date = self.cleaned_data["end_date"]
+        if start_date is not None and end_date < start_date:
+            raise forms.ValidationError("End date must be after start date")
+        return end_date
+
+
+def test_validate_single_form_field():
+    form = DatesForm({"start_date": "2025-07-10", "end_date": "2025-07-01", "notes": ""})
+    validate_single_form_field(form, "end_date")
+    assert form.errors == {"end_date": ["End date must be after start date"]}
+
+    # Errors in dependencies are not reported
+    form = DatesForm({"start_date": "x", "end_date": "2025-07-01", "notes": ""})
+    validate_single_form_field(form, "end_date")
+    assert form.errors == {}
+
+    form = DatesForm({"start_date": "x", "end_date": "2025-07-01", "notes": ""})
+    validate_single_form_field(form, "notes")
+    assert form.errors == {"notes": ["This field is required."]}
+
+
+def test_validate_single_form_field_disabled():
+    # Disabled fields use their initial value, as with full form validation
+    form = DatesForm({"start_date": "x", "end_date": "2025-07-01", "notes": ""}, initial={"start_date": "2025-07-10"})
+    form.fields["start_date"].disabled = True
+    validate_single_form_field(form, "end_date")
+    assert form.errors == {"end_date": ["End date must be after start date"]}
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from time_machine import travel
+
+from cciw.bookings.factories import create_year_config
+from cciw.cciwmain.page_cache import get_page_cache_key
+from cciw.officers.tests.factories import create_officer
+from cciw.sitecontent.models import HtmlChunk
+
+from . import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def test_anonymous_page_cached(client, django_assert_num_queries):
+    camp = factories.create_camp()
+    url = reverse("cciw-cciwmain-camps_detail", kwargs=dict(year=camp.year, slug=camp.slug_name))
+    first = client.get(url)
+    assert first.status_code == 200
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content
+
+
+def test_invalidated_by_save(client):
+    camp = factories.create_camp(camp_name="Blue", site=factories.create_site(short_name="The Farm"))
+    url = reverse("cciw-cciwmain-camps_detail", kwargs=dict(year=camp.year, slug=camp.slug_name))
+    client.get(url)
+
+    camp.site.short_name = "The Big Farm"
+    camp.site.save()
+    assert b"The Big Farm" in client.get(url).content
+
+    camp.leaders.add(factories.create_person(name="Joe Bloggs"))
+    assert b"Joe Bloggs" in client.get(url).content
+
+    camp.leaders.all()[0].delete()
+    assert b"Joe Bloggs" not in client.get(url).content
+
+
+def test_tags_are_targeted(client, django_assert_num_queries):
+    camp = factories.create_camp()
+    url = reverse("cciw-cciwmain-camps_detail", kwargs=dict(year=camp.year, slug=camp.slug_name))
+    client.get(url)
+
+    # Camp pages don't depend on HTML chunks
+    HtmlChunk.objects.create(name="test", html="<p>Test</p>")
+    with django_assert_num_queries(0):
+        client.get(url)
+
+    create_year_config(year=camp.year)
+    with CaptureQueriesContext(connection) as captured:
+        client.get(url)
+    assert len(captured) > 0
+
+
+def test_bypassed_with_cookies(client):
+    camp = factories.create_camp()
+    url = reverse("cciw-cciwmain-camps_detail", kwargs=dict(year=camp.year, slug=camp.slug_name))
+    client.get(url)
+
+    client.cookies["bookingaccount"] = "123"
+    with CaptureQueriesContext(connection) as captured:
+        client.get(url)
+    assert len(captured) > 0
+
+    del client.cookies["bookingaccount"]
+    client.force_login(create_officer())
+    with CaptureQueriesContext(connection) as captured:
+        client.get(url)
+    assert len(captured) > 0
+
+
+def test_key_uses_local_date():
+    # The date in the key follows Django's current time zone
+    request = RequestFactory().get("/")
+    with travel("2025-07-01 20:00:00+00:00"):
+        assert ":2025-07-01:" in get_page_cache_key(request, ["camps"])
+        with timezone.override("Asia/Tokyo"):
+            assert ":2025-07-02:" in get_page_cache_key(request, ["camps"])
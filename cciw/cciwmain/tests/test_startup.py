@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.contrib.sites import models as sites_models
+from django.contrib.sites.models import Site
+from django.template import engines
+
+from cciw.cciwmain.management.commands.profile_startup import parse_importtime
+from cciw.cciwmain.warmup import WARM_UP_TEMPLATES, warm_up
+
+
+def test_heavy_modules_not_imported_on_startup():
+    script = """
+import sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(",".join(name for name in ["numpy", "pandas", "openpyxl", "pandas_highcharts"] if name in sys.modules))
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=os.environ.copy())
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.django_db
+def test_warm_up(django_assert_max_num_queries):
+    Site.objects.clear_cache()
+    with django_assert_max_num_queries(2):
+        timings = warm_up()
+    assert set(timings) == {"url_resolver", "templates", "site_config"}
+    assert sites_models.SITE_CACHE
+
+    # Templates are cached, so don't need loading again:
+    engine = engines["django"].engine
+    if engine.debug:
+        return
+    cached_loader = engine.template_loaders[0]
+    assert all(any(key.startswith(name) for key in cached_loader.get_template_cache) for name in WARM_UP_TEMPLATES)
+
+
+def test_parse_importtime():
+    output = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   encodings
+import time:      1000 |       1420 | cciw.urls
+Some other output
+"""
+    times = parse_importtime(output)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in times] == [
+        ("_io", 120, 120, 2),
+        ("encodings", 300, 420, 1),
+        ("cciw.urls", 1000, 1420, 0),
+    ]
@@ -7,9 +7,15 @@
 from django.utils.html import format_html
 
 from cciw.cciwmain import common
+from cciw.cciwmain.decorators import cache_compressed
 from cciw.cciwmain.models import Camp
+from cciw.cciwmain.page_cache import anonymous_page_cache
 
+CAMP_PAGE_DEPENDENCIES = ["cciwmain.Camp", "cciwmain.CampName", "cciwmain.Person", "cciwmain.Site"]
 
+
+@cache_compressed
+@anonymous_page_cache(depends_on=CAMP_PAGE_DEPENDENCIES)
 def index(request: HttpRequest, year: int | None = None) -> TemplateResponse:
     """
     Displays a list of all camps, or all camps in a given year.
@@ -30,6 +36,8 @@ def index(request: HttpRequest, year: int | None = None) -> TemplateResponse:
     )
 
 
+@cache_compressed
+@anonymous_page_cache(depends_on=CAMP_PAGE_DEPENDENCIES + ["bookings.YearConfig"])
 def detail(request: HttpRequest, year: int, slug: str) -> TemplateResponse:
     """
     Shows details of a specific camp.
@@ -57,6 +65,8 @@ def detail(request: HttpRequest, year: int, slug: str) -> TemplateResponse:
     )
 
 
+@cache_compressed
+@anonymous_page_cache(depends_on=CAMP_PAGE_DEPENDENCIES + ["sitecontent.HtmlChunk"])
 def thisyear(request: HttpRequest) -> TemplateResponse:
     year = common.get_thisyear()
     return TemplateResponse(
@@ -2,9 +2,13 @@
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
 
+from cciw.cciwmain.decorators import cache_compressed
 from cciw.cciwmain.models import Site
+from cciw.cciwmain.page_cache import anonymous_page_cache
 
 
+@cache_compressed
+@anonymous_page_cache(depends_on=["cciwmain.Site"])
 def index(request: HttpRequest) -> TemplateResponse:
     return TemplateResponse(
         request,
@@ -16,6 +20,8 @@ def index(request: HttpRequest) -> TemplateResponse:
     )
 
 
+@cache_compressed
+@anonymous_page_cache(depends_on=["cciwmain.Site"])
 def detail(request: HttpRequest, slug: str) -> TemplateResponse:
     return TemplateResponse(
         request,
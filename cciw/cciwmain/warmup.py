@@ -0,0 +1,94 @@
+"""
+Warm-up of a new web or task worker process.
+
+The first request to a freshly started worker otherwise pays for building the
+URL resolver, compiling the templates it uses and loading the current `Site`,
+which after a deploy (when every worker restarts at once) shows up as a burst
+of slow responses. `warm_up` does that work up front. It is called from
+`cciw.wsgi` before gunicorn hands the application any traffic, and from the
+django-q `post_spawn` signal for task workers (see `cciw.cciwmain.hooks`).
+
+See also the `profile_startup` management command, for finding out where the
+time goes on startup.
+"""
+
+import logging
+import time
+
+from django.contrib.sites.models import Site
+from django.db import connections
+from django.template import TemplateDoesNotExist, loader
+from django.urls import get_resolver
+
+from cciw.cciwmain.common import get_thisyear
+
+logger = logging.getLogger(__name__)
+
+# Base templates and the most visited pages. Templates that these extend or
+# include are compiled and cached along with them.
+WARM_UP_TEMPLATES = [
+    "cciw/home.html",
+    "cciw/chunk_page.html",
+    "cciw/bookings/index.html",
+    "cciw/bookings/account_overview.html",
+    "cciw/bookings/list_bookings.html",
+    "cciw/officers/index.html",
+    "cciw/officers/applications.html",
+    "404.html",
+    "500.html",
+]
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Prime per-process caches, returning the time taken for each step, in
+    seconds. Failures are logged rather than raised, so that a problem here
+    (such as the database not being available yet) can't stop a worker from
+    starting.
+    """
+    timings = {}
+    for name, func in [
+        ("url_resolver", warm_up_url_resolver),
+        ("templates", warm_up_templates),
+        ("site_config", warm_up_site_config),
+    ]:
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            logger.exception("Error in warm-up step %s", name)
+        timings[name] = time.perf_counter() - start
+    logger.info("Warm-up done: %s", ", ".join(f"{name} {t * 1000:.0f}ms" for name, t in timings.items()))
+    return timings
+
+
+def warm_up_url_resolver() -> None:
+    resolver = get_resolver()
+    # Accessing these populates the reverse lookup tables for all URLconfs.
+    resolver.reverse_dict  # noqa: B018
+    resolver.namespace_dict  # noqa: B018
+    resolver.app_dict  # noqa: B018
+
+
+def warm_up_templates() -> None:
+    for template_name in WARM_UP_TEMPLATES:
+        try:
+            loader.get_template(template_name)
+        except TemplateDoesNotExist:
+            logger.warning("Warm-up template %s does not exist", template_name)
+
+
+def warm_up_site_config() -> None:
+    Site.objects.get_current()
+    get_thisyear()
+
+
+def warm_up_web_worker() -> None:
+    warm_up()
+    # With `gunicorn --preload`, worker processes are forked after this, and
+    # must not share database connections.
+    connections.close_all()
+
+
+def warm_up_task_worker(sender, proc_name: str, **kwargs) -> None:
+    warm_up()
@@ -29,6 +29,8 @@ class Meta:
 
 
 class ValidationContactUsForm(ContactUsForm):
+    htmx_validation_cacheable = True
+
     class Meta:
         model = Message
         fields = [f for f in ContactUsForm.Meta.fields if f != "cx"]
@@ -176,3 +176,29 @@ def test_reclassify(self):
         assert len(mail.outbox) == 1
         assert sorted(mail.outbox[0].to) == sorted(settings.EMAIL_RECIPIENTS["BOOKING_SECRETARY"])
         assert Message.objects.count() == 1
+
+
+def test_htmx_validate_single_field(client, db):
+    response = client.get(
+        CONTACT_US_URL,
+        {"email": "not an email", "message": "", "_validate_field": "email"},
+        headers={"HX-Request": "true"},
+    )
+    content = response.content.decode("utf-8")
+    assert 'id="id_email"' in content
+    assert "Enter a valid email address" in content
+    assert 'id="id_message"' not in content
+
+    response = client.get(
+        CONTACT_US_URL,
+        {"email": "me@example.com", "message": "", "_validate_field": "email"},
+        headers={"HX-Request": "true"},
+    )
+    assert "Enter a valid email address" not in response.content.decode("utf-8")
+    # Other fields are not validated, so `message` being empty doesn't matter
+    assert "This field is required" not in response.content.decode("utf-8")
+
+
+def test_htmx_validate_unknown_field(client, db):
+    response = client.get(CONTACT_US_URL, {"_validate_field": "foo"}, headers={"HX-Request": "true"})
+    assert response.status_code == 400
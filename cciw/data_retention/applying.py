@@ -39,6 +39,7 @@
 from cciw.bookings.models.queue import BookingQueueEntry
 from cciw.contact_us.models import Message
 from cciw.data_retention.datatypes import Policy
+from cciw.mail.models import IncomingMailRecord
 from cciw.officers.models import Application
 
 from .datatypes import ErasureMethod, ForeverType, Group, ModelDetail
@@ -385,6 +386,9 @@ def find_erasure_method(field: CharField) -> CharFieldErasure:
     mailer_models.MessageLog: lambda now: mailer_models.MessageLog.objects.all(),
     # PayPal records must be kept as financial records
     PayPalIPN: lambda now: PayPalIPN.objects.filter(created_at__lt=now - KEEP_FINANCIAL_RECORDS_FOR),
+    # Only needed while notifications for the message could be repeated, which
+    # the retention period covers:
+    IncomingMailRecord: lambda now: IncomingMailRecord.objects.all(),
 }
 
 OLDER_THAN_METHODS = {
@@ -400,6 +404,7 @@ def find_erasure_method(field: CharField) -> CharFieldErasure:
     mailer_models.Message: lambda qs, before_datetime: qs.filter(when_added__lt=before_datetime),
     mailer_models.MessageLog: lambda qs, before_datetime: qs.filter(when_added__lt=before_datetime),
     PayPalIPN: lambda qs, before_datetime: qs.filter(created_at__lt=before_datetime),
+    IncomingMailRecord: lambda qs, before_datetime: qs.filter(created_at__lt=before_datetime),
 }
 
 
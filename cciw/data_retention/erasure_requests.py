@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -61,18 +62,58 @@ def as_json(self) -> dict[str, int | str]:
         }
 
 
-def create_filter(field: str, query_term: str) -> Q:
-    # TODO support multiple email addresses
-    if "@" in query_term:
-        return Q(**{f"{field}__iexact": query_term})
-    else:
-        return Q(**{f"{field}__icontains": query_term})
-
+def parse_query_terms(query: str) -> list[str]:
+    """
+    Split a search query into separate terms. Multiple terms (e.g. several
+    email addresses for the same person) can be separated by commas,
+    semicolons or new lines.
+    """
+    return [term for term in (t.strip().lower() for t in re.split(r"[,;\n]", query)) if term]
+
+
+def create_filter(terms: list[str], *, email: str, names: list[str], postcodes: list[str]) -> Q:
+    """
+    Build a filter that matches any of the terms against the personal data
+    fields of a model.
+
+    Email addresses are matched exactly (case-insensitive). Other terms are
+    matched as substrings against email, name and post code fields. For names
+    that are split across several fields, every word in the term has to match
+    one of the name fields.
+
+    The substring matches are backed by trigram indexes - see migration
+    `data_retention.0003_personal_data_search_indexes`.
+    """
+    q = Q(pk__in=[])
+    for term in terms:
+        if "@" in term:
+            q |= Q(**{f"{email}__iexact": term})
+            continue
+        q |= Q(**{f"{email}__icontains": term})
+        for postcode in postcodes:
+            q |= Q(**{f"{postcode}__icontains": term})
+        name_q = Q()
+        for word in term.split():
+            word_q = Q(pk__in=[])
+            for name in names:
+                word_q |= Q(**{f"{name}__icontains": word})
+            name_q &= word_q
+        q |= name_q
+    return q
+
+
+# For each model, a function that takes a list of query terms and a tag
+# expression, and returns a `values_list()` query returning (tag, id, email,
+# name). These need to have the same shape so that they can be combined in a
+# single UNION query.
 
 SEARCH_QUERIES = [
     (
         User,
-        lambda query_term: User.objects.filter(create_filter("email", query_term)).values_list(
+        lambda terms, tag: User.objects.filter(
+            create_filter(terms, email="email", names=["first_name", "last_name"], postcodes=[])
+        ).values_list(
+            tag,
             "id",
             "email",
             Concat(F("first_name"), Value(" "), F("last_name")),
@@ -80,7 +121,10 @@ def create_filter(field: str, query_term: str) -> Q:
     ),
     (
         Application,
-        lambda query_term: Application.objects.filter(create_filter("address_email", query_term)).values_list(
+        lambda terms, tag: Application.objects.filter(
+            create_filter(terms, email="address_email", names=["full_name"], postcodes=["address_postcode"])
+        ).values_list(
+            tag,
             "id",
             "address_email",
             "full_name",
@@ -88,7 +132,10 @@ def create_filter(field: str, query_term: str) -> Q:
     ),
     (
         BookingAccount,
-        lambda query_term: BookingAccount.objects.filter(create_filter("email", query_term)).values_list(
+        lambda terms, tag: BookingAccount.objects.filter(
+            create_filter(terms, email="email", names=["name"], postcodes=["address_post_code"])
+        ).values_list(
+            tag,
             "id",
             "email",
             "name",
@@ -96,7 +143,10 @@ def create_filter(field: str, query_term: str) -> Q:
     ),
     (
         Booking,
-        lambda query_term: Booking.objects.filter(create_filter("email", query_term)).values_list(
+        lambda terms, tag: Booking.objects.filter(
+            create_filter(terms, email="email", names=["first_name", "last_name"], postcodes=["address_post_code"])
+        ).values_list(
+            tag,
             "id",
             "email",
             Concat(F("first_name"), Value(" "), F("last_name")),
@@ -104,7 +154,10 @@ def create_filter(field: str, query_term: str) -> Q:
     ),
     (
         PayPalIPN,
-        lambda query_term: PayPalIPN.objects.filter(create_filter("payer_email", query_term)).values_list(
+        lambda terms, tag: PayPalIPN.objects.filter(
+            create_filter(terms, email="payer_email", names=["first_name", "last_name"], postcodes=["address_zip"])
+        ).values_list(
+            tag,
             "id",
             "payer_email",
             Concat(F("first_name"), Value(" "), F("last_name")),
@@ -112,7 +165,10 @@ def create_filter(field: str, query_term: str) -> Q:
     ),
     (
         Message,
-        lambda query_term: Message.objects.filter(create_filter("email", query_term)).values_list(
+        lambda terms, tag: Message.objects.filter(
+            create_filter(terms, email="email", names=["name"], postcodes=[])
+        ).values_list(
+            tag,
             "id",
             "email",
             "name",
@@ -126,26 +182,29 @@ def create_filter(field: str, query_term: str) -> Q:
 SEARCH_QUERIES_MODELS = [m for m, f in SEARCH_QUERIES]
 
 
-def data_erasure_request_search(query_term: str) -> list[SearchResult]:
-    query_term = query_term.strip().lower()
-
-    results = []
-    for model, query_func in SEARCH_QUERIES:
-        query = query_func(query_term)
-        assert model == query.model
-        results.extend(
-            [
-                SearchResult(
-                    pk=item[0],
-                    model=model,
-                    email=item[1],
-                    name=item[2],
-                )
-                for item in query
-            ]
+def data_erasure_request_search(query: str) -> list[SearchResult]:
+    terms = parse_query_terms(query)
+    if not terms:
+        return []
+
+    # We run a single UNION ALL query over all the models, with the index into
+    # SEARCH_QUERIES as the first column so we can tell the rows apart.
+    combined = None
+    for idx, (model, query_func) in enumerate(SEARCH_QUERIES):
+        model_query = query_func(terms, Value(idx)).order_by()
+        assert model == model_query.model
+        combined = model_query if combined is None else combined.union(model_query, all=True)
+
+    rows = sorted(combined, key=lambda row: (row[0], row[1]))
+    return [
+        SearchResult(
+            pk=pk,
+            model=SEARCH_QUERIES[idx][0],
+            email=email,
+            name=name,
         )
-
-    return results
+        for idx, pk, email, name in rows
+    ]
 
 
 @dataclass(kw_only=True)
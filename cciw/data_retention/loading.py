@@ -2,6 +2,7 @@
 Parse and load data retention policy
 """
 
+import os
 from collections.abc import Mapping
 from datetime import timedelta
 
@@ -33,10 +34,41 @@ def parse_keep(keep_value: str) -> Keep:
 # Parse and load whole policy
 
 
+# The parsed policy, cached in-process and keyed on the file's fingerprint,
+# so that all callers share it and we only parse again when the file changes.
+_policy_cache: dict[tuple, Policy] = {}
+
+
+def policy_file_fingerprint(filename: str | os.PathLike) -> tuple[int, int]:
+    """
+    Returns a value that changes when the file changes (modification time and size)
+    """
+    stat = os.stat(filename)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 def load_data_retention_policy(available_erasure_methods: Mapping[str, ErasureMethod]) -> Policy:
     """
-    Loads data_retention.yaml
+    Loads data_retention.yaml, using a cached copy if the file hasn't changed.
+    The returned Policy is shared, and must not be modified.
     """
+    filename = settings.DATA_RETENTION_CONFIG_FILE
+    key = (
+        str(filename),
+        policy_file_fingerprint(filename),
+        tuple((name, id(method)) for name, method in available_erasure_methods.items()),
+    )
+    policy = _policy_cache.get(key)
+    if policy is None:
+        policy = parse_data_retention_policy(filename, available_erasure_methods)
+        _policy_cache.clear()
+        _policy_cache[key] = policy
+    return policy
+
+
+def parse_data_retention_policy(
+    filename: str | os.PathLike, available_erasure_methods: Mapping[str, ErasureMethod]
+) -> Policy:
     # This method parses (and validates) data_retention.yaml, and also converts
     # from more "human readable" names like "tables", "columns" etc. into the
     # kind of things we actually want to use from code ("model", "fields").
@@ -47,8 +79,8 @@ def load_data_retention_policy(available_erasure_methods: Mapping[str, ErasureMe
     # File format/validity errors are allowed to propogate.
     # Other errors are handled more gracefully by get_data_retention_policy_issues.
     # Either way, we don't pass "manage.py check" if there are any problems.
-    filename = settings.DATA_RETENTION_CONFIG_FILE
-    policy_yaml = yaml.load(open(filename), Loader=yaml.SafeLoader)
+    with open(filename) as f:
+        policy_yaml = yaml.load(f, Loader=yaml.SafeLoader)
     groups = []
     for yaml_group in policy_yaml:
         yaml_rules = yaml_group.pop("rules")
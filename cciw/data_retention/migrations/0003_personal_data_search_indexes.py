@@ -0,0 +1,45 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Trigram indexes to support the `icontains`/`iexact` lookups done by
+# `cciw.data_retention.erasure_requests.data_erasure_request_search`.
+#
+# Django implements these lookups as `UPPER("column"::text) LIKE UPPER(...)`,
+# so the indexes are on the same expression. These are done here rather than
+# on the models themselves because one of the tables (paypal_ipn) belongs to a
+# 3rd party app, and so that all the indexes for this feature are together.
+
+SEARCH_INDEXES = [
+    ("accounts_user", ["email", "first_name", "last_name"]),
+    ("officers_application", ["address_email", "full_name", "address_postcode"]),
+    ("bookings_bookingaccount", ["email", "name", "address_post_code"]),
+    ("bookings_booking", ["email", "first_name", "last_name", "address_post_code"]),
+    ("paypal_ipn", ["payer_email", "first_name", "last_name", "address_zip"]),
+    ("contact_us_message", ["email", "name"]),
+]
+
+
+def index_name(table, column):
+    return f"dr_search_{table}_{column}_trgm"[:63]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_retention", "0002_alter_erasureexecutionlog_options"),
+        ("accounts", "0017_rename_date_joined_user_joined_at"),
+        ("officers", "0023_datadownloadlog"),
+        ("bookings", "0131_remove_bookingaccount_last_payment_reminder_at"),
+        ("contact_us", "0007_alter_message_subject"),
+        ("ipn", "0007_auto_20160219_1135"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ] + [
+        migrations.RunSQL(
+            f'CREATE INDEX IF NOT EXISTS {index_name(table, column)} ON {table} USING gin ((UPPER("{column}"::text)) gin_trgm_ops);',
+            f"DROP INDEX IF EXISTS {index_name(table, column)};",
+        )
+        for table, columns in SEARCH_INDEXES
+        for column in columns
+    ]
@@ -1,4 +1,5 @@
 from datetime import date, datetime, timedelta
+from decimal import Decimal
 
 import mailer as queued_mail
 import pytest
@@ -10,14 +11,17 @@
 
 from cciw.accounts.models import User
 from cciw.bookings.models import Booking, BookingAccount, BookingState
+from cciw.bookings.models.payments import credit_account
 from cciw.bookings.tests import factories as bookings_factories
 from cciw.cciwmain.tests import factories as camps_factories
 from cciw.cciwmain.tests.utils import date_to_datetime, make_datetime
 from cciw.contact_us import tests as contact_us_factories
 from cciw.contact_us.models import Message
-from cciw.data_retention.applying import NOT_IN_USE_METHODS, apply_data_retention
+from cciw.data_retention.applying import NOT_IN_USE_METHODS, apply_data_retention, load_actual_data_retention_policy
 from cciw.data_retention.datatypes import ErasureMethod, Forever, Group, Keep, ModelDetail, Policy, Rules
+from cciw.data_retention.erasure_requests import data_erasure_request_search
 from cciw.data_retention.loading import parse_keep
+from cciw.mail.models import IncomingMailRecord
 from cciw.mail.tests import send_queued_mail
 from cciw.officers.models import Application
 from cciw.officers.tests import factories as officers_factories
@@ -35,6 +39,19 @@ def test_parse_keep_days():
     assert parse_keep("4 days") == timedelta(days=4)
 
 
+def test_load_policy_cached(tmp_path, settings):
+    policy_file = tmp_path / "data_retention.yaml"
+    policy_file.write_text(settings.DATA_RETENTION_CONFIG_FILE.read_text())
+    settings.DATA_RETENTION_CONFIG_FILE = policy_file
+
+    policy = load_actual_data_retention_policy()
+    assert load_actual_data_retention_policy() is policy
+
+    # Changes to the file are noticed
+    policy_file.write_text(policy_file.read_text() + "\n")
+    assert load_actual_data_retention_policy() is not policy
+
+
 def test_parse_keep_other():
     with pytest.raises(ValueError):
         parse_keep("abc 123")
@@ -367,8 +384,8 @@ def test_BookingAccount_not_in_use_query_issue(db: None):
                     camp=camp,
                     amount_due=100,
                 )
-        account.receive_payment(2 * 100)
-        other_account.receive_payment(100)
+        credit_account(Decimal(2 * 100), account, None)
+        credit_account(Decimal(100), other_account, None)
 
     with travel("2001-01-09"):
         # This has unfinished camps:
@@ -512,9 +529,52 @@ def _assert_instance_deleted_after(*, instance: Model, start: datetime, policy:
         assert model.objects.filter(id=instance.id).count() == 0
 
 
+def test_erase_IncomingMailRecord(db: None):
+    # Using the actual policy
+    policy = load_actual_data_retention_policy()
+    groups = [group for group in policy.groups if any(md.model is IncomingMailRecord for md in group.models)]
+    assert groups[0].rules.keep == timedelta(days=7)
+
+    record = IncomingMailRecord.objects.create(message_id="abc123")
+    _assert_instance_deleted_after(
+        instance=record, start=record.created_at, policy=Policy(source="test", groups=groups), days=7
+    )
+
+
 # TODO
 # tests for
 #  Application.objects.not_in_use()
 #  User.objects.not_in_use()
 #  SupportingInformation.objects.not_in_use
 #  SupportingInformationDocument.objects.not_in_use
+
+
+def test_data_erasure_request_search_multiple_terms(db: None):
+    officer = officers_factories.create_officer(first_name="Joe", last_name="Bloggs", email="joe@example.com")
+    account = bookings_factories.create_booking_account(name="Joe Bloggs", email="jbloggs@example.com")
+    other_account = bookings_factories.create_booking_account(name="Other Person", email="other@example.com")
+    message = contact_us_factories.create_message(email="JBloggs@Example.com")
+
+    results = data_erasure_request_search("joe@example.com, jbloggs@example.com")
+    assert {(r.model, r.pk) for r in results} == {
+        (User, officer.id),
+        (BookingAccount, account.id),
+        (Message, message.id),
+    }
+    assert other_account.id not in [r.pk for r in results if r.model == BookingAccount]
+
+    # Results are in SEARCH_QUERIES order
+    assert [r.model for r in results] == [User, BookingAccount, Message]
+
+
+def test_data_erasure_request_search_names_and_postcodes(db: None):
+    officer = officers_factories.create_officer(first_name="Joe", last_name="Bloggs", email="joe@example.com")
+    account = bookings_factories.create_booking_account(name="A Booker", address_post_code="AB1 2CD")
+
+    results = data_erasure_request_search("joe bloggs")
+    assert [(r.model, r.pk, r.name) for r in results] == [(User, officer.id, "Joe Bloggs")]
+
+    results = data_erasure_request_search("ab1 2cd")
+    assert [(r.model, r.pk) for r in results] == [(BookingAccount, account.id)]
+
+    assert data_erasure_request_search(" , ") == []
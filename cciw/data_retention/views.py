@@ -1,20 +1,47 @@
+from hashlib import md5
+
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.template.response import TemplateResponse
 
+from cciw.cciwmain.decorators import cache_compressed
 from cciw.utils.literate_yaml import literate_yaml_to_rst
 from cciw.utils.rst import remove_rst_title, rst_to_html
 
+from .loading import policy_file_fingerprint
+
+# Rendering the policy with docutils is slow, so the HTML is cached in the
+# cache backend keyed on a hash of the file (so it is shared by all processes
+# and survives deploys that don't change the policy), and in-process keyed on
+# the file's fingerprint.
+_policy_html_cache: dict[tuple, str] = {}
+
+
+def get_data_retention_policy_html() -> str:
+    filename = settings.DATA_RETENTION_CONFIG_FILE
+    key = (str(filename), policy_file_fingerprint(filename))
+    html = _policy_html_cache.get(key)
+    if html is None:
+        with open(filename) as f:
+            policy = f.read()
+        cache_key = f"cciw.data_retention.policy_html:{md5(policy.encode('utf-8'), usedforsecurity=False).hexdigest()}"
+        html = cache.get(cache_key)
+        if html is None:
+            html = rst_to_html(remove_rst_title(literate_yaml_to_rst(policy)), initial_header_level=2)
+            cache.set(cache_key, html, timeout=None)
+        _policy_html_cache.clear()
+        _policy_html_cache[key] = html
+    return html
+
 
+@cache_compressed
 def data_retention_policy(request: HttpRequest) -> TemplateResponse:
-    policy = open(settings.DATA_RETENTION_CONFIG_FILE).read()
     return TemplateResponse(
         request,
         "cciw/data_retention_policy.html",
         {
             "title": "Data retention policy",
-            "data_retention_policy": rst_to_html(
-                remove_rst_title(literate_yaml_to_rst(policy)), initial_header_level=2
-            ),
+            "data_retention_policy": get_data_retention_policy_html(),
         },
     )
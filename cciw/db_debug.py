@@ -82,7 +82,10 @@ def callback(**kwargs):
 
 
 class QueryRecorder:
-    def __init__(self):
+    def __init__(self, *, stacktraces: bool = True):
+        # Formatting stack traces is expensive. Without them, queries are
+        # grouped just by SQL, which is usually enough to spot N+1 problems.
+        self.stacktraces = stacktraces
         self.queries: list[QueryInfo] = []
 
     def __call__(self, execute, sql, params, many, context):
@@ -90,7 +93,7 @@ def __call__(self, execute, sql, params, many, context):
             sql=sql,
             params=params,
             many=many,
-            stacktrace=fancy_format_stack(sys._getframe(1)),
+            stacktrace=fancy_format_stack(sys._getframe(1)) if self.stacktraces else "",
             original_order=len(self.queries),
         )
         start = time.time()
@@ -6,16 +6,15 @@
 # module), and routing incoming mail to them.
 
 import email
+import email.parser
 import email.policy
-import fcntl
 import itertools
 import logging
-import os
 import re
-import tempfile
 from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass
 from email.message import EmailMessage
+from typing import BinaryIO
 
 from django.conf import settings
 from django.core.mail import make_msgid, send_mail
@@ -38,7 +37,8 @@
 from cciw.officers.models import Application
 from cciw.officers.utils import camp_officer_list, camp_slacker_list
 
-from .ses import download_ses_message_from_s3
+from .models import IncomingMailRecord
+from .ses import open_ses_message_from_s3
 from .smtp import send_mime_message
 
 logger = logging.getLogger(__name__)
@@ -466,7 +466,20 @@ def mangle_from_address(address: str) -> str:
     return address
 
 
-INCOMING_MAIL_TEMPFILE_PREFIX = "mail-incoming-"
+# Incoming mail is handled in stages:
+#
+# - `handle_mail_from_s3` is queued by the SNS notification view. It downloads
+#   just the headers, and decides which lists the mail should be forwarded to.
+#   Spam, and mail for lists that don't exist or that the sender can't use, is
+#   discarded at this point, without fetching the rest of the message, which
+#   could have large attachments.
+#
+# - `forward_mail_from_s3_to_list` is then queued for each list, and downloads
+#   and forwards the complete message. This spreads the work for a message sent
+#   to several big lists, and a failure for one list doesn't affect the others.
+
+# Chunk size used when reading from S3
+S3_READ_CHUNK_SIZE = 64 * 1024
 
 
 def handle_mail_from_s3_async(message_id: str):
@@ -476,31 +489,63 @@ def handle_mail_from_s3_async(message_id: str):
 def handle_mail_from_s3(message_id: str):
     # There is the possibility of this getting called multiple times with the
     # same message_id, perhaps due to our endpoint not returning quickly enough
-    # to SNS, triggering a timeout and re-attempt. So, we dedupe using a
-    # filesystem based lock.
+    # to SNS, triggering a timeout and re-attempt. So we dedupe using a DB
+    # record, which works whichever worker or host picks up the task.
+    if not IncomingMailRecord.claim(message_id):
+        logger.info("Aborting mail handling, message %s already handled", message_id)
+        return
 
-    filename = tempfile.gettempdir() + "/" + INCOMING_MAIL_TEMPFILE_PREFIX + message_id
-    if os.path.exists(filename):
-        logger.info("Aborting mail handling, file %s already exists", filename)
+    try:
+        with open_ses_message_from_s3(message_id) as body:
+            mail = read_mail_headers(body)
+    except Exception:
+        # Allow a later attempt to try again.
+        IncomingMailRecord.objects.filter(message_id=message_id).delete()
+        raise
+
+    for email_list in find_lists_for_mail(mail):
+        async_task(forward_mail_from_s3_to_list, message_id, email_list.address)
+
+
+def forward_mail_from_s3_to_list(message_id: str, address: str):
+    with open_ses_message_from_s3(message_id) as body:
+        parser = email.parser.BytesFeedParser(policy=email.policy.SMTP)
+        for chunk in body.iter_chunks(S3_READ_CHUNK_SIZE):
+            parser.feed(chunk)
+        mail = parser.close()
+
+    from_email = get_mail_from_email(mail)
+    if from_email is None:
+        return
+    try:
+        # We need to find the list again, as we can't pass EmailList objects
+        # to tasks. This also re-checks permission.
+        email_list = find_list(address, from_email)
+    except (NoSuchList, MailAccessDenied):
+        logger.info("Not forwarding msg %s to %s, list not found", message_id, address)
         return
+    forward_email_to_list(mail, email_list)
 
-    # We have a potential race condition between checking for the file existing
-    # above, and opening it below. So after opening it we do a lock as well.
-    with open(filename, "wb") as f:
-        try:
-            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        except BlockingIOError:
-            logger.info("Aborting mail handling, lock on file %s already exists", filename)
-            return
 
-        data = download_ses_message_from_s3(message_id)
-        # We don't technically need to write the data here, but it helps
-        # debugging later.
-        f.write(data)
-        handle_mail(data)
+def read_mail_headers(stream: BinaryIO) -> EmailMessage:
+    """
+    Reads just the headers of an RFC822 message from the stream, returning
+    a message object with no body.
+    """
+    data = b""
+    while chunk := stream.read(S3_READ_CHUNK_SIZE):
+        # Check from just before the new chunk, in case the blank line
+        # is split between chunks.
+        search_start = max(len(data) - 3, 0)
+        data += chunk
+        match = _end_of_headers_re.search(data, search_start)
+        if match:
+            data = data[: match.end()]
+            break
+    return email.parser.BytesHeaderParser(policy=email.policy.SMTP).parsebytes(data)
 
-    # We leave the file behind (to be cleaned by a cron job), so that later
-    # calls with the same message_id will see the file already exists and abort.
+
+_end_of_headers_re = re.compile(rb"\r?\n\r?\n")
 
 
 def handle_mail(data: bytes):
@@ -509,10 +554,31 @@ def handle_mail(data: bytes):
     data is RFC822 formatted bytes
     """
     mail = email.message_from_bytes(data, policy=email.policy.SMTP)
+    for email_list in find_lists_for_mail(mail):
+        forward_email_to_list(mail, email_list)
+
+
+def get_mail_from_email(mail: EmailMessage) -> str | None:
+    from_header = mail["From"]
+    if not isinstance(from_header, str):
+        # Sometimes get Header instance here. So far it has only happened with spam mail
+        # which seems to be malformed (unicode chars in a header instead of "encoded word" syntax)
+        return None
+    try:
+        return extract_email_addresses(from_header)[0]
+    except IndexError:
+        return None
+
+
+def find_lists_for_mail(mail: EmailMessage) -> list[EmailList]:
+    """
+    Returns the lists that an incoming email should be forwarded to, sending
+    rejection emails where necessary. Only the headers of `mail` are used.
+    """
     to = mail["To"]
     if to is None:
         # Some spam is like this.
-        return
+        return []
 
     if is_valid_email(to):
         addresses = {to}
@@ -521,30 +587,27 @@ def handle_mail(data: bytes):
 
     if mail.get("X-SES-Spam-Verdict", "") == "FAIL":
         logger.info("Discarding spam, message-id %s", mail.get("Message-ID", "<unknown>"))
-        return
+        return []
     if mail.get("X-SES-Virus-Verdict", "") == "FAIL":
         logger.info("Discarding virus, message-id %s", mail.get("Message-ID", "<unknown>"))
-        return
+        return []
 
     from_header = mail["From"]
     if not isinstance(from_header, str):
-        # Sometimes get Header instance here. So far it has only happened with spam mail
-        # which seems to be malformed (unicode chars in a header instead of "encoded word" syntax)
         logger.info("Discarding malformed mail, message-id %s", mail.get("Message-ID", "<unknown>"))
-        return
+        return []
 
-    try:
-        from_email = extract_email_addresses(from_header)[0]
-    except IndexError:
+    from_email = get_mail_from_email(mail)
+    if from_email is None:
         logger.info(
             "Discarding mail with no email address in From header, message-id %s", mail.get("Message-ID", "<unknown>")
         )
-        return
+        return []
 
+    email_lists = []
     for address in sorted(list(addresses)):
         try:
-            email_list = find_list(address, from_email)
-            forward_email_to_list(mail, email_list)
+            email_lists.append(find_list(address, from_email))
         except MailAccessDenied:
             if not known_officer_email_address(from_email):
                 # Don't bother sending bounce emails to addresses
@@ -572,6 +635,7 @@ def handle_mail(data: bytes):
             # for us because we only have routes created for the email
             # we expect.
             pass
+    return email_lists
 
 
 def known_officer_email_address(address: str):
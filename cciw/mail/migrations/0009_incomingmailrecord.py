@@ -0,0 +1,21 @@
+# Generated by Django 6.0.9 on 2026-10-19 04:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mail", "0008_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IncomingMailRecord",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("message_id", models.CharField(unique=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
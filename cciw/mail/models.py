@@ -1,11 +1,17 @@
+import itertools
+import logging
+import time
 from collections.abc import Callable, Sequence
-from dataclasses import dataclass
-from datetime import timedelta
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 from django.db import models, transaction
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 class ScheduledMailRecord(models.Model):
     """
@@ -21,6 +27,29 @@ def __str__(self) -> str:
         return self.tracking_id
 
 
+class IncomingMailRecord(models.Model):
+    """
+    Records incoming emails that have been handled, to dedupe repeated
+    notifications for the same message.
+    """
+
+    message_id = models.CharField(unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return self.message_id
+
+    @classmethod
+    def claim(cls, message_id: str) -> bool:
+        """
+        Records the message as being handled, returning False if it was already
+        recorded. Safe to call concurrently from different processes and hosts,
+        due to the unique constraint.
+        """
+        _, created = cls.objects.get_or_create(message_id=message_id)
+        return created
+
+
 type BuildEmail[T] = Callable[[T], EmailMessage]
 
 
@@ -37,6 +66,28 @@ class RepeatAfter:
 type Repeat = NeverRepeat | RepeatAfter
 
 
+@dataclass
+class ScheduledMailReport:
+    """
+    Summary of a run of `send_mails_for_items_according_to_schedule`.
+    """
+
+    evaluated: int = 0
+    skipped: int = 0
+    sent: int = 0
+    # Seconds spent on each stage:
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        timings = ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in self.timings.items())
+        return f"evaluated={self.evaluated} skipped={self.skipped} sent={self.sent} ({timings})"
+
+
+# Number of emails we hand to the email backend at once. With django-mailer,
+# each chunk is a single bulk INSERT into the queue.
+SEND_CHUNK_SIZE = 100
+
+
 # We use django-mailer which puts everything on the queue in the
 # database. This means our ScheduledMailEntry data will get saved
 # along with the outgoing emails, or fail to get saved under the same
@@ -53,33 +104,64 @@ def send_mails_for_items_according_to_schedule[T](
     tracking_id_format: Callable[[T], str],
     repeat: Repeat,
     builder: BuildEmail[T],
-) -> None:
-    # Do a batch load for everything that already exists, to reduce DB load.
-    tracking_ids = [tracking_id_format(item) for item in items]
-    existing_records_map = {
-        rec.tracking_id: rec for rec in ScheduledMailRecord.objects.filter(tracking_id__in=tracking_ids)
-    }
-
-    for item in items:
-        now = timezone.now()
-        tracking_id = tracking_id_format(item)
-        if tracking_id in existing_records_map:
-            record = existing_records_map[tracking_id]
-        else:
-            record, _new = ScheduledMailRecord.objects.get_or_create(tracking_id=tracking_id)
-        if record.sent_count == 0:
-            do_send = True
-        elif isinstance(repeat, NeverRepeat):
-            do_send = False
-        else:
-            # We add a little lee-way on the delta check to cope with the fact
-            # that sending a batch of emails is going to take a bit of time,
-            # and we might only run the batch process e.g. once a day.
-            epsilon = timedelta(hours=1)
-            do_send = ((now + epsilon) - record.last_sent_at) > repeat.delta
-
-        if do_send:
-            builder(item).send()
+) -> ScheduledMailReport:
+    report = ScheduledMailReport(evaluated=len(items))
+    now = timezone.now()
+
+    # Work out what is due, using a single query for all existing records.
+    with _timed(report, "find_due"):
+        items_by_tracking_id = {tracking_id_format(item): item for item in items}
+        existing_records_map = {
+            rec.tracking_id: rec
+            for rec in ScheduledMailRecord.objects.filter(tracking_id__in=list(items_by_tracking_id.keys()))
+        }
+        due: list[tuple[T, ScheduledMailRecord, bool]] = []
+        for tracking_id, item in items_by_tracking_id.items():
+            record = existing_records_map.get(tracking_id, None)
+            if record is None:
+                due.append((item, ScheduledMailRecord(tracking_id=tracking_id, created_at=now), True))
+            elif _is_due(record, repeat, now):
+                due.append((item, record, False))
+        report.skipped = len(items) - len(due)
+
+    with _timed(report, "build"):
+        messages = [builder(item) for item, _, _ in due]
+
+    with _timed(report, "send"):
+        connection = get_connection()
+        for chunk in itertools.batched(messages, SEND_CHUNK_SIZE):
+            connection.send_messages(list(chunk))
+        report.sent = len(messages)
+
+    with _timed(report, "save"):
+        for _, record, _ in due:
             record.sent_count += 1
             record.last_sent_at = now
-            record.save()
+        ScheduledMailRecord.objects.bulk_create([record for _, record, is_new in due if is_new])
+        ScheduledMailRecord.objects.bulk_update(
+            [record for _, record, is_new in due if not is_new], ["sent_count", "last_sent_at"]
+        )
+
+    logger.info("Scheduled mail: %s", report)
+    return report
+
+
+def _is_due(record: ScheduledMailRecord, repeat: Repeat, now: datetime) -> bool:
+    if record.sent_count == 0:
+        return True
+    if isinstance(repeat, NeverRepeat):
+        return False
+    # We add a little lee-way on the delta check to cope with the fact
+    # that sending a batch of emails is going to take a bit of time,
+    # and we might only run the batch process e.g. once a day.
+    epsilon = timedelta(hours=1)
+    return ((now + epsilon) - record.last_sent_at) > repeat.delta
+
+
+@contextmanager
+def _timed(report: ScheduledMailReport, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.timings[stage] = time.perf_counter() - start
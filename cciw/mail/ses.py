@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import dataclasses
-import io
+import functools
 import re
 import warnings
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
 import boto3
+from botocore.response import StreamingBody
 from django.conf import settings
 
 
@@ -25,19 +28,32 @@ def get_config_boto_session():
 
 
 # S3
-def download_ses_message_from_s3(message_id: str) -> bytes:
+@functools.cache
+def get_incoming_mail_s3_client():
+    # Creating clients is slow, and they are thread safe, so we reuse one.
     AWS_INCOMING_MAIL = settings.AWS_INCOMING_MAIL
     session = boto3.Session(
         aws_access_key_id=AWS_INCOMING_MAIL["ACCESS_KEY_ID"],
         aws_secret_access_key=AWS_INCOMING_MAIL["SECRET_ACCESS_KEY"],
         region_name=AWS_INCOMING_MAIL["REGION_NAME"],
     )
+    # ENDPOINT_URL allows using a local S3-compatible server.
+    return session.client("s3", endpoint_url=AWS_INCOMING_MAIL.get("ENDPOINT_URL", None))
 
-    s3 = session.resource("s3")
-    bucket = s3.Bucket(name=AWS_INCOMING_MAIL["BUCKET_NAME"])
-    store = io.BytesIO()
-    bucket.download_fileobj(message_id, store)
-    return store.getvalue()
+
+@contextmanager
+def open_ses_message_from_s3(message_id: str) -> Iterator[StreamingBody]:
+    """
+    Returns a stream for reading the message stored in S3 by SES, for use as
+    a context manager. Only the parts of the message that are read are downloaded.
+    """
+    s3 = get_incoming_mail_s3_client()
+    response = s3.get_object(Bucket=settings.AWS_INCOMING_MAIL["BUCKET_NAME"], Key=message_id)
+    body: StreamingBody = response["Body"]
+    try:
+        yield body
+    finally:
+        body.close()
 
 
 # SES
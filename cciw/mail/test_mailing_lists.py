@@ -13,7 +13,16 @@
 from cciw.officers.tests import factories as officer_factories
 from cciw.utils.functional import partition
 
-from .lists import MailAccessDenied, NoSuchList, extract_email_addresses, find_list, handle_mail, mangle_from_address
+from .lists import (
+    MailAccessDenied,
+    NoSuchList,
+    extract_email_addresses,
+    find_list,
+    handle_mail,
+    handle_mail_from_s3,
+    mangle_from_address,
+)
+from .models import IncomingMailRecord
 from .test_data import BAD_MESSAGE_1
 
 pytestmark = pytest.mark.django_db
@@ -365,6 +374,60 @@ def test_invalid_characters():
     assert rejections == []
 
 
+def test_handle_mail_from_s3(local_s3):
+    camp = camp_factories.create_camp(
+        year=2000,
+        camp_name="Pink",
+        leader=officer_factories.create_officer(email=(leader_email := "kevin.smith@example.com")),
+    )
+    officer_factories.add_officers_to_camp(camp, [officer_factories.create_officer() for i in range(3)])
+    message = make_message(
+        from_email=f"Kevin Smith <{leader_email}>",
+        to_email="camp-2000-pink-officers@mailtest.cciw.co.uk, camp-2000-pink-leaders@mailtest.cciw.co.uk",
+    )
+    local_s3.objects["abc123"] = message
+    handle_mail_from_s3("abc123")
+
+    rejections, sent_messages = partition_mailing_list_rejections(mail.outbox)
+    assert len(rejections) == 0
+    # 3 officers, 1 leader
+    assert len(sent_messages) == 4
+    assert IncomingMailRecord.objects.filter(message_id="abc123").exists()
+    # One for the headers, one for each list
+    assert local_s3.get_object_count == 3
+
+    # Repeated notifications are ignored
+    mail.outbox.clear()
+    handle_mail_from_s3("abc123")
+    assert len(mail.outbox) == 0
+    assert local_s3.get_object_count == 3
+
+
+def test_handle_mail_from_s3_spam_reads_headers_only(local_s3):
+    role = _setup_role_for_email(
+        name="Test",
+        email="test@mailtest.cciw.co.uk",
+        allow_emails_from_public=True,
+        recipients=[("test", "test@example.com")],
+    )
+    message = make_message(to_email=role.email, additional_headers=["X-SES-Spam-Verdict: FAIL"])
+    large_message = message + b"x" * 1_000_000
+    local_s3.objects["abc123"] = large_message
+    handle_mail_from_s3("abc123")
+
+    assert len(mail.outbox) == 0
+    assert local_s3.get_object_count == 1
+    assert local_s3.bytes_read < 100_000
+
+
+def test_handle_mail_from_s3_download_failure(local_s3):
+    # No object, simulates S3 error
+    with pytest.raises(local_s3.client.exceptions.NoSuchKey):
+        handle_mail_from_s3("abc123")
+    # Should be able to retry
+    assert not IncomingMailRecord.objects.filter(message_id="abc123").exists()
+
+
 def emailify(msg: str) -> bytes:
     return msg.strip().replace("\n", "\r\n").encode("utf-8")
 
@@ -1,14 +1,18 @@
 import email
+from datetime import timedelta
 from email import policy
 
 import mailer.engine
 import pytest
+import time_machine
 from django.core import mail
 from django.core.mail.backends.base import BaseEmailBackend
 from django.core.mail.backends.locmem import EmailBackend as LocMemEmailBackend
 from django.core.mail.message import EmailMessage
 from django.test.utils import override_settings
 
+from cciw.mail.models import NeverRepeat, RepeatAfter, ScheduledMailRecord, send_mails_for_items_according_to_schedule
+
 
 def send_queued_mail():
     # We need to ensure we don't send real emails.
@@ -83,3 +87,53 @@ def test_check_messages(self):
                 from_email="f@example.com",
                 recipient_list=["to@example.com"],
             )
+
+
+def _build_test_email(item: int) -> EmailMessage:
+    return EmailMessage(subject=f"[CCIW] Test {item}", body="Test", to=[f"person{item}@example.com"])
+
+
+def test_send_mails_for_items_according_to_schedule(db, django_assert_num_queries):
+    items = list(range(250))
+    with django_assert_num_queries(
+        # SAVEPOINT, load records, bulk_create, RELEASE SAVEPOINT.
+        4
+    ):
+        report = send_mails_for_items_according_to_schedule(
+            items=items,
+            tracking_id_format=lambda item: f"test-{item}",
+            repeat=NeverRepeat(),
+            builder=_build_test_email,
+        )
+    assert (report.evaluated, report.skipped, report.sent) == (250, 0, 250)
+    assert len(mail.outbox) == 250
+    assert ScheduledMailRecord.objects.filter(sent_count=1).count() == 250
+
+    # Second time round, nothing is due:
+    report = send_mails_for_items_according_to_schedule(
+        items=items + [250],
+        tracking_id_format=lambda item: f"test-{item}",
+        repeat=NeverRepeat(),
+        builder=_build_test_email,
+    )
+    assert (report.evaluated, report.skipped, report.sent) == (251, 250, 1)
+    assert len(mail.outbox) == 251
+    assert set(report.timings.keys()) == {"find_due", "build", "send", "save"}
+
+
+def test_send_mails_for_items_according_to_schedule_repeat(db):
+    def send():
+        return send_mails_for_items_according_to_schedule(
+            items=[1, 2],
+            tracking_id_format=lambda item: f"test-{item}",
+            repeat=RepeatAfter(timedelta(days=3)),
+            builder=_build_test_email,
+        )
+
+    with time_machine.travel("2025-01-01 12:00:00"):
+        assert send().sent == 2
+    with time_machine.travel("2025-01-03 12:00:00"):
+        assert send().sent == 0
+    with time_machine.travel("2025-01-04 12:00:00"):
+        assert send().sent == 2
+    assert list(ScheduledMailRecord.objects.order_by("tracking_id").values_list("sent_count", flat=True)) == [2, 2]
@@ -0,0 +1,211 @@
+"""
+Response compression, replacing Django's GZipMiddleware.
+
+- The encoding is negotiated from Accept-Encoding, preferring zstd, then
+  Brotli, then gzip. zstd and Brotli are only used for the cached public pages
+  described below. Everything else is gzipped with Django's "Heal The Breach"
+  mitigation of BREACH attacks (random padding in the gzip header), since
+  those responses can contain CSRF tokens and reflected input, and there is no
+  equivalent for the other encodings.
+- Content types that are already compressed (images, xlsx, zip, PDF etc.) are
+  passed through untouched.
+- Responses marked with the `cache_compressed` view decorator get an ETag
+  computed from their content, and their compressed variants are cached keyed
+  by encoding and ETag. These are public pages that are the same for most
+  requests, so identical bytes are compressed once rather than on every
+  request. Since the key is a hash of the content, a cached variant can never
+  be served for different content.
+"""
+
+import re
+from collections.abc import Callable
+from hashlib import md5
+
+import brotli
+import zstandard
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.text import acompress_sequence, compress_sequence, compress_string
+
+# It's not worth attempting to compress really short responses.
+MIN_LENGTH = 200
+
+# Content types (or prefixes, ending with "/" or ".") that are already compressed, or
+# that don't compress usefully.
+ALREADY_COMPRESSED_CONTENT_TYPES = [
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "font/woff2",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/vnd.openxmlformats-officedocument.",  # xlsx, docx etc., which are zip files
+    "application/vnd.oasis.opendocument.",  # ods, odt
+    "application/octet-stream",
+]
+# Exceptions to the above:
+COMPRESSIBLE_CONTENT_TYPES = [
+    "image/svg+xml",
+]
+
+# Used for Django's "Heal The Breach" mitigation of BREACH attacks, as in
+# GZipMiddleware. Cached variants are only used for public pages without CSRF
+# tokens, and don't need it.
+GZIP_MAX_RANDOM_BYTES = 100
+
+# Cached variants are compressed once, so we can afford to compress hard.
+BROTLI_CACHED_QUALITY = 11
+ZSTD_CACHED_LEVEL = 19
+
+CACHED_VARIANT_TIMEOUT = 60 * 60 * 24
+
+# In order of preference when the client accepts several equally.
+ENCODINGS = ["zstd", "br", "gzip"]
+
+# For responses that may contain secrets
+UNCACHED_ENCODINGS = ["gzip"]
+
+
+def compress(content: bytes, encoding: str, *, cached: bool) -> bytes:
+    if encoding == "gzip":
+        return compress_string(content, max_random_bytes=None if cached else GZIP_MAX_RANDOM_BYTES)
+    # Other encodings have no BREACH mitigation, see above.
+    if not cached:
+        raise ValueError(f"{encoding} can only be used for cached variants")
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_CACHED_LEVEL).compress(content)
+    if encoding == "br":
+        return brotli.compress(content, quality=BROTLI_CACHED_QUALITY)
+    raise ValueError(f"Unknown encoding {encoding}")
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in COMPRESSIBLE_CONTENT_TYPES:
+        return True
+    return not any(
+        content_type.startswith(prefix) if prefix.endswith((".", "/")) else content_type == prefix
+        for prefix in ALREADY_COMPRESSED_CONTENT_TYPES
+    )
+
+
+_q_value_re = re.compile(r"^\s*q\s*=\s*([0-9.]+)\s*$")
+
+
+def choose_encoding(accept_encoding: str, available: list[str]) -> str | None:
+    """
+    Returns the best encoding from `available` for the Accept-Encoding header
+    value, or None if none are acceptable.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if match := _q_value_re.match(param):
+                try:
+                    q = float(match.group(1))
+                except ValueError:
+                    q = 0
+        accepted[name] = q
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0)), -ENCODINGS.index(encoding), encoding) for encoding in available
+    ]
+    best_q, _, best = max(candidates)
+    return best if best_q > 0 else None
+
+
+def compression_middleware(get_response: Callable[[HttpRequest], HttpResponse]) -> Callable:
+    def middleware(request: HttpRequest) -> HttpResponse:
+        return compress_response(request, get_response(request))
+
+    return middleware
+
+
+def compress_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    if not response.streaming and len(response.content) < MIN_LENGTH:
+        return response
+
+    # Avoid compressing if we've already got a content-encoding.
+    if response.has_header("Content-Encoding"):
+        return response
+
+    if not is_compressible(response.get("Content-Type", "")):
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    accept_encoding = request.headers.get("Accept-Encoding", "")
+    if response.streaming:
+        # We only support gzip for streaming
+        if choose_encoding(accept_encoding, ["gzip"]) is None:
+            return response
+        encoding = "gzip"
+        if response.is_async:
+            response.streaming_content = acompress_sequence(
+                response.streaming_content, max_random_bytes=GZIP_MAX_RANDOM_BYTES
+            )
+        else:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=GZIP_MAX_RANDOM_BYTES
+            )
+        # We won't know the compressed size until we stream it.
+        del response.headers["Content-Length"]
+    else:
+        cached = is_cached_variant_response(response)
+        encoding = choose_encoding(accept_encoding, ENCODINGS if cached else UNCACHED_ENCODINGS)
+        if encoding is None:
+            return response
+        if cached:
+            compressed_content = get_cached_variant(response, encoding)
+        else:
+            compressed_content = compress(response.content, encoding, cached=False)
+        # Return the compressed content only if it's actually shorter.
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+    # If there is a strong ETag, make it weak to fulfill the requirements
+    # of RFC 9110 Section 8.8.1 while also allowing conditional request
+    # matches on ETags.
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = "W/" + etag
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def is_cached_variant_response(response: HttpResponse) -> bool:
+    return (
+        getattr(response, "cache_compressed", False)
+        and response.status_code == 200
+        # A response that sets cookies (such as the CSRF cookie, which is set
+        # whenever a CSRF token is rendered) is specific to the visitor, and
+        # needs BREACH mitigation.
+        and not response.cookies
+    )
+
+
+def get_cached_variant(response: HttpResponse, encoding: str) -> bytes:
+    # The key must depend only on the content, so we don't use an ETag set by
+    # the view, which could be derived from something else.
+    content_hash = md5(response.content, usedforsecurity=False).hexdigest()
+    if not response.has_header("ETag"):
+        response.headers["ETag"] = quote_etag(content_hash)
+    key = f"cciw.middleware.compression:{encoding}:{content_hash}"
+    compressed_content = cache.get(key)
+    if compressed_content is None:
+        compressed_content = compress(response.content, encoding, cached=True)
+        cache.set(key, compressed_content, CACHED_VARIANT_TIMEOUT)
+    return compressed_content
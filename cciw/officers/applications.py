@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import timedelta
 
 from django.db.models import QuerySet
@@ -119,14 +120,42 @@ def applications_for_camps(camps: CampQuerySet | Sequence[Camp], officer_ids: No
     return apps
 
 
+APPLICATION_TEXT_TEMPLATE = "cciw/officers/application_email.txt"
+APPLICATION_RTF_TEMPLATE = "cciw/officers/application.rtf"
+
+
+@dataclass(frozen=True)
+class RenderedApplication:
+    text: str
+    rtf: str
+    rtf_filename: str
+
+
+def render_application(app: Application) -> RenderedApplication:
+    """
+    Renders the application as text and RTF, sharing the data loaded for them.
+    """
+    context = _application_context(app)
+    return RenderedApplication(
+        text=loader.render_to_string(APPLICATION_TEXT_TEMPLATE, context),
+        rtf=loader.render_to_string(APPLICATION_RTF_TEMPLATE, context),
+        rtf_filename=application_rtf_filename(app),
+    )
+
+
 def application_to_text(app: Application) -> str:
-    t = loader.get_template("cciw/officers/application_email.txt")
-    return t.render({"app": app})
+    return loader.render_to_string(APPLICATION_TEXT_TEMPLATE, _application_context(app))
 
 
 def application_to_rtf(app: Application) -> str:
-    t = loader.get_template("cciw/officers/application.rtf")
-    return t.render({"app": app})
+    return loader.render_to_string(APPLICATION_RTF_TEMPLATE, _application_context(app))
+
+
+def _application_context(app: Application) -> dict:
+    return {
+        "app": app,
+        "qualifications": list(app.qualifications.select_related("type")),
+    }
 
 
 def application_rtf_filename(app: Application) -> str:
@@ -1,14 +1,15 @@
 # ruff: noqa: UP032
 import contextlib
 import logging
+from collections import defaultdict
 from collections.abc import Callable, Iterable, Sequence
 from datetime import date, timedelta
 from urllib.parse import quote as urlquote
 
 from django.conf import settings
 from django.core import signing
-from django.core.mail import EmailMessage, send_mail
-from django.db.models import QuerySet
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db.models import QuerySet, prefetch_related_objects
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.crypto import salted_hmac
@@ -18,13 +19,8 @@
 from cciw.cciwmain.models import Camp
 from cciw.mail import X_CCIW_ACTION, X_CCIW_CAMP, X_CCIW_REFEREE
 from cciw.mail.models import NeverRepeat, send_mails_for_items_according_to_schedule
-from cciw.officers.applications import (
-    application_rtf_filename,
-    application_to_rtf,
-    application_to_text,
-    camps_for_application,
-)
-from cciw.officers.email_utils import formatted_email, send_mail_with_attachments
+from cciw.officers.applications import RenderedApplication, camps_for_application, render_application
+from cciw.officers.email_utils import formatted_email
 from cciw.officers.models import Application, Referee, Reference
 from cciw.officers.models.data_retention import (
     DATA_RETENTION_PERIODS,
@@ -32,8 +28,11 @@
     DataRelatedToCampersOnCamp,
     DataRelatedToCampersYear,
     DataRelatedToOfficersOnCamp,
+    DataRelationKey,
     DataRetentionRule,
     LoggableDataRelation,
+    data_download_log_key,
+    data_relation_key,
 )
 
 logger = logging.getLogger(__name__)
@@ -53,48 +52,60 @@ def admin_emails_for_application(application: Application) -> list[tuple[Camp, l
     For the supplied application, finds the camps admins that are relevant.
     Returns results in groups of (camp, leader email list), for each relevant camp.
     """
-    return [(camp, admin_emails_for_camp(camp)) for camp in camps_for_application(application)]
+    camps = camps_for_application(application)
+    prefetch_related_objects(camps, "leaders", "leaders__users", "admins")
+    return [(camp, admin_emails_for_camp(camp)) for camp in camps]
 
 
 def send_application_emails(application: Application, notice_callback: Callable[[str], None]):
+    # The leaders get a link, and the officer gets a copy of the application.
+    # All the emails are sent together at the end, over one connection.
+    messages = []
+    notices = []
+
     # Email to the leaders:
 
     # Collect emails to send to
     leader_email_groups = admin_emails_for_application(application)
+    application_url = make_view_application_url(application)
     for camp, leader_emails in leader_email_groups:
         if camp.is_past():
             continue
         if len(leader_emails) > 0:
-            send_leaders_email_about_application(leader_emails, application)
-            notice_callback(
+            messages.append(leaders_email_about_application(leader_emails, application, application_url))
+            notices.append(
                 f"The leaders ({camp.leaders_formatted}) have been notified of the completed application form by"
                 " email.",
             )
 
     if len(leader_email_groups) == 0:
-        send_leaders_email_about_application(settings.SECRETARY_EMAILS, application)
-        notice_callback(
+        messages.append(leaders_email_about_application(settings.SECRETARY_EMAILS, application, application_url))
+        notices.append(
             "The application form has been sent to the CCiW secretary, "
             "because you are not on any camp's officer list this year.",
         )
 
     # Email to the officer:
-    application_text = application_to_text(application)
-    application_rtf = application_to_rtf(application)
-    rtf_attachment = (application_rtf_filename(application), application_rtf, "text/rtf")
+    officer_message = officer_email_about_application(application.officer, render_application(application))
+    if officer_message is not None:
+        messages.append(officer_message)
+    notices.append("A copy of the application form has been sent to you via email.")
 
-    send_officer_email_about_application(application.officer, application_text, rtf_attachment)
-    notice_callback("A copy of the application form has been sent to you via email.")
+    get_connection().send_messages(messages)
+    for notice in notices:
+        notice_callback(notice)
 
     if application.officer.email.lower() != application.address_email.lower():
         send_email_change_emails(application.officer, application)
 
 
-def send_officer_email_about_application(officer: User, application_text: str, rtf_attachment: tuple):
+def officer_email_about_application(officer: User, rendered: RenderedApplication) -> EmailMessage | None:
     subject = "[CCIW] Application form submitted"
 
     # Email to the officer
     user_email = formatted_email(officer)
+    if user_email is None:
+        return None
     user_msg = (
         f"""{officer.first_name},
 
@@ -102,26 +113,36 @@ def send_officer_email_about_application(officer: User, application_text: str, r
 to CCiW. It is also attached to this email as an RTF file.
 
 """
-    ) + application_text
-
-    if user_email is not None:
-        send_mail_with_attachments(subject, user_msg, settings.SERVER_EMAIL, [user_email], attachments=[rtf_attachment])
+    ) + rendered.text
+
+    return EmailMessage(
+        subject=subject,
+        body=user_msg,
+        from_email=settings.SERVER_EMAIL,
+        to=[user_email],
+        attachments=[(rendered.rtf_filename, rendered.rtf, "text/rtf")],
+    )
 
 
-def send_leaders_email_about_application(leader_emails: list[str], application: Application):
+def leaders_email_about_application(
+    leader_emails: list[str], application: Application, application_url: str
+) -> EmailMessage:
     subject = f"[CCIW] Application form from {application.full_name}"
-    url = "https://{domain}{path}".format(
-        domain=common.get_current_domain(),
-        path=reverse("cciw-officers-view_application", kwargs=dict(application_id=application.id)),
-    )
     body = f"""The following application form has been submitted via the
 CCiW website:
 
-{url}
+{application_url}
 
 """
 
-    send_mail(subject, body, settings.SERVER_EMAIL, leader_emails)
+    return EmailMessage(subject=subject, body=body, from_email=settings.SERVER_EMAIL, to=leader_emails)
+
+
+def make_view_application_url(application: Application) -> str:
+    return "https://{domain}{path}".format(
+        domain=common.get_current_domain(),
+        path=reverse("cciw-officers-view_application", kwargs=dict(application_id=application.id)),
+    )
 
 
 def make_update_email_url(application: Application) -> str:
@@ -354,16 +375,9 @@ def send_data_retention_reminder_emails():
 
 
 def send_data_retention_reminder_emails_about_officer_data():
-    def build_email(user: User) -> EmailMessage:
-        download_filenames = download_log_filenames(user, DataRelatedToOfficersOnCamp(camp))
-        if download_filenames:
-            download_log_message = (
-                "According to our logs, you have downloaded at least the following files:\n"
-                + "\n".join(f" - {filename}" for filename in download_filenames)
-            ) + "\n\n"
-        else:
-            download_log_message = ""
-
+    def build_email(item: tuple[Camp, User]) -> EmailMessage:
+        camp, user = item
+        download_filenames = download_logs.filenames(user, DataRelatedToOfficersOnCamp(camp))
         return EmailMessage(
             subject=f"[CCIW] Reminder: remove officer data for {camp.nice_name}",
             body=f"""
@@ -373,7 +387,7 @@ def build_email(user: User) -> EmailMessage:
 data (and for any earlier camps).
 
 {REMEMBER_TO_CHECK_MESSAGE}
-{download_log_message}
+{download_log_message(download_filenames)}
 If you have shared the data with other officers, please also
 ensure they do the same.
 
@@ -384,28 +398,21 @@ def build_email(user: User) -> EmailMessage:
             to=[user.email],
         )
 
-    for camp, users in get_camps_and_users_for_data_protection_reminders(
+    items, download_logs = get_camps_and_users_for_data_protection_reminders(
         rule=DataRetentionRule.OFFICERS, make_relation=DataRelatedToOfficersOnCamp
-    ):
-        send_mails_for_items_according_to_schedule(
-            items=list(users),
-            tracking_id_format=lambda user: f"camp-{camp.url_id}-officer-data-user-{user.id}",
-            repeat=NeverRepeat(),
-            builder=build_email,
-        )
+    )
+    send_mails_for_items_according_to_schedule(
+        items=items,
+        tracking_id_format=lambda item: f"camp-{item[0].url_id}-officer-data-user-{item[1].id}",
+        repeat=NeverRepeat(),
+        builder=build_email,
+    )
 
 
 def send_data_retention_reminder_emails_about_camper_data():
-    def build_email(user: User) -> EmailMessage:
-        download_filenames = download_log_filenames(user, DataRelatedToCampersOnCamp(camp))
-        if download_filenames:
-            download_log_message = (
-                "According to our logs, you have downloaded at least the following files:\n"
-                + "\n".join(f" - {filename}" for filename in download_filenames)
-            ) + "\n\n"
-        else:
-            download_log_message = ""
-
+    def build_email(item: tuple[Camp, User]) -> EmailMessage:
+        camp, user = item
+        download_filenames = download_logs.filenames(user, DataRelatedToCampersOnCamp(camp))
         return EmailMessage(
             subject=f"[CCIW] Reminder: remove camper data for {camp.nice_name}",
             body=f"""
@@ -415,7 +422,7 @@ def build_email(user: User) -> EmailMessage:
 data (and for any earlier camps).
 
 {REMEMBER_TO_CHECK_MESSAGE}
-{download_log_message}
+{download_log_message(download_filenames)}
 If you have shared the data with other officers, please also
 ensure they do the same.
 
@@ -426,15 +433,15 @@ def build_email(user: User) -> EmailMessage:
             to=[user.email],
         )
 
-    for camp, users in get_camps_and_users_for_data_protection_reminders(
+    items, download_logs = get_camps_and_users_for_data_protection_reminders(
         rule=DataRetentionRule.CAMPERS, make_relation=DataRelatedToCampersOnCamp
-    ):
-        send_mails_for_items_according_to_schedule(
-            items=list(users),
-            tracking_id_format=lambda user: f"camp-{camp.url_id}-camper-data-user-{user.id}",
-            repeat=NeverRepeat(),
-            builder=build_email,
-        )
+    )
+    send_mails_for_items_according_to_schedule(
+        items=items,
+        tracking_id_format=lambda item: f"camp-{item[0].url_id}-camper-data-user-{item[1].id}",
+        repeat=NeverRepeat(),
+        builder=build_email,
+    )
 
 
 def send_data_retention_reminder_emails_about_camper_year_data():
@@ -447,17 +454,10 @@ def send_data_retention_reminder_emails_about_camper_year_data():
 
     year = max({camp.year for camp in relevant_camps})
     relation = DataRelatedToCampersYear(year)
+    download_logs = DownloadLogs([relation])
 
     def build_email(user: User) -> EmailMessage:
-        download_filenames = download_log_filenames(user, relation)
-        if download_filenames:
-            download_log_message = (
-                "According to our logs, you have downloaded at least the following files:\n"
-                + "\n".join(f" - {filename}" for filename in download_filenames)
-            ) + "\n\n"
-        else:
-            download_log_message = ""
-
+        download_filenames = download_logs.filenames(user, relation)
         return EmailMessage(
             subject=f"[CCIW] Reminder: remove camper/bookings data for {year}",
             body=f"""
@@ -466,7 +466,7 @@ def build_email(user: User) -> EmailMessage:
 delete all copies of this data (and for any previous years).
 
 {REMEMBER_TO_CHECK_MESSAGE}
-{download_log_message}
+{download_log_message(download_filenames)}
 If you have shared the data with other people, please also
 ensure they do the same.
 
@@ -477,37 +477,72 @@ def build_email(user: User) -> EmailMessage:
             to=[user.email],
         )
 
-    users = get_downloaders_for_data_protection_relation(relation)
     send_mails_for_items_according_to_schedule(
-        items=list(users),
+        items=list(download_logs.users(relation)),
         tracking_id_format=lambda user: f"year-{year}-camper-data-user-{user.id}",
         repeat=NeverRepeat(),
         builder=build_email,
     )
 
 
-def download_log_filenames(user: User, relation: LoggableDataRelation) -> list[str]:
-    return sorted(set(DataDownloadLog.objects.for_user(user).for_relation(relation).values_list("filename", flat=True)))
+def download_log_message(download_filenames: list[str]) -> str:
+    if not download_filenames:
+        return ""
+    return (
+        "According to our logs, you have downloaded at least the following files:\n"
+        + "\n".join(f" - {filename}" for filename in download_filenames)
+    ) + "\n\n"
+
+
+class DownloadLogs:
+    """
+    DataDownloadLog records for a set of data relations, loaded in a single
+    query and grouped by relation and user.
+    """
+
+    def __init__(self, relations: Iterable[LoggableDataRelation]):
+        self._filenames: defaultdict[tuple[DataRelationKey, int], set[str]] = defaultdict(set)
+        self._users: defaultdict[DataRelationKey, set[User]] = defaultdict(set)
+        relations = list(relations)
+        if not relations:
+            return
+        for log in DataDownloadLog.objects.for_relations(relations).select_related("user"):
+            key = data_download_log_key(log)
+            self._filenames[key, log.user_id].add(log.filename)
+            self._users[key].add(log.user)
+
+    def users(self, relation: LoggableDataRelation) -> set[User]:
+        return set(self._users.get(data_relation_key(relation), set()))
+
+    def filenames(self, user: User, relation: LoggableDataRelation) -> list[str]:
+        return sorted(self._filenames.get((data_relation_key(relation), user.id), set()))
 
 
 def get_camps_and_users_for_data_protection_reminders(
     *, rule: DataRetentionRule, make_relation: Callable[[Camp], LoggableDataRelation]
-) -> Iterable[tuple[Camp, set[User]]]:
+) -> tuple[list[tuple[Camp, User]], DownloadLogs]:
+    """
+    Returns (camp, user) pairs for the reminders that are needed, and the
+    download logs for the camps.
+    """
     relevant_camps = get_relevant_camps_for_data_protection_reminders(rule)
     if relevant_camps is None:
-        return
+        return [], DownloadLogs([])
 
-    for camp in relevant_camps.with_all_leader_admin_data():
+    camps = list(relevant_camps.select_related("camp_name").with_all_leader_admin_data())
+    download_logs = DownloadLogs(make_relation(camp) for camp in camps)
+    items: list[tuple[Camp, User]] = []
+    for camp in camps:
         # Leaders and admins need reminding. This is especially necessary in
         # first year of this feature where download logs will be incomplete
         admin_users: set[User] = camp.leader_and_admin_users
 
         # We also need anyone who may have been an admin temporarily and downloaded something.
-        relation: LoggableDataRelation = make_relation(camp)
-        download_users = get_downloaders_for_data_protection_relation(relation)
+        download_users = download_logs.users(make_relation(camp))
         all_users = admin_users | download_users
 
-        yield camp, all_users
+        items.extend((camp, user) for user in all_users)
+    return items, download_logs
 
 
 def get_relevant_camps_for_data_protection_reminders(rule: DataRetentionRule) -> QuerySet[Camp] | None:
@@ -531,15 +566,6 @@ def get_relevant_camps_for_data_protection_reminders(rule: DataRetentionRule) ->
     return relevant_camps
 
 
-def get_downloaders_for_data_protection_relation(
-    relation: LoggableDataRelation,
-) -> set[User]:
-    download_users = set(
-        User.objects.filter(id__in=DataDownloadLog.objects.for_relation(relation).values_list("user_id", flat=True))
-    )
-    return download_users
-
-
 def in_period_for_sending_data_retention_reminder_emails():
     # The rule is (currently) that data must be removed 1 year after
     # the end of camp. We don't want to send exactly 1 year later,
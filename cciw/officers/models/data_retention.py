@@ -2,11 +2,13 @@
 # because they depend on details of officer functionality.
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import StrEnum
 
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 from cciw.accounts.models import User
@@ -70,6 +72,17 @@ def for_user(self, user: User) -> DataDownloadLogQuerySet:
     def for_relation(self, data_relation: LoggableDataRelation):
         return self.filter(**data_relation_to_specific_log_fields(data_relation))
 
+    def for_relations(self, data_relations: Iterable[LoggableDataRelation]) -> DataDownloadLogQuerySet:
+        """
+        Logs for any of the data relations, in a single query.
+        """
+        condition = Q(pk__in=[])
+        for data_relation in data_relations:
+            condition |= Q(
+                relation_type=data_relation.__class__.__name__, **data_relation_to_specific_log_fields(data_relation)
+            )
+        return self.filter(condition)
+
 
 class DataDownloadLog(models.Model):
     user = models.ForeignKey(User, related_name="data_download_logs", on_delete=models.PROTECT)
@@ -101,3 +114,20 @@ def data_relation_to_specific_log_fields(data_relation: LoggableDataRelation) ->
             return {"camp": camp}
         case DataRelatedToOfficersOnCamp(camp=camp):
             return {"camp": camp}
+
+
+# Key identifying a data relation without needing model instances, so that logs
+# can be grouped by relation without loading the related objects.
+type DataRelationKey = tuple[str, int | None, int | None]
+
+
+def data_relation_key(data_relation: LoggableDataRelation) -> DataRelationKey:
+    match data_relation:
+        case DataRelatedToCampersYear(year=year):
+            return (data_relation.__class__.__name__, year, None)
+        case DataRelatedToCampersOnCamp(camp=camp) | DataRelatedToOfficersOnCamp(camp=camp):
+            return (data_relation.__class__.__name__, None, camp.id)
+
+
+def data_download_log_key(log: DataDownloadLog) -> DataRelationKey:
+    return (log.relation_type, log.year, log.camp_id)
@@ -1,6 +1,8 @@
+from __future__ import annotations
+
 from datetime import date, timedelta
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from django.conf import settings
 
 from cciw.cciwmain.models import Camp
@@ -8,8 +10,13 @@
 from cciw.officers.models import DBSCheck, Reference
 from cciw.utils.stats import accumulate_dates
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def get_camp_officer_stats(camp: Camp) -> pd.DataFrame:
+    import pandas as pd
+
     # For efficiency, we are careful about what DB queries we do and what is
     # done in Python. Some logic from DBSCheck.get_for_camp duplicated here
 
@@ -76,6 +83,8 @@ def trim(ds):
 
 
 def get_camp_officer_stats_trend(start_year: int, end_year: int) -> pd.DataFrame:
+    import pandas as pd
+
     years = list(range(start_year, end_year + 1))
     officer_counts = []
     application_counts = []
@@ -1,5 +1,3 @@
-import encodings
-
 from django import template
 from django.template.defaultfilters import stringfilter
 
@@ -14,42 +12,52 @@ def rtflinebreaks(value: str) -> str:
 
 register.filter(rtflinebreaks)
 
-encoder = encodings.codecs.getencoder("1252")
 
+class RtfTranslationTable(dict):
+    """
+    Table for `str.translate` that replaces all high characters with \\'xx
+    escape sequences, assuming a Windows 1252 code page.
+
+    Entries for high characters are added as they are first seen, so we only
+    call the encoder once for each distinct character.
+    """
 
-def unicode_to_rtf(u: str) -> str:
-    """Replaces all high characters with \\u escape sequences,
-    assuming a Windows 1252 code page"""
     # We will assume Windows code page for now (for maxiumum
     # likelihood of compatibility -- RTF only seems to support
     # the first 65535 chars of unicode anyway).
     # The document should have these codes
     # \ansi\ansicpg1252\uc1
-    output = []
-    for char in u:
-        if ord(char) > 127:
-            try:
-                encoded = encoder(char)
-            except UnicodeEncodeError:
-                encoded = encoder("?")
-            val = ord(encoded[0])
-            if val < 256:
-                # use \' method:
-                converted = "\\'" + hex(val)[2:]
-            else:
-                # Don't know what to do here
-                converted = "?"
-        else:
-            converted = str(char)
-        output.append(converted)
-    return "".join(output)
+
+    def __init__(self, extra: dict[str, str] | None = None):
+        super().__init__({i: chr(i) for i in range(128)})
+        if extra:
+            self.update({ord(char): replacement for char, replacement in extra.items()})
+
+    def __missing__(self, codepoint: int) -> str:
+        try:
+            encoded = chr(codepoint).encode("1252")
+        except UnicodeEncodeError:
+            encoded = b"?"
+        converted = f"\\'{encoded[0]:x}"
+        self[codepoint] = converted
+        return converted
+
+
+_unicode_to_rtf_table = RtfTranslationTable()
+
+_rtfescape_table = RtfTranslationTable({"\\": "\\\\", "{": "\\{", "}": "\\}"})
+
+
+def unicode_to_rtf(u: str) -> str:
+    """Replaces all high characters with \\u escape sequences,
+    assuming a Windows 1252 code page"""
+    return u.translate(_unicode_to_rtf_table)
 
 
 @stringfilter
 def rtfescape(value: str) -> str:
     "Escapes RTF control characters"
-
-    return unicode_to_rtf(value.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}"))
+    return value.translate(_rtfescape_table)
 
 
 register.filter(rtfescape)
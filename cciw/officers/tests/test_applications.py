@@ -5,8 +5,8 @@
 from cciw.accounts.models import User
 from cciw.cciwmain.tests import factories as camps_factories
 from cciw.officers import applications
-from cciw.officers.models import Application, Qualification
-from cciw.officers.templatetags.rtf import unicode_to_rtf
+from cciw.officers.models import Application, Qualification, QualificationType
+from cciw.officers.templatetags.rtf import rtfescape, unicode_to_rtf
 from cciw.officers.tests import factories
 from cciw.officers.tests.base import RequireQualificationTypesMixin
 from cciw.test_utils.webtest import WebTestBase
@@ -238,3 +238,26 @@ def test_unicode_to_rtf():
     assert unicode_to_rtf("hello") == "hello"
     assert unicode_to_rtf("é") == "\\'e9"
     assert unicode_to_rtf("ⓒ") == "\\'3f"  # == '?'
+
+
+def test_rtfescape():
+    assert rtfescape("hello") == "hello"
+    assert rtfescape("{a\\b}") == "\\{a\\\\b\\}"
+    assert rtfescape("café ⓒ") == "caf\\'e9 \\'3f"
+
+
+def test_render_application(db, django_assert_num_queries):
+    qualification_type = QualificationType.objects.create(name="First Aid")
+    application = factories.create_application(
+        full_name="Zoë Bloggs",
+        qualifications=[Qualification(type=qualification_type, issued_on=date(2020, 1, 1))],
+    )
+    application = Application.objects.select_related("officer").get(id=application.id)
+    # Qualifications and the two referees are loaded once for both documents:
+    with django_assert_num_queries(3):
+        rendered = applications.render_application(application)
+    assert "Zoë Bloggs" in rendered.text
+    assert "First Aid, issued 2020-01-01" in rendered.text
+    assert "Zo\\'eb Bloggs" in rendered.rtf
+    assert "First Aid, issued 2020-01-01" in rendered.rtf
+    assert rendered.rtf_filename == applications.application_rtf_filename(application)
@@ -4,6 +4,7 @@
 from cciw.bookings import factories
 from cciw.cciwmain.tests import factories as camp_factories
 from cciw.officers.tests import factories as officer_factories
+from cciw.utils import xl
 
 
 def test_export_camper_data(db, client: Client):
@@ -26,7 +27,12 @@ def test_export_camper_data(db, client: Client):
     assert resp2.headers["Content-Type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     filename = f"CCIW-camp-{camp.year}-{camp.slug_name}-campers.xlsx"
     assert resp2.headers["Content-Disposition"] == f"attachment; filename={filename}"
-    # Content is tested more easily using tests for `camp_bookings_to_spreadsheet`
+    # Content is tested more easily using tests for `camp_bookings_to_spreadsheet`,
+    # but we check the notice sheet is added:
+    workbook = xl.workbook_from_bytes(b"".join(resp2.streaming_content))
+    assert workbook.sheetnames[0] == "Notice"
+    assert workbook.worksheets[0].cell(1, 1).value == "Data retention notice:"
+    assert len(workbook.sheetnames) > 1
 
     download_logs = user.data_download_logs.all()
     assert len(download_logs) == 1
@@ -1,6 +1,7 @@
 from collections.abc import Iterable, Sequence
 from datetime import date, timedelta
 
+import pytest
 from django.core import mail
 from django.test import Client
 from django.urls import reverse
@@ -145,3 +146,22 @@ def download_bookings_data(client: Client, user: User, year: int) -> None:
     client.force_login(user)
     url1 = reverse("cciw-officers-export_camper_data_for_year", kwargs=dict(year=year))
     client.get(url1)
+
+
+@pytest.mark.parametrize("camp_count", [1, 4])
+def test_data_cleanup_reminders_query_count(db, client: Client, django_assert_num_queries, camp_count):
+    with travel(date(2021, 1, 2)):
+        camps = []
+        for i in range(camp_count):
+            leader = officer_factories.create_officer()
+            camp = camp_factories.create_camp(leader=leader, start_date=date(2021, 8, 1 + i))
+            camp.admins.add(officer_factories.create_officer())
+            download_camper_data(client, user=leader, camp=camp)
+            camps.append(camp)
+
+    mail.outbox = []
+    with travel(max(camp.end_date for camp in camps) + timedelta(days=32)):
+        # The same however many camps and users there are
+        with django_assert_num_queries(23):
+            send_data_retention_reminder_emails()
+    assert len(mail.outbox) == camp_count * 2
@@ -0,0 +1,113 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from cciw.cciwmain.models import DatabasePoolStats, ViewStats
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.officers.tests import factories
+from cciw.test_utils.webtest import WebTestBase
+from cciw.view_stats import (
+    QUERY_COUNT_BUCKETS,
+    PendingPoolStats,
+    add_to_histogram,
+    collector,
+    format_percentile,
+    get_pool_stats_summaries,
+    get_view_stats_summaries,
+    save_pending_pool_stats,
+)
+
+
+def test_histograms():
+    histogram = []
+    for value in [1, 1, 3, 3, 3, 3, 3, 3, 3, 10000]:
+        histogram = add_to_histogram(histogram, QUERY_COUNT_BUCKETS, value)
+    assert histogram == [2, 0, 7, 0, 0, 0, 0, 0, 0, 1]
+    assert format_percentile(histogram, QUERY_COUNT_BUCKETS, 50) == "≤ 5"
+    assert format_percentile(histogram, QUERY_COUNT_BUCKETS, 95) == "> 500"
+    assert format_percentile([], QUERY_COUNT_BUCKETS, 95) == ""
+
+
+class TestViewStats(WebTestBase):
+    def test_collect_and_display(self):
+        for i in range(3):
+            camps_factories.create_camp()
+        self.shortcut_login(factories.create_webmaster())
+
+        with override_settings(VIEW_STATS_SAMPLE_RATE=1):
+            self.get_url("cciw-cciwmain-camps_index")
+            self.get_url("cciw-cciwmain-camps_index")
+        collector.flush()
+
+        stats = ViewStats.objects.get(view_name="cciw-cciwmain-camps_index")
+        assert stats.request_count == 2
+        assert stats.query_count_total > 0
+        assert stats.response_time_total > 0
+        assert stats.render_time_total > 0
+        assert sum(stats.response_time_histogram) == 2
+
+        # Flushing again adds to the same row
+        with override_settings(VIEW_STATS_SAMPLE_RATE=1):
+            self.get_url("cciw-cciwmain-camps_index")
+        collector.flush()
+        stats.refresh_from_db()
+        assert stats.request_count == 3
+
+        [summary] = [
+            s for s in get_view_stats_summaries(days=1, limit=10) if s.view_name == "cciw-cciwmain-camps_index"
+        ]
+        assert summary.request_count == 3
+
+        self.get_url("cciw-officers-view_stats")
+        self.assertTextPresent("cciw-cciwmain-camps_index")
+
+    def test_not_sampled(self):
+        self.app.get(reverse("cciw-cciwmain-camps_index"))
+        collector.flush()
+        assert not ViewStats.objects.exists()
+
+
+@pytest.mark.django_db
+def test_pool_stats():
+    psycopg_pool = pytest.importorskip("psycopg_pool")
+    settings_dict = connection.settings_dict
+    pool = psycopg_pool.ConnectionPool(
+        kwargs=dict(
+            dbname=settings_dict["NAME"],
+            user=settings_dict["USER"],
+            password=settings_dict["PASSWORD"],
+            host=settings_dict["HOST"],
+            port=settings_dict["PORT"],
+        ),
+        min_size=1,
+        max_size=1,
+        timeout=0.1,
+    )
+    with pool:
+        pool.wait()
+        with pool.connection():
+            with pytest.raises(psycopg_pool.PoolTimeout):
+                pool.getconn()
+            pending = PendingPoolStats()
+            pending.add_gauges(pool.get_stats())
+        pending.add_counters(pool.pop_stats())
+
+    assert pending.request_count == 2
+    assert pending.queued_count == 1
+    assert pending.timeout_count == 1
+    assert pending.wait_time_total_ms >= 100
+    assert pending.connection_count == 1
+    assert pending.max_checked_out == 1
+
+    today = timezone.localdate()
+    save_pending_pool_stats(pending, today)
+    save_pending_pool_stats(pending, today)
+    stats = DatabasePoolStats.objects.get(recorded_on=today)
+    assert stats.request_count == 4
+    assert stats.max_checked_out == 1
+
+    [summary] = get_pool_stats_summaries(days=1)
+    assert summary.queued_percent == 50
+    assert summary.timeout_count == 2
@@ -167,6 +167,11 @@
         views.booking_queue_row,
         name="cciw-officers-booking_queue_row",
     ),
+    path(
+        "bookings/queue/<campid:camp_id>/simulation-json/",
+        views.booking_queue_simulation_json,
+        name="cciw-officers-booking_queue_simulation_json",
+    ),
     # Bookings progress
     path(
         "bookings/booking-progress-stats/<yyyy:start_year>-<yyyy:end_year>/",
@@ -246,4 +251,5 @@
         views.data_erasure_request_execute,
         name="cciw-officers-data_erasure_request_execute",
     ),
+    path("view-stats/", views.view_stats, name="cciw-officers-view_stats"),
 ]
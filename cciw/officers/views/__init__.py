@@ -24,6 +24,7 @@
 from .booking_secretary import (
     booking_queue,
     booking_queue_row,
+    booking_queue_simulation_json,
     booking_queues,
     booking_secretary_reports,
     booking_summary_stats,
@@ -73,6 +74,6 @@
 from .menus import index
 from .referees import create_reference, create_reference_thanks
 from .visitor_book import visitor_book_printout, visitor_book_utilities
-from .webmaster import data_erasure_request_execute, data_erasure_request_plan, data_erasure_request_start
+from .webmaster import data_erasure_request_execute, data_erasure_request_plan, data_erasure_request_start, view_stats
 
 cciw_password_reset = PasswordResetView.as_view(form_class=CciwPasswordResetForm)
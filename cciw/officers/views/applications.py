@@ -19,6 +19,7 @@
     application_to_rtf,
     application_to_text,
     application_txt_filename,
+    render_application,
     thisyears_applications,
 )
 from cciw.officers.views.utils.auth import active_staff_required
@@ -122,9 +123,8 @@ def get_application(request: HttpRequest) -> HttpResponse:
         resp["Content-Disposition"] = f"attachment; filename={application_rtf_filename(app)}"
         return resp
     elif format == "send":
-        application_text = application_to_text(app)
-        application_rtf = application_to_rtf(app)
-        rtf_attachment = (application_rtf_filename(app), application_rtf, "text/rtf")
+        rendered = render_application(app)
+        rtf_attachment = (rendered.rtf_filename, rendered.rtf, "text/rtf")
 
         msg = f"""Dear {request.user.first_name},
 
@@ -132,7 +132,7 @@ def get_application(request: HttpRequest) -> HttpResponse:
  -- in plain text below and an RTF version attached.
 
 """
-        msg = msg + application_text
+        msg = msg + rendered.text
 
         send_mail_with_attachments(
             f"[CCIW] Copy of CCiW application - {app.full_name}",
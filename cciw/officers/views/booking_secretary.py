@@ -1,7 +1,9 @@
+import itertools
+import math
 from datetime import datetime
 
-import pandas_highcharts.core
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import Http404, HttpResponseRedirect
 from django.template.response import TemplateResponse
@@ -16,6 +18,7 @@
     get_camp_booking_queue_ranking_result,
 )
 from cciw.bookings.models.yearconfig import get_booking_open_data, get_year_config
+from cciw.bookings.queue_simulation import CapacityScenario, QueueSimulation
 from cciw.bookings.stats import get_booking_summary_stats
 from cciw.bookings.utils import (
     addresses_for_mailing_list,
@@ -28,6 +31,7 @@
 from cciw.officers.forms import UpdateQueueEntryForm
 from cciw.officers.views.utils.campid import get_camp_or_404
 from cciw.utils.spreadsheet import ExcelFromDataFrameBuilder
+from cciw.utils.stats import serialize_chart
 from cciw.utils.views import for_htmx
 
 from ..models.data_retention import (
@@ -139,7 +143,7 @@ def booking_summary_stats(request: HttpRequest, start_year: int, end_year: int)
             "title": f"Booking summary {start_year}-{end_year}",
             "start_year": start_year,
             "end_year": end_year,
-            "chart_data": pandas_highcharts.core.serialize(chart_data, output_type="json"),
+            "chart_data": serialize_chart(chart_data),
         },
     )
 
@@ -264,6 +268,65 @@ def booking_queue(request: HttpRequest, camp_id: CampId) -> HttpResponse:
     return TemplateResponse(request, "cciw/officers/booking_queue.html", context)
 
 
+# Enough for comparing a grid of options, without letting one request run
+# for too long.
+MAX_QUEUE_SIMULATION_SCENARIOS = 1000
+MAX_QUEUE_SIMULATION_VALUES = 100
+
+
+@camp_admin_required
+@json_response
+def booking_queue_simulation_json(request: HttpRequest, camp_id: CampId) -> dict:
+    """
+    Accepted counts etc. for the camp's queue with different capacities.
+
+    Each of `max_campers`, `max_male_campers` and `max_female_campers` can be
+    given as a comma separated list of values, and every combination is
+    simulated. Missing values mean the camp's current setting.
+    """
+    camp = get_camp_or_404(camp_id)
+    year_config = get_year_config(year=camp.year)
+    if year_config is None:
+        raise Http404
+
+    options: dict[str, list[int | None]] = {}
+    for param in ["max_campers", "max_male_campers", "max_female_campers"]:
+        value = request.GET.get(param, "")
+        values = value.split(",") if value else []
+        if len(values) > MAX_QUEUE_SIMULATION_VALUES:
+            raise ValidationError({param: f"No more than {MAX_QUEUE_SIMULATION_VALUES} values are allowed"})
+        try:
+            options[param] = [int(v) for v in values] or [None]
+        except ValueError:
+            raise ValidationError({param: "Enter a comma separated list of numbers"})
+    # Check before building the scenarios, which could otherwise use a lot of memory
+    if math.prod(len(values) for values in options.values()) > MAX_QUEUE_SIMULATION_SCENARIOS:
+        raise ValidationError({"__all__": f"No more than {MAX_QUEUE_SIMULATION_SCENARIOS} scenarios are allowed"})
+    scenarios = [
+        CapacityScenario(**dict(zip(options.keys(), values))) for values in itertools.product(*options.values())
+    ]
+
+    simulation = QueueSimulation.for_camp(camp=camp, year_config=year_config)
+    return {
+        "status": "success",
+        "results": [
+            {
+                "max_campers": outcome.scenario.max_campers,
+                "max_male_campers": outcome.scenario.max_male_campers,
+                "max_female_campers": outcome.scenario.max_female_campers,
+                "accepted": dict(
+                    total=outcome.places_to_allocate.total,
+                    male=outcome.places_to_allocate.male,
+                    female=outcome.places_to_allocate.female,
+                ),
+                "split_sibling_group_count": outcome.split_sibling_group_count,
+                "rejected_officer_children": [booking.name for booking in outcome.rejected_officer_children],
+            }
+            for outcome in simulation.run(scenarios)
+        ],
+    }
+
+
 def _booking_context_common(request) -> dict:
     can_edit_bookings = request.user.can_edit_bookings
     can_view_booking_info = (can_edit_bookings or request.user.can_view_booking_info,)
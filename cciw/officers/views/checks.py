@@ -3,7 +3,8 @@
 from functools import wraps
 from typing import TYPE_CHECKING
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
 
 from cciw.utils.functional import func_name
 
@@ -28,7 +29,7 @@ def check_officers_views[**P](view_func: ViewFunc[P]) -> ViewFunc[P]:
         raise AssertionError(message)
 
     @wraps(view_func)
-    def wrapped(request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> HttpResponse:
+    def wrapped(request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> HttpResponseBase:
         resp = view_func(request, *args, **kwargs)
         # Check 2:
         # - if the response is a SensitiveDownloadResponse,
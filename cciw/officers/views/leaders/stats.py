@@ -1,5 +1,7 @@
-import pandas as pd
-import pandas_highcharts.core
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
@@ -9,6 +11,7 @@
 from cciw.cciwmain.models import Camp
 from cciw.officers.models.data_retention import NoSensitiveData
 from cciw.utils.spreadsheet import ExcelFromDataFrameBuilder
+from cciw.utils.stats import serialize_chart
 
 from ...stats import get_camp_officer_stats, get_camp_officer_stats_trend
 from ..utils.auth import (
@@ -18,6 +21,9 @@
 from ..utils.campid import get_camp_or_404
 from ..utils.spreadsheets import spreadsheet_response
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 @camp_admin_required
 @with_breadcrumbs(leaders_breadcrumbs)
@@ -34,9 +40,7 @@ def officer_stats(request, year: int):
         charts.append(
             (
                 camp,
-                pandas_highcharts.core.serialize(
-                    df, title=f"{camp.name} - {camp.leaders_formatted}", output_type="json"
-                ),
+                serialize_chart(df, title=f"{camp.name} - {camp.leaders_formatted}"),
             )
         )
     return TemplateResponse(
@@ -68,9 +72,7 @@ def officer_stats_trend(request, start_year: int, end_year: int):
             "title": f"Officer stats {start_year}-{end_year}",
             "start_year": start_year,
             "end_year": end_year,
-            "chart_data": pandas_highcharts.core.serialize(
-                data, title=f"Officer stats {start_year} - {end_year}", output_type="json"
-            ),
+            "chart_data": serialize_chart(data, title=f"Officer stats {start_year} - {end_year}"),
         },
     )
 
@@ -137,14 +139,8 @@ def booking_progress_stats(
             "end_year": end_year,
             "camps": camp_objs,
             "camp_ids": camp_ids,
-            "dates_chart_data": pandas_highcharts.core.serialize(
-                data_dates, title="Bookings by date", output_type="json"
-            ),
-            "rel_days_chart_data": pandas_highcharts.core.serialize(
-                data_rel_days,
-                title="Bookings by days relative to start of camp",
-                output_type="json",
-            ),
+            "dates_chart_data": serialize_chart(data_dates, title="Bookings by date"),
+            "rel_days_chart_data": serialize_chart(data_rel_days, title="Bookings by days relative to start of camp"),
         },
     )
 
@@ -219,7 +215,7 @@ def booking_ages_stats(
             "end_year": end_year,
             "camps": camps,
             "camp_ids": camp_ids,
-            "chart_data": pandas_highcharts.core.serialize(data, title="Age of campers", output_type="json"),
+            "chart_data": serialize_chart(data, title="Age of campers"),
             "colors_data": colors,
             "stack_columns": stack_columns,
         },
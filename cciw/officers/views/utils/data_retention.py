@@ -5,7 +5,8 @@
 from typing import Any, Literal, Protocol, overload
 
 import furl
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.template.response import TemplateResponse
 
 from cciw.officers.models.data_retention import DataRelation, DataRetentionRule, NoSensitiveData, log_data_download
@@ -55,12 +56,12 @@ class DownloadViewFunc[**P](Protocol):
     def __call__(self, request: HttpRequest, *args: P.args, **kwargs: P.kwargs) -> SensitiveDownloadResponse: ...
 
 
-class SensitiveDownloadResponse(HttpResponse):
-    def __init__(self, content=b"", *args, data_relation: DataRelation, filename: str, **kwargs):
+class SensitiveDownloadResponse(StreamingHttpResponse):
+    def __init__(self, streaming_content=(), *args, data_relation: DataRelation, filename: str, **kwargs):
         """
-        HTTP response for a sensitive download.
+        HTTP response for a sensitive download, streamed from an iterator of bytes.
         """
-        super().__init__(content, *args, **kwargs)
+        super().__init__(streaming_content, *args, **kwargs)
         self.data_relation = data_relation
         self.filename = filename
         self.headers["Content-Disposition"] = f"attachment; filename={filename}"
@@ -100,7 +101,7 @@ def sensitive_data_download[**P](
 
     def decorator(func: DownloadViewFunc[P]) -> ViewFunc[P]:
         @wraps(func)
-        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
             htmx = "HX-Request" in request.headers
             if "data_retention_notice_seen" in request.GET or skip_notice:
                 response = func(request, *args, **kwargs)
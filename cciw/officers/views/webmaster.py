@@ -6,13 +6,16 @@
 
 from cciw.data_retention.erasure_requests import data_erasure_request_create_plan, data_erasure_request_search
 from cciw.data_retention.models import ErasureExecutionLog
+from cciw.view_stats import get_pool_stats_summaries, get_view_stats_summaries
 
 from .utils.auth import webmaster_required
 
 
 class SearchForm(forms.Form):
     query = forms.CharField(
-        widget=forms.TextInput(attrs={"placeholder": "email", "id": "searchbar"}),
+        widget=forms.TextInput(
+            attrs={"placeholder": "email, name or post code - separate multiple with commas", "id": "searchbar"}
+        ),
     )
 
 
@@ -93,3 +96,27 @@ def data_erasure_request_execute(request: HttpRequest) -> TemplateResponse:
             "erasure_log": erasure_log,
         },
     )
+
+
+VIEW_STATS_DAYS_CHOICES = [1, 7, 30, 90]
+
+
+@webmaster_required
+def view_stats(request: HttpRequest) -> TemplateResponse:
+    try:
+        days = int(request.GET.get("days", 7))
+    except ValueError:
+        days = 7
+    if days not in VIEW_STATS_DAYS_CHOICES:
+        days = 7
+    return TemplateResponse(
+        request,
+        "cciw/officers/view_stats.html",
+        {
+            "title": "View performance stats",
+            "days": days,
+            "days_choices": VIEW_STATS_DAYS_CHOICES,
+            "summaries": get_view_stats_summaries(days=days, limit=50),
+            "pool_summaries": get_pool_stats_summaries(days=days),
+        },
+    )
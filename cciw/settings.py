@@ -41,6 +41,9 @@
 
 TESTS_RUNNING = DEVBOX and "pytest" in sys.modules
 
+# For a local server that load tests are run against, see docs/development.rst
+LOAD_TESTING = DEVBOX and bool(os.environ.get("CCIW_LOAD_TESTING"))
+
 if DEPLOYED:
     LOG_PATH = HOME_PATH / "logs"  # See fabfile
 else:
@@ -80,7 +83,7 @@ def show_toolbar(request):
 else:
     DEBUG = False
 
-USE_DEBUG_TOOLBAR = True
+USE_DEBUG_TOOLBAR = not LOAD_TESTING
 
 INTERNAL_IPS = ("127.0.0.1",)
 
@@ -121,6 +124,8 @@ def show_toolbar(request):
 
 if DEVBOX:
     ALLOWED_HOSTS.extend(["cciw.local", ".ngrok.io", ".ngrok-free.app"])
+    if LOAD_TESTING:
+        ALLOWED_HOSTS.append("localhost")
 
 FIRST_PARTY_APPS = [
     "cciw.accounts",
@@ -420,6 +425,26 @@ def show_toolbar(request):
     }
 }
 
+# Connection pooling using psycopg's pool (each gunicorn worker process has its
+# own pool). This is only switched on for processes that set CCIW_DB_POOL=1,
+# which is the gunicorn workers (see config/supervisor.conf.template). Other
+# processes keep plain persistent connections: the django_q cluster forks its
+# workers, which doesn't work with pool threads started in the parent, and
+# runmailer_pg and cron jobs have no use for a pool.
+DB_CONNECTION_POOL = not TESTS_RUNNING and os.environ.get("CCIW_DB_POOL", "0") == "1"
+DB_CONNECTION_POOL_OPTIONS = {
+    "min_size": 1,
+    "max_size": 4,
+    # Seconds to wait for a connection before raising PoolTimeout:
+    "timeout": 10,
+    # Seconds before closing connections above min_size that are unused:
+    "max_idle": 300,
+}
+
+if DB_CONNECTION_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # Required by Django when pooling
+    DATABASES["default"]["OPTIONS"] = {"pool": DB_CONNECTION_POOL_OPTIONS}
+
 # == STORAGE ==
 
 STORAGES = {
@@ -536,9 +561,10 @@ def show_toolbar(request):
 # == MIDDLEWARE ==
 
 _MIDDLEWARE = [
-    (DEVBOX and DEBUG, "cciw.db_debug.db_debug_middleware"),
+    (DEVBOX and DEBUG and not LOAD_TESTING, "cciw.db_debug.db_debug_middleware"),
+    (True, "cciw.view_stats.ViewStatsMiddleware"),
     (True, "django.middleware.security.SecurityMiddleware"),
-    (True, "django.middleware.gzip.GZipMiddleware"),
+    (True, "cciw.middleware.compression.compression_middleware"),
     (USE_DEBUG_TOOLBAR and DEBUG, "debug_toolbar.middleware.DebugToolbarMiddleware"),
     (True, "django.contrib.sessions.middleware.SessionMiddleware"),
     (True, "django.middleware.common.CommonMiddleware"),
@@ -555,6 +581,16 @@ def show_toolbar(request):
 
 MIDDLEWARE = tuple(val for (test, val) in _MIDDLEWARE if test)
 
+# Full-page cache of public pages for anonymous visitors - see
+# cciw/cciwmain/page_cache.py. Off in development so that template changes are
+# seen straight away.
+ANONYMOUS_PAGE_CACHE = not DEVBOX or TESTS_RUNNING or LOAD_TESTING
+
+# Proportion of requests for which we record query counts and timings - see
+# cciw/view_stats.py
+VIEW_STATS_SAMPLE_RATE = 0.02 if DEPLOYED else 0
+VIEW_STATS_FLUSH_INTERVAL = timedelta(minutes=1)
+
 # == MESSAGES ==
 
 MESSAGE_STORAGE = "django.contrib.messages.storage.fallback.FallbackStorage"
@@ -1,9 +1,13 @@
 from django.http import Http404, HttpRequest
 from django.template.response import TemplateResponse
 
+from cciw.cciwmain.decorators import cache_compressed
+from cciw.cciwmain.page_cache import anonymous_page_cache
 from cciw.sitecontent.models import MenuLink
 
 
+@cache_compressed
+@anonymous_page_cache(depends_on=["sitecontent.HtmlChunk"])
 def find(request: HttpRequest, path: str, template_name: str = "cciw/chunk_page.html") -> TemplateResponse:
     if path in ("", "/"):
         url = "/"
@@ -4,6 +4,7 @@
 
 import logging
 from datetime import date
+from unittest import mock
 
 import time_machine
 from django.test import TestCase
@@ -50,3 +51,11 @@ def enable(self):
 
     def disable(self):
         logging.disable(logging.NOTSET)
+
+
+def run_async_tasks_immediately(target: str):
+    """
+    Patch the `async_task` function imported at `target` so that tasks are run
+    immediately instead of being put on the django-q queue. Returns the mock.
+    """
+    return mock.patch(target, side_effect=lambda func, *args, **kwargs: func(*args, **kwargs))
@@ -0,0 +1,129 @@
+"""
+Utilities for micro-benchmarks - see cciw/benchmarks/ and docs/development.rst
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import texttable
+from django.db import connection
+
+# Results from the current pytest session, saved by the hook in conftest.py
+collected_results: list[BenchmarkResult] = []
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    queries: int
+    rounds: int
+    best_seconds: float
+    median_seconds: float
+
+
+def run_benchmark[T](name: str, func: Callable[[], T], *, rounds: int = 10) -> tuple[T, BenchmarkResult]:
+    """
+    Runs `func` once to count queries (and warm up), then `rounds` more times
+    for timings. Returns the last return value of `func` and the result.
+    """
+    # We don't use CaptureQueriesContext, because the test client resets
+    # `connection.queries` at the start of each request.
+    queries: list[str] = []
+
+    def record_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record_query):
+        retval = func()
+    timings = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        retval = func()
+        timings.append(time.perf_counter() - start)
+    result = BenchmarkResult(
+        name=name,
+        queries=len(queries),
+        rounds=rounds,
+        best_seconds=min(timings),
+        median_seconds=statistics.median(timings),
+    )
+    collected_results.append(result)
+    return retval, result
+
+
+def save_results(results: list[BenchmarkResult], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([asdict(result) for result in sorted(results, key=lambda r: r.name)], indent=2))
+
+
+def load_results(path: Path) -> list[BenchmarkResult]:
+    return [BenchmarkResult(**item) for item in json.loads(path.read_text())]
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: BenchmarkResult
+    current: BenchmarkResult
+    time_change: float
+    is_time_regression: bool
+    is_query_regression: bool
+
+    @property
+    def is_regression(self) -> bool:
+        return self.is_time_regression or self.is_query_regression
+
+
+def compare_results(
+    baseline: list[BenchmarkResult], current: list[BenchmarkResult], *, threshold: float
+) -> list[Comparison]:
+    """
+    Compares benchmarks present in both lists. Times are compared using the
+    best round, and are a regression if slower by more than `threshold` (a
+    fraction e.g. 0.2 for 20%). Any increase in query count is a regression.
+    """
+    baseline_by_name = {result.name: result for result in baseline}
+    comparisons = []
+    for result in current:
+        old = baseline_by_name.get(result.name)
+        if old is None:
+            continue
+        time_change = (result.best_seconds - old.best_seconds) / old.best_seconds if old.best_seconds else 0
+        comparisons.append(
+            Comparison(
+                name=result.name,
+                baseline=old,
+                current=result,
+                time_change=time_change,
+                is_time_regression=time_change > threshold,
+                is_query_regression=result.queries > old.queries,
+            )
+        )
+    return comparisons
+
+
+def format_comparisons(comparisons: list[Comparison]) -> str:
+    table = texttable.Texttable(max_width=0)
+    table.set_deco(texttable.Texttable.HEADER)
+    table.header(["Benchmark", "Queries before", "Queries after", "ms before", "ms after", "Change", ""])
+    table.set_cols_dtype(["t"] * 7)
+    for c in comparisons:
+        table.add_row(
+            [
+                c.name,
+                c.baseline.queries,
+                c.current.queries,
+                f"{c.baseline.best_seconds * 1000:.2f}",
+                f"{c.current.best_seconds * 1000:.2f}",
+                f"{c.time_change:+.0%}",
+                "REGRESSION" if c.is_regression else "",
+            ]
+        )
+    return table.draw()
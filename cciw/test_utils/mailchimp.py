@@ -0,0 +1,151 @@
+"""
+Local HTTP server that stands in for the parts of the Mailchimp API we use,
+for testing and benchmarking newsletter syncing offline.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/3.0"
+
+_member_path_re = re.compile(r"^/lists/(?P<list_id>[^/]+)/members/(?P<mailchimp_id>[0-9a-f]+)$")
+_members_path_re = re.compile(r"^/lists/(?P<list_id>[^/]+)/members/?$")
+
+
+@dataclass
+class StubResponse:
+    status: int
+    data: dict = field(default_factory=dict)
+
+
+class MailchimpStub:
+    """
+    Members of all lists are stored in `members`, keyed by list ID and then
+    by Mailchimp ID (hashed email). Batches are processed immediately.
+    Requests received are recorded in `requests` as (method, path) tuples.
+    """
+
+    def __init__(self):
+        self.members: dict[str, dict[str, dict]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.batch_count = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url_base(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_member(self, list_id: str, email: str, status: str) -> None:
+        self.members.setdefault(list_id, {})[_mailchimp_id(email)] = {"email_address": email, "status": status}
+
+    def get_member_status(self, list_id: str, email: str) -> str | None:
+        member = self.members.get(list_id, {}).get(_mailchimp_id(email))
+        return None if member is None else member["status"]
+
+    def handle(self, method: str, path: str, query: dict[str, list[str]], body: dict | None) -> StubResponse:
+        with self.lock:
+            self.requests.append((method, path))
+            return self._handle(method, path, query, body)
+
+    def _handle(self, method: str, path: str, query: dict[str, list[str]], body: dict | None) -> StubResponse:
+        if path == "/batches" and method == "POST":
+            assert body is not None
+            errored = 0
+            for operation in body["operations"]:
+                op_body = json.loads(operation["body"]) if operation.get("body") else None
+                result = self._handle(operation["method"], operation["path"], {}, op_body)
+                if result.status != 200:
+                    errored += 1
+            self.batch_count += 1
+            return StubResponse(
+                200,
+                {
+                    "id": f"batch-{self.batch_count}",
+                    "status": "finished",
+                    "total_operations": len(body["operations"]),
+                    "errored_operations": errored,
+                },
+            )
+
+        if match := _members_path_re.match(path):
+            members = self.members.setdefault(match["list_id"], {})
+            if method == "GET":
+                count = int(query.get("count", ["10"])[0])
+                offset = int(query.get("offset", ["0"])[0])
+                page = list(members.values())[offset : offset + count]
+                return StubResponse(200, {"members": page, "total_items": len(members)})
+            if method == "POST":
+                assert body is not None
+                mailchimp_id = _mailchimp_id(body["email_address"])
+                if mailchimp_id in members:
+                    return StubResponse(400, {"detail": "Member Exists"})
+                members[mailchimp_id] = {"email_address": body["email_address"], "status": body["status"]}
+                return StubResponse(200, members[mailchimp_id])
+
+        if match := _member_path_re.match(path):
+            members = self.members.setdefault(match["list_id"], {})
+            member = members.get(match["mailchimp_id"])
+            if method == "GET":
+                if member is None:
+                    return StubResponse(404, {"detail": "Resource Not Found"})
+                return StubResponse(200, member)
+            if method == "PATCH":
+                assert body is not None
+                if member is None:
+                    return StubResponse(404, {"detail": "Resource Not Found"})
+                member.update(body)
+                return StubResponse(200, member)
+            if method == "PUT":
+                assert body is not None
+                if member is None:
+                    member = {"email_address": body["email_address"], "status": body["status_if_new"]}
+                    members[match["mailchimp_id"]] = member
+                elif "status" in body:
+                    member["status"] = body["status"]
+                return StubResponse(200, member)
+
+        return StubResponse(404, {"detail": f"Unknown resource {method} {path}"})
+
+
+def _mailchimp_id(email: str) -> str:
+    return hashlib.md5(email.lower().encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _make_handler(stub: MailchimpStub) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # For keep-alive
+
+        def _respond(self):
+            url = urlparse(self.path)
+            path = url.path.removeprefix(API_PREFIX)
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length)) if length else None
+            result = stub.handle(self.command, path, parse_qs(url.query), body)
+            content = json.dumps(result.data).encode("utf-8")
+            self.send_response(result.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_PATCH = _respond
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
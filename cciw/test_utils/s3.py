@@ -0,0 +1,51 @@
+"""
+Local stub for S3, for testing incoming mail handling.
+"""
+
+import io
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.response import StreamingBody
+
+
+class LocalS3Stub:
+    """
+    Stub for the S3 bucket that SES saves incoming mail to. Objects are stored
+    in `objects`, keyed by message ID, and returned from a real boto3 client
+    without any network access.
+    """
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.get_object_count = 0
+        self.bytes_read = 0
+        self.client = boto3.client(
+            "s3", region_name="eu-west-1", aws_access_key_id="testing", aws_secret_access_key="testing"
+        )
+        self.client.meta.events.register("before-parameter-build.s3.GetObject", self._save_key)
+        self.client.meta.events.register("before-call.s3.GetObject", self._get_object)
+
+    def _save_key(self, params, context, **kwargs):
+        context["local_s3_key"] = params["Key"]
+
+    def _get_object(self, context, **kwargs):
+        key = context["local_s3_key"]
+        self.get_object_count += 1
+        if key not in self.objects:
+            error = {"Error": {"Code": "NoSuchKey", "Message": "The specified key does not exist."}}
+            return AWSResponse(None, 404, {}, None), error
+        data = self.objects[key]
+        body = StreamingBody(_CountingBytesIO(self, data), len(data))
+        return AWSResponse(None, 200, {}, None), {"Body": body, "ContentLength": len(data)}
+
+
+class _CountingBytesIO(io.BytesIO):
+    def __init__(self, stub: LocalS3Stub, data: bytes):
+        super().__init__(data)
+        self.stub = stub
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.stub.bytes_read += len(data)
+        return data
@@ -0,0 +1,250 @@
+"""
+Generation of realistic data for a booking year, for load testing against a
+local database.
+
+Everything created here can be found again using the `LOAD_TEST_` prefixes
+below, so that load test scenarios can log in as the generated users.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from enum import StrEnum
+
+from django.db import transaction
+
+from cciw.accounts.models import User
+from cciw.bookings import factories as bookings_factories
+from cciw.bookings.models import Booking, BookingAccount, YearConfig
+from cciw.bookings.models.states import BookingState
+from cciw.cciwmain.models import Camp
+from cciw.cciwmain.tests import factories as camps_factories
+from cciw.officers.tests import factories as officers_factories
+
+from .fake import FakeBookingAccountData, FakeCamp, FakeCamperData, random_family_size, seed
+
+LOAD_TEST_ACCOUNT_EMAIL = "loadtest-account-{n}@example.com"
+LOAD_TEST_LEADER_USERNAME = "loadtest_leader_{n}"
+LOAD_TEST_OFFICER_USERNAME = "loadtest_officer_{n}"
+LOAD_TEST_BOOKING_SECRETARY_USERNAME = "loadtest_booking_secretary"
+# Used for all generated officers. Must pass our password checks.
+LOAD_TEST_OFFICER_PASSWORD = "load test officer password 9q7w"
+
+# Camps in a typical year, (name, minimum_age, maximum_age)
+LOAD_TEST_CAMPS = [
+    ("Blue", 11, 17),
+    ("Red", 11, 17),
+    ("Green", 11, 17),
+    ("Yellow", 11, 17),
+    ("Purple", 11, 17),
+    ("Orange", 17, 22),
+]
+
+OFFICERS_PER_CAMP = 20
+
+
+class LoadTestPhase(StrEnum):
+    # Bookings have just opened, with no initial bookings yet, for the
+    # "booking open morning" scenario
+    BOOKING_OPEN = "booking-open"
+    # The initial booking period is over, and there are lots of bookings in the
+    # queue, for the "allocation day" scenario
+    ALLOCATION = "allocation"
+
+
+class LoadTestDataExists(Exception):
+    pass
+
+
+@dataclass
+class LoadTestDataSummary:
+    year: int
+    camps: int
+    accounts: int
+    previous_year_bookings: int
+    queued_bookings: int
+    officers: int
+
+    def __str__(self) -> str:
+        return (
+            f"Year {self.year}: {self.camps} camps, {self.accounts} booking accounts, "
+            f"{self.previous_year_bookings} previous year bookings, {self.queued_bookings} bookings in queue, "
+            f"{self.officers} officers"
+        )
+
+
+def generate_load_test_year(
+    *,
+    year: int,
+    accounts: int,
+    phase: LoadTestPhase,
+    returning_proportion: float = 0.6,
+    random_seed: int = 1,
+    progress: Callable[[str], None] = lambda message: None,
+) -> LoadTestDataSummary:
+    """
+    Create camps, officers and booking accounts for `year`, plus bookings for
+    the previous year (for a `returning_proportion` of accounts). For the
+    ALLOCATION phase, current year bookings are also added to the queue.
+    """
+    if BookingAccount.objects.filter(email=LOAD_TEST_ACCOUNT_EMAIL.format(n=0)).exists():
+        raise LoadTestDataExists("Load test data already exists. Please use a fresh database.")
+    seed(random_seed)
+    with transaction.atomic():
+        progress("Creating camps and officers")
+        previous_camps = _create_camps(year - 1)
+        camps = _create_camps(year)
+        officers = _create_officers(camps)
+        bookings_factories.create_prices(year=year - 1)
+        bookings_factories.create_prices(year=year)
+        set_load_test_phase(year=year, phase=phase)
+
+    camps_by_id = {camp.id: camp for camp in camps}
+    previous_camps_by_camp_name = {camp.camp_name_id: camp for camp in previous_camps}
+    fake_camps = [FakeCamp(id=c.id, year=c.year, minimum_age=c.minimum_age, maximum_age=c.maximum_age) for c in camps]
+    previous_year_booking_count = 0
+    queued_booking_count = 0
+    for n in range(accounts):
+        if n % 100 == 0:
+            progress(f"Creating booking accounts {n}-{min(n + 100, accounts) - 1}")
+        with transaction.atomic():
+            data = FakeBookingAccountData(fake_camps)
+            account = BookingAccount.objects.create(
+                email=LOAD_TEST_ACCOUNT_EMAIL.format(n=n),
+                name=data.full_name,
+                address_line1=data.address_line1,
+                address_city=data.address_city,
+                address_country=data.address_country,
+                address_post_code=data.address_post_code,
+                phone_number=data.address_phone_number,
+            )
+            campers = [data.get_new_camper_place_details() for i in range(random_family_size())]
+            returning = random.random() < returning_proportion
+            for camper in campers:
+                camp = camps_by_id[camper.camp.id]
+                if returning:
+                    previous_camp = previous_camps_by_camp_name[camp.camp_name_id]
+                    _create_booking(account, data, camper, previous_camp, state=BookingState.BOOKED)
+                    previous_year_booking_count += 1
+                if phase == LoadTestPhase.ALLOCATION:
+                    booking = _create_booking(account, data, camper, camp, state=BookingState.INFO_COMPLETE)
+                    booking.add_to_queue(by_user=account)
+                    queued_booking_count += 1
+
+    return LoadTestDataSummary(
+        year=year,
+        camps=len(camps),
+        accounts=accounts,
+        previous_year_bookings=previous_year_booking_count,
+        queued_bookings=queued_booking_count,
+        officers=len(officers),
+    )
+
+
+def set_load_test_phase(*, year: int, phase: LoadTestPhase) -> YearConfig:
+    """
+    Create or update the YearConfig for `year`, so that the booking system is
+    in the given phase.
+    """
+    today = date.today()
+    YearConfig.objects.filter(year=year).delete()
+    match phase:
+        case LoadTestPhase.BOOKING_OPEN:
+            return bookings_factories.create_year_config(
+                year=year,
+                bookings_open_for_entry_on=today - timedelta(days=7),
+                bookings_open_for_booking_on=today,
+                bookings_close_for_initial_period_on=today + timedelta(days=14),
+            )
+        case LoadTestPhase.ALLOCATION:
+            return bookings_factories.create_year_config(
+                year=year,
+                bookings_open_for_entry_on=today - timedelta(days=28),
+                bookings_open_for_booking_on=today - timedelta(days=21),
+                bookings_close_for_initial_period_on=today - timedelta(days=1),
+            )
+
+
+def _create_camps(year: int) -> list[Camp]:
+    camps = []
+    start_date = date(year, 7, 25)
+    for i, (name, minimum_age, maximum_age) in enumerate(LOAD_TEST_CAMPS):
+        camp = Camp.objects.filter(year=year, camp_name__name=name).first()
+        if camp is None:
+            camp = camps_factories.create_camp(
+                camp_name=name,
+                year=year,
+                start_date=start_date + timedelta(days=7 * (i // 2)),
+                minimum_age=minimum_age,
+                maximum_age=maximum_age,
+            )
+        camps.append(camp)
+    return camps
+
+
+def _create_officers(camps: list[Camp]) -> list[User]:
+    officers = []
+    for camp_index, camp in enumerate(camps):
+        leader = _get_or_create_officer(LOAD_TEST_LEADER_USERNAME.format(n=camp_index))
+        camps_factories.set_camp_leaders(camp, [leader])
+        camp_officers = [
+            _get_or_create_officer(LOAD_TEST_OFFICER_USERNAME.format(n=camp_index * OFFICERS_PER_CAMP + i))
+            for i in range(OFFICERS_PER_CAMP)
+        ]
+        already_invited = set(camp.invitations.values_list("officer_id", flat=True))
+        officers_factories.add_officers_to_camp(camp, [o for o in camp_officers if o.id not in already_invited])
+        for officer in camp_officers:
+            if not officer.applications.filter(saved_on__year=camp.year).exists():
+                officers_factories.create_application(officer, year=camp.year)
+        officers.extend([leader] + camp_officers)
+
+    booking_secretary = User.objects.filter(username=LOAD_TEST_BOOKING_SECRETARY_USERNAME).first()
+    if booking_secretary is None:
+        booking_secretary = officers_factories.create_booking_secretary()
+        booking_secretary.username = LOAD_TEST_BOOKING_SECRETARY_USERNAME
+        booking_secretary.set_password(LOAD_TEST_OFFICER_PASSWORD)
+        booking_secretary.save()
+    officers.append(booking_secretary)
+    return officers
+
+
+def _get_or_create_officer(username: str) -> User:
+    officer = User.objects.filter(username=username).first()
+    if officer is None:
+        officer = officers_factories.create_officer(username=username, password=LOAD_TEST_OFFICER_PASSWORD)
+    return officer
+
+
+def _create_booking(
+    account: BookingAccount,
+    data: FakeBookingAccountData,
+    camper: FakeCamperData,
+    camp: Camp,
+    *,
+    state: BookingState,
+) -> Booking:
+    return bookings_factories.create_booking(
+        account=account,
+        camp=camp,
+        first_name=camper.first_name,
+        last_name=camper.last_name,
+        sex=camper.sex,
+        birth_date=camper.birth_date,
+        address_line1=data.address_line1,
+        address_city=data.address_city,
+        address_post_code=data.address_post_code,
+        contact_name=data.full_name,
+        contact_line1=data.address_line1,
+        contact_city=data.address_city,
+        contact_post_code=data.address_post_code,
+        contact_phone_number=data.address_phone_number,
+        gp_name=data.gp.full_name,
+        gp_line1=data.gp.address_line1,
+        gp_city=data.gp.address_city,
+        gp_post_code=data.gp.address_post_code,
+        gp_phone_number=data.gp.address_phone_number,
+        state=state,
+    )
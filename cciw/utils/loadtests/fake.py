@@ -0,0 +1,124 @@
+"""
+Fake people, for use in load test data generation and load test scenarios.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+from typing import Literal
+
+from faker import Faker
+
+_faker = Faker("en_GB")
+
+
+def seed(value: int) -> None:
+    """
+    Seed the fake data generators, for reproducible data.
+    """
+    Faker.seed(value)
+    random.seed(value)
+
+
+class FakePersonData:
+    def __init__(self, faker: Faker = _faker) -> None:
+        self._faker = faker
+
+    @cached_property
+    def email(self) -> str:
+        return (
+            f"{self.full_name.replace(' ', '.')}{abs(hash(self.full_name + self.address_post_code)) % 1000}@example.com"
+        )
+
+    @cached_property
+    def address_line1(self) -> str:
+        return self._faker.address().split("\n")[0]
+
+    @cached_property
+    def address_city(self) -> str:
+        return self._faker.city()
+
+    @cached_property
+    def address_country(self) -> str:
+        return "GB"
+
+    @cached_property
+    def address_post_code(self) -> str:
+        return self._faker.postcode()
+
+    @cached_property
+    def address_phone_number(self) -> str:
+        return self._faker.phone_number()
+
+    @cached_property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    @cached_property
+    def first_name(self):
+        return self._faker.first_name()
+
+    @cached_property
+    def last_name(self):
+        return self._faker.last_name()
+
+
+@dataclass
+class FakeCamp:
+    id: int
+    year: int
+    minimum_age: int
+    maximum_age: int
+
+
+class FakeCamperData(FakePersonData):
+    def __init__(self, camps: list[FakeCamp], faker: Faker = _faker) -> None:
+        super().__init__(faker=faker)
+        self._camps = camps
+
+    @cached_property
+    def camp(self) -> FakeCamp:
+        return random.choice(self._camps)
+
+    @cached_property
+    def birth_date(self) -> date:
+        # Pick an age appropriate for the camp
+        age = random.randint(self.camp.minimum_age, self.camp.maximum_age)
+        return date(self.camp.year - age, random.randint(1, 12), random.randint(1, 28))
+
+    @cached_property
+    def sex(self) -> Literal["m", "f"]:
+        return random.choice(["m", "f"])
+
+
+class FakeBookingAccountData(FakePersonData):
+    # A booking account is a person,
+    # and has some more related people:
+
+    def __init__(self, camps: list[FakeCamp], faker: Faker = _faker) -> None:
+        super().__init__(faker=faker)
+        self._camps = camps
+
+    @cached_property
+    def gp(self) -> FakePersonData:
+        return FakePersonData(faker=self._faker)
+
+    def get_new_camper_place_details(self) -> FakeCamperData:
+        camper = FakeCamperData(self._camps, faker=self._faker)
+        camper.last_name = self.last_name
+        return camper
+
+
+def random_family_size() -> int:
+    """
+    Returns a random number of children for a booking account, based on real data.
+    """
+    # In 2025:
+    #  - Total 328 accounts attempted to book
+    #  - 207 created single booking
+    #  - 83 created 2 bookings
+    #  - 38 created 3 or more
+    return random.choices([1, 2, 3], weights=[207, 83, 38])[0]
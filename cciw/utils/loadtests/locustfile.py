@@ -0,0 +1,368 @@
+# ruff: noqa:E402
+"""
+Locust scenarios for load testing against a local server.
+
+Don't run this directly, use `scripts/load_test.py`, which picks the user
+classes for each scenario and saves the results. See docs/development.rst
+"""
+
+from __future__ import annotations
+
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cciw.settings_local")
+django.setup()
+
+import random
+import time
+from datetime import date
+from pathlib import Path
+from typing import cast
+
+import requests
+from django.urls import reverse
+from locust import HttpUser, SequentialTaskSet, between, events, task
+from locust.env import Environment
+
+from cciw.bookings.email import EmailVerifyTokenGenerator
+from cciw.bookings.models import BookingAccount, PriceType
+from cciw.cciwmain import common
+from cciw.cciwmain.models import Camp
+from cciw.utils.loadtests.data import (
+    LOAD_TEST_ACCOUNT_EMAIL,
+    LOAD_TEST_BOOKING_SECRETARY_USERNAME,
+    LOAD_TEST_LEADER_USERNAME,
+    LOAD_TEST_OFFICER_PASSWORD,
+    LOAD_TEST_OFFICER_USERNAME,
+    OFFICERS_PER_CAMP,
+)
+from cciw.utils.loadtests.fake import FakeBookingAccountData, FakeCamp, FakeCamperData, random_family_size
+from cciw.utils.loadtests.page import Page
+from cciw.utils.loadtests.report import ScenarioResult, format_result
+
+YEAR = common.get_thisyear()
+CAMPS: list[Camp] = list(Camp.objects.filter(year=YEAR).select_related("camp_name"))
+FAKE_CAMPS = [FakeCamp(id=c.id, year=c.year, minimum_age=c.minimum_age, maximum_age=c.maximum_age) for c in CAMPS]
+ACCOUNT_COUNT = BookingAccount.objects.filter(email__startswith=LOAD_TEST_ACCOUNT_EMAIL.split("{")[0]).count()
+
+# Proportion of booking-open users who already have an account with details
+# filled in from previous years.
+EXISTING_ACCOUNT_PROPORTION = 0.6
+
+
+@events.init_command_line_parser.add_listener
+def _(parser):
+    parser.add_argument("--scenario", type=str, default="custom", help="Scenario name, for the results file")
+    parser.add_argument("--results-json", type=str, default="", help="Path to save results to, as JSON")
+
+
+@events.quitting.add_listener
+def _(environment: Environment, **kwargs):
+    if environment.runner is None:
+        return
+    result = ScenarioResult.from_locust_stats(
+        environment.runner.stats,
+        scenario=environment.parsed_options.scenario,
+        users=environment.parsed_options.num_users or 0,
+    )
+    print(format_result(result))
+    if environment.parsed_options.results_json:
+        result.save(Path(environment.parsed_options.results_json))
+
+
+class CciwTaskSet(SequentialTaskSet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page = Page(client=self.client)
+
+    @property
+    def client(self) -> requests.Session:
+        return super().client
+
+    def go(self, url: str, *, name: str | None = None) -> None:
+        """
+        Go to a URL, waiting in the booking waiting room if necessary.
+        """
+        while True:
+            response = self.client.get(url, name=name, headers=self._referer())
+            if response.status_code == 503 and "Retry-After" in response.headers:
+                time.sleep(int(response.headers["Retry-After"]))
+                continue
+            self.page._set_response(response)
+            return
+
+    def _referer(self) -> dict:
+        return {"referer": self.page.last_url} if self.page.last_url else {}
+
+    def assert_text(self, text: str) -> None:
+        assert self.page.last_response is not None
+        assert text in self.page.last_response.text, f"Expected {text!r} in {self.page.last_url}"
+
+    def booking_login(self, email: str) -> None:
+        # Cheat the login by making a token directly, rather than going
+        # via email. This requires the server to have the same SECRET_KEY.
+        token = EmailVerifyTokenGenerator().token_for_email(email)
+        self.go(f"{reverse('cciw-bookings-verify_and_continue')}?bt={token}", name="booking login")
+        self.assert_text(f"Logged in as {email}!")
+
+    def officer_login(self, username: str) -> None:
+        self.go(reverse("cciw-officers-index"))
+        self.page.fill({"#id_username": username, "#id_password": LOAD_TEST_OFFICER_PASSWORD})
+        self.page.submit("[type=submit]")
+        self.assert_text("Officer home page")
+
+
+# Booking open morning
+
+
+class BookingOpenTaskSet(CciwTaskSet):
+    @property
+    def user(self) -> BookingOpenUser:
+        return cast(BookingOpenUser, super().user)
+
+    @task
+    def bookings_index(self):
+        self.go(reverse("cciw-bookings-index"))
+
+    @task
+    def bookings_start(self):
+        self.go(reverse("cciw-bookings-start"))
+
+    @task
+    def bookings_main(self):
+        self.booking_login(self.user.email)
+        assert self.page.last_url is not None
+        if self.page.last_url.endswith(reverse("cciw-bookings-account_details")):
+            self.wait()
+            self.do_account_details_page()
+
+        for i in range(random_family_size()):
+            self.wait()
+            self.do_add_new_booking()
+
+        self.go(reverse("cciw-bookings-basket_list_bookings"))
+        self.page.submit("[name=book_now]")
+
+    # Always at end: logout, so that the process can start again without errors
+    @task
+    def bookings_logout(self):
+        self.client.cookies.clear()
+        self.user.start_new_booker()
+
+    def do_account_details_page(self):
+        data = self.user.data
+        details = {
+            "name": data.full_name,
+            "address_line1": data.address_line1,
+            "address_city": data.address_city,
+            "address_country": data.address_country,
+            "address_post_code": data.address_post_code,
+        }
+        # While the user fills in details, htmx sends a validation request as
+        # they leave each field.
+        for field_name, value in details.items():
+            self.client.get(
+                reverse("cciw-bookings-account_details"),
+                params={field_name: value, "_validate_field": field_name},
+                headers={"HX-Request": "true"},
+                name="account details - validate field",
+            )
+        self.page.fill({f"#id_{field_name}": value for field_name, value in details.items()})
+        self.page.submit()
+        self.assert_text("Account details updated, thank you.")
+
+    def do_add_new_booking(self) -> None:
+        self.go(reverse("cciw-bookings-add_place"))
+        place_details, camper = self.get_booking_details()
+
+        # It takes a while to fill in details:
+        for i in range(0, random.randint(1, 4)):
+            self.wait()
+        self.page.fill(place_details)
+        self.page.submit()
+        self.assert_text(f'Details for "{camper.full_name}" were saved successfully')
+
+    def get_booking_details(self) -> tuple[dict, FakeCamperData]:
+        user_data = self.user.data
+        camper = user_data.get_new_camper_place_details()
+        camp = camper.camp
+
+        return {
+            "[name=camp]": camper.camp.id,
+            "#id_price_type": PriceType.FULL,
+            "#id_first_name": camper.first_name,
+            "#id_last_name": camper.last_name,
+            "#id_sex": camper.sex,
+            "#id_birth_date": camper.birth_date.isoformat(),
+            "#id_address_line1": user_data.address_line1,
+            "#id_address_city": user_data.address_city,
+            "#id_address_country": user_data.address_country,
+            "#id_address_post_code": user_data.address_post_code,
+            "#id_contact_name": user_data.full_name,
+            "#id_contact_line1": user_data.address_line1,
+            "#id_contact_city": user_data.address_city,
+            "#id_contact_country": user_data.address_country,
+            "#id_contact_post_code": user_data.address_post_code,
+            "#id_contact_phone_number": user_data.address_phone_number,
+            "#id_gp_name": user_data.gp.full_name,
+            "#id_gp_line1": user_data.gp.address_line1,
+            "#id_gp_city": user_data.gp.address_city,
+            "#id_gp_country": user_data.gp.address_country,
+            "#id_gp_post_code": user_data.gp.address_post_code,
+            "#id_gp_phone_number": user_data.gp.address_phone_number,
+            "#id_medical_card_number": "asdfasdf",
+            "#id_last_tetanus_injection_date": date(camp.year - 5, 2, 3),
+            "#id_serious_illness": False,
+            "#id_agreement": True,
+        }, camper
+
+
+class BookingOpenUser(HttpUser):
+    """
+    A parent booking places on the morning bookings open
+    """
+
+    wait_time = between(2, 8)
+    tasks = [BookingOpenTaskSet]
+
+    def on_start(self):
+        self.start_new_booker()
+
+    def start_new_booker(self):
+        self.data = FakeBookingAccountData(FAKE_CAMPS)
+        if ACCOUNT_COUNT and random.random() < EXISTING_ACCOUNT_PROPORTION:
+            self.email = LOAD_TEST_ACCOUNT_EMAIL.format(n=random.randrange(ACCOUNT_COUNT))
+        else:
+            self.email = self.data.email
+
+
+# Allocation day
+
+
+class BookingSecretaryTaskSet(CciwTaskSet):
+    @task
+    def login(self):
+        self.officer_login(LOAD_TEST_BOOKING_SECRETARY_USERNAME)
+
+    @task
+    def booking_queues(self):
+        self.go(reverse("cciw-officers-booking_queues", kwargs={"year": YEAR}))
+
+    @task
+    def booking_queue(self):
+        for camp in random.sample(CAMPS, len(CAMPS)):
+            self.wait()
+            self.go(
+                reverse("cciw-officers-booking_queue", kwargs={"camp_id": camp.url_id}),
+                name="booking queue",
+            )
+
+    @task
+    def reports(self):
+        self.go(reverse("cciw-officers-booking_secretary_reports", kwargs={"year": YEAR}))
+
+
+class BookingSecretaryUser(HttpUser):
+    """
+    The booking secretary (or several tabs of theirs) working through the queues
+    """
+
+    wait_time = between(5, 15)
+    tasks = [BookingSecretaryTaskSet]
+
+
+class AllocationDayBookerTaskSet(CciwTaskSet):
+    @property
+    def user(self) -> AllocationDayBookerUser:
+        return cast(AllocationDayBookerUser, super().user)
+
+    @task
+    def login(self):
+        self.booking_login(LOAD_TEST_ACCOUNT_EMAIL.format(n=random.randrange(max(ACCOUNT_COUNT, 1))))
+
+    @task
+    def account_overview(self):
+        # Parents keep checking whether they have got places
+        for i in range(random.randint(1, 5)):
+            self.go(reverse("cciw-bookings-account_overview"))
+            self.wait()
+
+    @task
+    def logout(self):
+        self.client.cookies.clear()
+
+
+class AllocationDayBookerUser(HttpUser):
+    """
+    A parent checking their account for news of places on allocation day
+    """
+
+    wait_time = between(5, 30)
+    tasks = [AllocationDayBookerTaskSet]
+
+
+# Officer area
+
+
+class OfficerTaskSet(CciwTaskSet):
+    @task
+    def login(self):
+        self.officer_login(LOAD_TEST_OFFICER_USERNAME.format(n=random.randrange(len(CAMPS) * OFFICERS_PER_CAMP)))
+
+    @task
+    def applications(self):
+        self.go(reverse("cciw-officers-applications"))
+
+    @task
+    def logout(self):
+        self.client.cookies.clear()
+
+
+class OfficerUser(HttpUser):
+    """
+    An officer filling in or checking their application form
+    """
+
+    wait_time = between(5, 20)
+    tasks = [OfficerTaskSet]
+
+
+class LeaderTaskSet(CciwTaskSet):
+    @task
+    def login(self):
+        self.camp_index = random.randrange(len(CAMPS))
+        self.officer_login(LOAD_TEST_LEADER_USERNAME.format(n=self.camp_index))
+
+    @task
+    def leaders_index(self):
+        self.go(reverse("cciw-officers-leaders_index"))
+
+    @task
+    def camp_pages(self):
+        camp_id = CAMPS[self.camp_index].url_id
+        for view_name in [
+            "cciw-officers-manage_applications",
+            "cciw-officers-manage_references",
+            "cciw-officers-officer_list",
+        ]:
+            self.wait()
+            self.go(reverse(view_name, kwargs={"camp_id": camp_id}), name=view_name)
+
+    @task
+    def manage_dbss(self):
+        self.go(reverse("cciw-officers-manage_dbss", kwargs={"year": YEAR}))
+
+    @task
+    def logout(self):
+        self.client.cookies.clear()
+
+
+class LeaderUser(HttpUser):
+    """
+    A camp leader checking applications, references and DBSs for their camp
+    """
+
+    wait_time = between(5, 20)
+    tasks = [LeaderTaskSet]
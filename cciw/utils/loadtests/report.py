@@ -0,0 +1,120 @@
+"""
+Summaries of load test results, so that runs (e.g. of different releases) can
+be saved and compared.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import texttable
+
+
+@dataclass
+class RequestSummary:
+    name: str
+    requests: int
+    failures: int
+    requests_per_second: float
+    median_ms: float
+    p95_ms: float
+
+    @classmethod
+    def from_locust_stats_entry(cls, entry, *, name: str | None = None) -> RequestSummary:
+        # `entry` is a `locust.stats.StatsEntry`
+        return cls(
+            name=name if name is not None else f"{entry.method} {entry.name}",
+            requests=entry.num_requests,
+            failures=entry.num_failures,
+            requests_per_second=entry.total_rps,
+            median_ms=entry.get_response_time_percentile(0.5),
+            p95_ms=entry.get_response_time_percentile(0.95),
+        )
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    users: int
+    duration_seconds: float
+    total: RequestSummary
+    requests: list[RequestSummary]
+
+    @classmethod
+    def from_locust_stats(cls, stats, *, scenario: str, users: int) -> ScenarioResult:
+        # `stats` is a `locust.stats.RequestStats`
+        return cls(
+            scenario=scenario,
+            users=users,
+            duration_seconds=stats.last_request_timestamp - stats.start_time if stats.last_request_timestamp else 0,
+            total=RequestSummary.from_locust_stats_entry(stats.total, name="TOTAL"),
+            requests=[
+                RequestSummary.from_locust_stats_entry(entry)
+                for entry in sorted(stats.entries.values(), key=lambda e: (e.name, e.method))
+            ],
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(self), indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> ScenarioResult:
+        data = json.loads(path.read_text())
+        return cls(
+            scenario=data["scenario"],
+            users=data["users"],
+            duration_seconds=data["duration_seconds"],
+            total=RequestSummary(**data["total"]),
+            requests=[RequestSummary(**item) for item in data["requests"]],
+        )
+
+
+def format_result(result: ScenarioResult) -> str:
+    table = _make_table(["Request", "Count", "Failures", "Req/s", "p50 ms", "p95 ms"])
+    for item in result.requests + [result.total]:
+        table.add_row([item.name, item.requests, item.failures, item.requests_per_second, item.median_ms, item.p95_ms])
+    return f"Scenario: {result.scenario}, {result.users} users, {result.duration_seconds:.0f}s\n" + table.draw()
+
+
+def format_comparison(before: ScenarioResult, after: ScenarioResult) -> str:
+    """
+    Compares two results for the same scenario, showing p50/p95 and throughput side by side.
+    """
+    table = _make_table(
+        ["Request", "p50 before", "p50 after", "p95 before", "p95 after", "Req/s before", "Req/s after"]
+    )
+    table.set_cols_dtype(["t"] * 7)
+    before_items = {item.name: item for item in before.requests + [before.total]}
+    for item in after.requests + [after.total]:
+        old = before_items.get(item.name)
+        if old is None:
+            continue
+        table.add_row(
+            [
+                item.name,
+                f"{old.median_ms:.1f}",
+                _with_change(item.median_ms, old.median_ms),
+                f"{old.p95_ms:.1f}",
+                _with_change(item.p95_ms, old.p95_ms),
+                f"{old.requests_per_second:.1f}",
+                _with_change(item.requests_per_second, old.requests_per_second),
+            ]
+        )
+    return f"Scenario: {before.scenario} -> {after.scenario}\n" + table.draw()
+
+
+def _with_change(new: float, old: float) -> str:
+    if not old:
+        return f"{new:.1f}"
+    return f"{new:.1f} ({(new - old) / old:+.0%})"
+
+
+def _make_table(headers: list[str]) -> texttable.Texttable:
+    table = texttable.Texttable(max_width=0)
+    table.set_deco(texttable.Texttable.HEADER)
+    table.set_precision(1)
+    table.header(headers)
+    return table
@@ -1,40 +1,63 @@
 # Simple spreadsheet abstraction that does what we need for returning data in
 # spreadsheets, supporting .xlsx
 
-from abc import ABC, abstractmethod
+from __future__ import annotations
 
-import pandas as pd
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
 from cciw.utils import xl
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl import Workbook
+
 
 class ExcelBuilder(ABC):
     mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     file_ext = "xlsx"
 
+    @property
     @abstractmethod
-    def to_bytes(self) -> bytes:
+    def workbook(self) -> Workbook:
         raise NotImplementedError()
 
+    def add_notice_sheet(self, name: str, header: str, lines: list[str]):
+        """
+        Adds a sheet with some text before all the other sheets.
+        """
+        xl.add_notice_sheet(self.workbook, name, header, lines)
+
+    def to_bytes(self) -> bytes:
+        return xl.workbook_to_bytes(self.workbook)
+
+    def to_chunks(self) -> Iterator[bytes]:
+        return xl.workbook_to_chunks(self.workbook)
+
 
 class ExcelSimpleBuilder(ExcelBuilder):
     def __init__(self):
         self.wkbk = xl.empty_workbook()
 
+    @property
+    def workbook(self) -> Workbook:
+        return self.wkbk
+
     def add_sheet_with_header_row(self, name: str, headers: list[str], contents: list[list[str]]):
         xl.add_sheet_with_header_row(self.wkbk, name, headers, contents)
 
-    def to_bytes(self) -> bytes:
-        return xl.workbook_to_bytes(self.wkbk)
-
 
 class ExcelFromDataFrameBuilder(ExcelBuilder):
     def __init__(self):
+        import pandas as pd
+
         # filename passed to force correct writer
         self.pd_writer = pd.ExcelWriter("tmp.xlsx")  # pylint: disable=abstract-class-instantiated
 
     def add_sheet_from_dataframe(self, name: str, dataframe: pd.DataFrame):
         dataframe.to_excel(self.pd_writer, sheet_name=name)
 
-    def to_bytes(self) -> bytes:
-        return xl.workbook_to_bytes(self.pd_writer.book)  # using ExcelWriter internals
+    @property
+    def workbook(self) -> Workbook:
+        return self.pd_writer.book  # using ExcelWriter internals
@@ -1,17 +1,48 @@
+from __future__ import annotations
+
+import functools
 from datetime import date
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-import pandas as pd
-from pandas.core.series import Series
 
+def accumulate(value_list: list[Any | date], index_class: type[pd.Index] | None = None) -> pd.Series:
+    import pandas as pd
 
-def accumulate(value_list: list[Any | date], index_class: type = pd.Index) -> Series:
+    if index_class is None:
+        index_class = pd.Index
     return index_class(value_list).value_counts().sort_index().cumsum()
 
 
-def accumulate_dates(date_list: list[Any | date]) -> Series:
+def accumulate_dates(date_list: list[Any | date]) -> pd.Series:
+    import pandas as pd
+
     return accumulate(date_list, index_class=pd.DatetimeIndex)
 
 
 def counts(value_list):
+    import pandas as pd
+
     return pd.Index(value_list).value_counts().sort_index()
+
+
+def serialize_chart(df: pd.DataFrame, **kwargs) -> str:
+    """
+    Serializes a DataFrame to JSON for Highcharts.
+    """
+    return _get_pandas_highcharts().serialize(df, output_type="json", **kwargs)
+
+
+@functools.cache
+def _get_pandas_highcharts():
+    import pandas
+    import pandas_highcharts.core
+
+    # Monkey patch pandas_highcharts to fix failure with pandas >= 2
+    def json_encode(obj):
+        return pandas.io.json.ujson_dumps(obj)
+
+    pandas_highcharts.core.json_encode = json_encode
+    return pandas_highcharts.core
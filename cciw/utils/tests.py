@@ -2,7 +2,25 @@
 Tests for utils functions
 """
 
+import threading
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from cciw.bookings.models import Booking, BookingAccount
+from cciw.cciwmain.models import Camp
+from cciw.cciwmain.tests import factories as camps_factories
 from cciw.cciwmain.views.sites import index as site_index
+from cciw.officers.tests import factories as officers_factories
+from cciw.test_utils.benchmarks import BenchmarkResult, compare_results
+from cciw.utils import xl
+from cciw.utils.admin import EstimatedCountPaginator, get_estimated_row_count
+from cciw.utils.loadtests.data import LoadTestDataExists, LoadTestPhase, generate_load_test_year
+from cciw.utils.loadtests.report import RequestSummary, ScenarioResult, format_comparison
+from cciw.utils.spreadsheet import ExcelSimpleBuilder
 from cciw.utils.views import url_matches_view_function
 
 
@@ -12,3 +30,113 @@ def test_url_matches_view_function():
     assert not url_matches_view_function("/sites-x/", site_index)
 
     assert url_matches_view_function("/sites/?foo=bar", site_index)
+
+
+@pytest.mark.django_db
+def test_generate_load_test_year():
+    summary = generate_load_test_year(year=2030, accounts=5, phase=LoadTestPhase.ALLOCATION)
+    assert summary.camps == 6
+    assert BookingAccount.objects.count() == 5
+    assert Booking.objects.filter(camp__year=2030).in_queue().count() == summary.queued_bookings > 0
+    assert Booking.objects.filter(camp__year=2029).booked().count() == summary.previous_year_bookings
+
+    with pytest.raises(LoadTestDataExists):
+        generate_load_test_year(year=2030, accounts=5, phase=LoadTestPhase.ALLOCATION)
+
+
+def test_load_test_result_save_and_compare(tmp_path):
+    def make_result(median_ms):
+        total = RequestSummary(
+            name="TOTAL", requests=100, failures=0, requests_per_second=10, median_ms=median_ms, p95_ms=median_ms * 3
+        )
+        return ScenarioResult(scenario="booking-open", users=10, duration_seconds=10, total=total, requests=[])
+
+    path = tmp_path / "result.json"
+    make_result(100).save(path)
+    before = ScenarioResult.load(path)
+    assert before == make_result(100)
+    comparison = format_comparison(before, make_result(50))
+    assert "50.0 (-50%)" in comparison
+
+
+def test_compare_benchmark_results():
+    baseline = [
+        BenchmarkResult(name="a", queries=2, rounds=5, best_seconds=1.0, median_seconds=1.0),
+        BenchmarkResult(name="b", queries=2, rounds=5, best_seconds=1.0, median_seconds=1.0),
+        BenchmarkResult(name="c", queries=2, rounds=5, best_seconds=1.0, median_seconds=1.0),
+    ]
+    current = [
+        BenchmarkResult(name="a", queries=2, rounds=5, best_seconds=1.1, median_seconds=1.1),
+        BenchmarkResult(name="b", queries=2, rounds=5, best_seconds=1.5, median_seconds=1.5),
+        BenchmarkResult(name="c", queries=3, rounds=5, best_seconds=0.5, median_seconds=0.5),
+        BenchmarkResult(name="d", queries=3, rounds=5, best_seconds=0.5, median_seconds=0.5),
+    ]
+    comparisons = compare_results(baseline, current, threshold=0.2)
+    assert [(c.name, c.is_time_regression, c.is_query_regression) for c in comparisons] == [
+        ("a", False, False),
+        ("b", True, False),
+        ("c", False, True),
+    ]
+
+
+def test_for_htmx_multiple_partials(client, db):
+    camp = camps_factories.create_camp(leader=(leader := officers_factories.create_officer()))
+    client.force_login(leader)
+    response = client.get(
+        reverse("cciw-officers-officer_list", kwargs={"camp_id": camp.url_id}),
+        {"use_partial": ["currentofficers", "chooseofficers__form"]},
+        headers={"HX-Request": "true"},
+    )
+    assert isinstance(response, TemplateResponse)
+    assert response.context_data["camp"] == camp
+    content = response.content.decode("utf-8")
+    assert "<html" not in content
+    assert content.index('class="currentofficers"') < content.index('id="id_chooseofficer__form"')
+
+
+def test_workbook_to_chunks():
+    builder = ExcelSimpleBuilder()
+    builder.add_sheet_with_header_row("Data", ["Number", "Text"], [[i, f"Row {i}" * 20] for i in range(20000)])
+    builder.add_notice_sheet("Notice", "Notice:", ["Line 1", "Line 2"])
+    chunks = list(builder.to_chunks())
+    assert len(chunks) > 1
+    workbook = xl.workbook_from_bytes(b"".join(chunks))
+    assert workbook.sheetnames == ["Notice", "Data"]
+    assert workbook["Notice"].cell(3, 1).value == "Line 1"
+    assert workbook["Data"].cell(20001, 1).value == 19999
+
+    # Closing early stops the writer:
+    threads = []
+    real_thread = threading.Thread
+
+    def make_thread(*args, **kwargs):
+        thread = real_thread(*args, **kwargs)
+        threads.append(thread)
+        return thread
+
+    with mock.patch("cciw.utils.xl.threading.Thread", side_effect=make_thread):
+        stream = builder.to_chunks()
+        next(stream)
+    stream.close()
+    [thread] = threads
+    assert not thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(stream)
+
+
+def test_estimated_count_paginator(db, monkeypatch):
+    for year in [2000, 2000, 2001, 2002]:
+        camps_factories.create_camp(year=year)
+    # Usually done by autovacuum
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE cciwmain_camp")
+    assert get_estimated_row_count(Camp) == 4
+
+    # Exact counts below the threshold
+    monkeypatch.setattr("cciw.utils.admin.get_estimated_row_count", lambda model: 5000)
+    assert EstimatedCountPaginator(Camp.objects.all(), 10).count == 4
+
+    monkeypatch.setattr(EstimatedCountPaginator, "ESTIMATE_THRESHOLD", 1000)
+    assert EstimatedCountPaginator(Camp.objects.all(), 10).count == 5000
+    # Filtered querysets always get exact counts
+    assert EstimatedCountPaginator(Camp.objects.filter(year=2000), 10).count == 2
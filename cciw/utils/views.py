@@ -10,6 +10,12 @@
 from django.contrib import messages
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.http import HttpRequest, HttpResponse, HttpResponseForbidden, HttpResponseRedirect, QueryDict
+from django.http.response import HttpResponseBase
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.template.base import PartialTemplate
+from django.template.context import make_context
+from django.template.loader import get_template
 from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.urls.exceptions import Resolver404
@@ -20,7 +26,7 @@
 from cciw.accounts.models import User
 from cciw.utils.functional import func_name
 
-type ViewFunc[**P] = Callable[Concatenate[HttpRequest, P], HttpResponse]
+type ViewFunc[**P] = Callable[Concatenate[HttpRequest, P], HttpResponseBase]
 type TemplateResponseViewFunc[**P] = Callable[Concatenate[HttpRequest, P], TemplateResponse]
 
 USER_AUTH_DECORATOR_APPLIED = "USER_AUTH_DECORATOR_APPLIED"
@@ -227,19 +233,11 @@ def _view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
                 if partials_to_use is not None:
                     if len(partials_to_use) == 1:
                         resp.template_name = resp.template_name + "#" + partials_to_use[0]
-                        return resp
                     else:
-                        # Need to render multiple times.
-                        content = []
-                        for partial in partials_to_use:
-                            part = TemplateResponse(
-                                request,
-                                resp.template_name + "#" + partial,
-                                context=resp.context_data,
-                            )
-                            part.render()
-                            content.append(part.content)
-                        return HttpResponse(content=b"".join(content))
+                        resp.template_name = get_multi_partial_template(
+                            resp.template_name, tuple(partials_to_use), using=resp.using
+                        )
+                    return resp
 
             return resp
 
@@ -248,6 +246,60 @@ def _view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
     return decorator
 
 
+class MultiPartialTemplate:
+    """
+    Template lookalike, usable with TemplateResponse, that renders several
+    partials from the same template, one after the other.
+
+    All the partials are rendered with a single context, so context processors
+    run once, and lazy values in the context are evaluated at most once.
+    """
+
+    def __init__(self, partials: list[PartialTemplate], backend: DjangoTemplates):
+        self.partials = partials
+        self.backend = backend
+
+    @property
+    def origin(self):
+        return self.partials[0].origin
+
+    def render(self, context: dict | None = None, request: HttpRequest | None = None) -> str:
+        context = make_context(context, request, autoescape=self.backend.engine.autoescape)
+        with context.bind_template(self.partials[0]):
+            return "".join(partial.render(context) for partial in self.partials)
+
+
+# Compiled partials, keyed on (template_name, partial_names, using)
+_multi_partial_template_cache: dict[tuple[str, tuple[str, ...], str | None], MultiPartialTemplate] = {}
+
+
+def get_multi_partial_template(
+    template_name: str, partial_names: tuple[str, ...], *, using: str | None = None
+) -> MultiPartialTemplate:
+    key = (template_name, partial_names, using)
+    if (cached := _multi_partial_template_cache.get(key)) is not None:
+        return cached
+
+    # The template is loaded (and compiled if necessary) just once, and the
+    # partials then found inside it.
+    template = get_template(template_name, using=using)
+    engine_template = template.template
+    partials = []
+    for partial_name in partial_names:
+        try:
+            partial = engine_template.extra_data["partials"][partial_name]
+        except (KeyError, TypeError):
+            raise TemplateDoesNotExist(partial_name, tried=[template_name], backend=template.backend)
+        partial.engine = engine_template.engine
+        partials.append(partial)
+
+    multi_partial_template = MultiPartialTemplate(partials, template.backend)
+    # In development, templates can change without a restart, so we can't cache
+    if not settings.DEBUG:
+        _multi_partial_template_cache[key] = multi_partial_template
+    return multi_partial_template
+
+
 def add_hx_trigger_header(response: HttpResponse, events: dict) -> HttpResponse:
     if events:
         response.headers["Hx-Trigger"] = json.dumps(events)
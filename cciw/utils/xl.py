@@ -2,33 +2,65 @@
 Simplified xlwt interface
 """
 
+from __future__ import annotations
+
+import functools
+import io
+import queue
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
 from datetime import date, datetime
 from io import BytesIO
+from typing import TYPE_CHECKING
 
 from django.utils import timezone
-from openpyxl import Workbook, load_workbook, styles
-from openpyxl.cell import Cell
-from openpyxl.styles.fonts import DEFAULT_FONT
-from openpyxl.worksheet.worksheet import Worksheet
 from pytz import UTC
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+    from openpyxl.cell import Cell
+    from openpyxl.styles import Font
+    from openpyxl.worksheet.worksheet import Worksheet
+
 
 def empty_workbook() -> Workbook:
+    from openpyxl import Workbook
+
     wkbk: Workbook = Workbook()
     wkbk.remove(wkbk.worksheets[0])
     return wkbk
 
 
 font_size = 12
-default_font = styles.Font(size=font_size, name=DEFAULT_FONT.name)
-header_font = styles.Font(bold=True, size=font_size, name=DEFAULT_FONT.name)
-url_font = styles.Font(color=styles.colors.BLUE, size=font_size, name=DEFAULT_FONT.name)
+
+
+@dataclass(frozen=True)
+class Fonts:
+    default: Font
+    header: Font
+    url: Font
+
+
+@functools.cache
+def get_fonts() -> Fonts:
+    from openpyxl import styles
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    return Fonts(
+        default=styles.Font(size=font_size, name=DEFAULT_FONT.name),
+        header=styles.Font(bold=True, size=font_size, name=DEFAULT_FONT.name),
+        url=styles.Font(color=styles.colors.BLUE, size=font_size, name=DEFAULT_FONT.name),
+    )
 
 
 def add_sheet_with_header_row(wkbk: Workbook, name: str, headers: list[str], contents: list[list[str]]):
     """
     Utility function for adding sheet to xlwt workbook.
     """
+    from openpyxl import styles
+
+    fonts = get_fonts()
     wksh: Worksheet = wkbk.create_sheet(title=name)
 
     border = styles.Border(
@@ -44,7 +76,7 @@ def add_sheet_with_header_row(wkbk: Workbook, name: str, headers: list[str], con
 
     for c_idx, header in enumerate(headers, start=1):
         cell: Cell = wksh.cell(row=1, column=c_idx, value=header)
-        cell.font = header_font
+        cell.font = fonts.header
         cell.border = border
 
     header_row_count = 1
@@ -56,7 +88,7 @@ def add_sheet_with_header_row(wkbk: Workbook, name: str, headers: list[str], con
             cell: Cell = wksh.cell(row=r_idx, column=c_idx)
             cell.border = border
             cell.alignment = alignment
-            cell.font = default_font
+            cell.font = fonts.default
 
             if isinstance(val, str):
                 # normalise newlines to style expected by Excel
@@ -75,12 +107,29 @@ def add_sheet_with_header_row(wkbk: Workbook, name: str, headers: list[str], con
                     row_height = max(row_height, font_size * (val.count("\n") + 1))
                 if looks_like_url(val):
                     val = f'=HYPERLINK("{val}"; "{val}")'
-                    cell.font = url_font
+                    cell.font = fonts.url
             cell.value = val
         if row_height > normal_row_height:
             wksh.row_dimensions[r_idx].height = row_height
 
 
+def add_notice_sheet(wkbk: Workbook, name: str, header: str, lines: list[str]):
+    """
+    Adds a sheet with a header and some lines of text, as the first sheet.
+    """
+    fonts = get_fonts()
+    wksh: Worksheet = wkbk.create_sheet(name, 0)
+    c_header = wksh.cell(1, 1)
+    c_header.value = header
+    c_header.font = fonts.header
+
+    for row_idx, line in enumerate(lines, start=3):
+        c = wksh.cell(row_idx, 1)
+        c.value = line
+        c.font = fonts.default
+    wksh.column_dimensions["A"].width = 100
+
+
 def looks_like_url(val: object) -> bool:
     return (
         isinstance(val, str)
@@ -98,5 +147,91 @@ def workbook_to_bytes(wkbk: Workbook) -> bytes:
 
 
 def workbook_from_bytes(content: bytes) -> Workbook:
+    from openpyxl import load_workbook
+
     s = BytesIO(content)
     return load_workbook(s)
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def workbook_to_chunks(wkbk: Workbook) -> Iterator[bytes]:
+    """
+    Serialises the workbook, yielding chunks of bytes as they are produced, so
+    that a response can start before the whole file has been written.
+    """
+    # openpyxl can only write to a file, so we write from a separate thread
+    # into a queue, with a limited size so that we don't buffer the whole file.
+    chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=4)
+    cancelled = threading.Event()
+    errors: list[BaseException] = []
+    writer = _QueueWriter(chunks, cancelled)
+
+    def write():
+        try:
+            wkbk.save(writer)
+            writer.flush_buffer()
+        except _WriteCancelled:
+            return
+        except BaseException as e:
+            errors.append(e)
+        try:
+            writer.put(None)
+        except _WriteCancelled:
+            pass
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    try:
+        while (chunk := chunks.get()) is not None:
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        # Stop the thread if we were closed early, e.g. client disconnected
+        cancelled.set()
+        thread.join()
+
+
+class _WriteCancelled(Exception):
+    pass
+
+
+class _QueueWriter(io.RawIOBase):
+    # Not seekable, which zipfile handles by writing data descriptors after
+    # each file rather than going back to fill in headers.
+
+    def __init__(self, chunks: queue.Queue[bytes | None], cancelled: threading.Event):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+        self.stopped = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self.stopped:
+            # Writes after we've cancelled, such as zipfile's cleanup when it
+            # is garbage collected, are thrown away.
+            return len(b)
+        self.buffer += b
+        if len(self.buffer) >= STREAM_CHUNK_SIZE:
+            self.flush_buffer()
+        return len(b)
+
+    def flush_buffer(self):
+        if self.buffer:
+            self.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def put(self, item: bytes | None):
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                pass
+        self.stopped = True
+        raise _WriteCancelled()
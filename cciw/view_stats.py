@@ -0,0 +1,436 @@
+"""
+Sampled, low-overhead collection of per-view performance stats in production.
+
+`ViewStatsMiddleware` records a random sample of requests (see
+`settings.VIEW_STATS_SAMPLE_RATE`), using `cciw.db_debug.QueryRecorder`
+without stack traces. Results are accumulated in memory in each process, and
+flushed to the `ViewStats` table at most every `VIEW_STATS_FLUSH_INTERVAL`,
+so the cost of writing is spread over many requests.
+
+If database connection pooling is on (`settings.DB_CONNECTION_POOL`), the
+pool's own stats (connection requests, wait times, timeouts) are collected for
+each process at the same time and saved to `DatabasePoolStats`, along with the
+number of connections checked out and clients waiting, sampled on the same
+requests.
+
+The results are shown in the officer area (`view_stats` view), where the worst
+offenders for N+1 queries can be found.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from cciw.cciwmain.models import DatabasePoolStats, ViewStats
+from cciw.db_debug import QueryRecorder, group_query_info
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of histogram buckets. The final bucket is for everything above
+# the last bound.
+RESPONSE_TIME_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_COUNT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+
+@dataclass
+class RequestSample:
+    view_name: str
+    query_count: int
+    duplicate_query_count: int
+    worst_duplicate_sql: str
+    sql_time: float
+    render_time: float
+    response_time: float
+
+
+@dataclass
+class PendingStats:
+    request_count: int = 0
+    query_count_total: int = 0
+    query_count_max: int = 0
+    duplicate_query_count_total: int = 0
+    duplicate_query_count_max: int = 0
+    worst_duplicate_sql: str = ""
+    sql_time_total: float = 0
+    render_time_total: float = 0
+    response_time_total: float = 0
+    response_time_histogram: list[int] = field(default_factory=list)
+    query_count_histogram: list[int] = field(default_factory=list)
+
+    def add_sample(self, sample: RequestSample) -> None:
+        self.request_count += 1
+        self.query_count_total += sample.query_count
+        self.query_count_max = max(self.query_count_max, sample.query_count)
+        self.duplicate_query_count_total += sample.duplicate_query_count
+        if sample.duplicate_query_count > self.duplicate_query_count_max:
+            self.duplicate_query_count_max = sample.duplicate_query_count
+            self.worst_duplicate_sql = sample.worst_duplicate_sql
+        self.sql_time_total += sample.sql_time
+        self.render_time_total += sample.render_time
+        self.response_time_total += sample.response_time
+        self.response_time_histogram = add_to_histogram(
+            self.response_time_histogram, RESPONSE_TIME_BUCKETS_MS, sample.response_time * 1000
+        )
+        self.query_count_histogram = add_to_histogram(
+            self.query_count_histogram, QUERY_COUNT_BUCKETS, sample.query_count
+        )
+
+
+STATS_FIELDS = [f.name for f in dataclasses.fields(PendingStats)]
+
+
+def merge_stats(target: PendingStats | ViewStats, source: PendingStats | ViewStats) -> None:
+    """
+    Adds the stats in `source` to `target`
+    """
+    target.request_count += source.request_count
+    target.query_count_total += source.query_count_total
+    target.query_count_max = max(target.query_count_max, source.query_count_max)
+    target.duplicate_query_count_total += source.duplicate_query_count_total
+    if source.duplicate_query_count_max > target.duplicate_query_count_max:
+        target.duplicate_query_count_max = source.duplicate_query_count_max
+        target.worst_duplicate_sql = source.worst_duplicate_sql
+    target.sql_time_total += source.sql_time_total
+    target.render_time_total += source.render_time_total
+    target.response_time_total += source.response_time_total
+    target.response_time_histogram = merge_histograms(target.response_time_histogram, source.response_time_histogram)
+    target.query_count_histogram = merge_histograms(target.query_count_histogram, source.query_count_histogram)
+
+
+@dataclass
+class PendingPoolStats:
+    request_count: int = 0
+    queued_count: int = 0
+    wait_time_total_ms: int = 0
+    timeout_count: int = 0
+    connection_count: int = 0
+    connection_time_total_ms: int = 0
+    connection_error_count: int = 0
+    connection_lost_count: int = 0
+    max_checked_out: int = 0
+    max_waiting: int = 0
+
+    def add_gauges(self, pool_stats: dict[str, int]) -> None:
+        # From psycopg_pool's `get_stats()`, which only includes counters that
+        # are non-zero.
+        checked_out = pool_stats.get("pool_size", 0) - pool_stats.get("pool_available", 0)
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+        self.max_waiting = max(self.max_waiting, pool_stats.get("requests_waiting", 0))
+
+    def add_counters(self, pool_stats: dict[str, int]) -> None:
+        self.add_gauges(pool_stats)
+        self.request_count += pool_stats.get("requests_num", 0)
+        self.queued_count += pool_stats.get("requests_queued", 0)
+        self.wait_time_total_ms += pool_stats.get("requests_wait_ms", 0)
+        self.timeout_count += pool_stats.get("requests_errors", 0)
+        self.connection_count += pool_stats.get("connections_num", 0)
+        self.connection_time_total_ms += pool_stats.get("connections_ms", 0)
+        self.connection_error_count += pool_stats.get("connections_errors", 0)
+        self.connection_lost_count += pool_stats.get("connections_lost", 0)
+
+
+POOL_STATS_FIELDS = [f.name for f in dataclasses.fields(PendingPoolStats)]
+POOL_STATS_MAX_FIELDS = ["max_checked_out", "max_waiting"]
+
+
+def merge_pool_stats(
+    target: PendingPoolStats | DatabasePoolStats, source: PendingPoolStats | DatabasePoolStats
+) -> None:
+    """
+    Adds the pool stats in `source` to `target`
+    """
+    for name in POOL_STATS_FIELDS:
+        if name in POOL_STATS_MAX_FIELDS:
+            setattr(target, name, max(getattr(target, name), getattr(source, name)))
+        else:
+            setattr(target, name, getattr(target, name) + getattr(source, name))
+
+
+def get_connection_pool():
+    """
+    Returns the psycopg_pool.ConnectionPool for this process, or None if
+    pooling is not enabled.
+    """
+    return getattr(connection, "pool", None)
+
+
+class ViewStatsCollector:
+    """
+    In-process accumulator of RequestSample objects and connection pool stats,
+    flushed periodically to the DB.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, date], PendingStats] = {}
+        self._pending_pool_stats = PendingPoolStats()
+        self._last_flush = time.monotonic()
+
+    def record(self, sample: RequestSample) -> None:
+        key = (sample.view_name, timezone.localdate())
+        pool = get_connection_pool()
+        pool_stats = pool.get_stats() if pool is not None else None
+        with self._lock:
+            self._pending.setdefault(key, PendingStats()).add_sample(sample)
+            if pool_stats is not None:
+                self._pending_pool_stats.add_gauges(pool_stats)
+
+    def flush_if_due(self) -> None:
+        if time.monotonic() - self._last_flush >= settings.VIEW_STATS_FLUSH_INTERVAL.total_seconds():
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            pending_pool_stats, self._pending_pool_stats = self._pending_pool_stats, PendingPoolStats()
+            self._last_flush = time.monotonic()
+        pool = get_connection_pool()
+        if pool is not None:
+            # `pop_stats` resets the pool's counters, so we add only what
+            # happened since the last flush.
+            pending_pool_stats.add_counters(pool.pop_stats())
+        if not pending and not pending_pool_stats.request_count:
+            return
+        try:
+            if pending:
+                save_pending_stats(pending)
+            if pending_pool_stats.request_count:
+                save_pending_pool_stats(pending_pool_stats, timezone.localdate())
+        except Exception:
+            # Stats are not important enough to break a request for.
+            logger.exception("Could not save view stats")
+
+
+def save_pending_stats(pending: dict[tuple[str, date], PendingStats]) -> None:
+    with transaction.atomic():
+        # Create missing rows first, so that we can lock them all. Another
+        # process may be doing the same.
+        ViewStats.objects.bulk_create(
+            [ViewStats(view_name=view_name, recorded_on=day) for view_name, day in pending],
+            ignore_conflicts=True,
+        )
+        key_filter = Q()
+        for view_name, day in pending:
+            key_filter |= Q(view_name=view_name, recorded_on=day)
+        rows = list(ViewStats.objects.filter(key_filter).select_for_update())
+        for row in rows:
+            merge_stats(row, pending[row.view_name, row.recorded_on])
+        ViewStats.objects.bulk_update(rows, STATS_FIELDS)
+
+
+def save_pending_pool_stats(pending: PendingPoolStats, day: date) -> None:
+    with transaction.atomic():
+        DatabasePoolStats.objects.bulk_create([DatabasePoolStats(recorded_on=day)], ignore_conflicts=True)
+        row = DatabasePoolStats.objects.select_for_update().get(recorded_on=day)
+        merge_pool_stats(row, pending)
+        row.save(update_fields=POOL_STATS_FIELDS)
+
+
+collector = ViewStatsCollector()
+
+
+class ViewStatsMiddleware:
+    # This is a class, not a function like our other middleware, because
+    # `process_template_response` is needed to time rendering separately.
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if random.random() >= settings.VIEW_STATS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(stacktraces=False)
+        request._view_stats_render_time = 0.0
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        response_time = time.perf_counter() - start
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None and resolver_match.view_name:
+            collector.record(make_sample(resolver_match.view_name, recorder, request, response_time))
+            collector.flush_if_due()
+        return response
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        # Called just before a TemplateResponse is rendered
+        if hasattr(request, "_view_stats_render_time"):
+            render_start = time.perf_counter()
+
+            def callback(response):
+                request._view_stats_render_time += time.perf_counter() - render_start
+
+            response.add_post_render_callback(callback)
+        return response
+
+
+def make_sample(view_name: str, recorder: QueryRecorder, request: HttpRequest, response_time: float) -> RequestSample:
+    queries = recorder.queries
+    groups = group_query_info(queries)
+    worst_group = max(groups, key=len, default=[])
+    return RequestSample(
+        view_name=view_name,
+        query_count=len(queries),
+        duplicate_query_count=len(queries) - len(groups),
+        worst_duplicate_sql=worst_group[0].sql if len(worst_group) > 1 else "",
+        sql_time=sum(q.duration for q in queries if q.duration),
+        render_time=request._view_stats_render_time,
+        response_time=response_time,
+    )
+
+
+# Histograms
+
+
+def add_to_histogram(histogram: list[int], bounds: list[float], value: float) -> list[int]:
+    histogram = merge_histograms(histogram, [0] * (len(bounds) + 1))
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            histogram[i] += 1
+            return histogram
+    histogram[-1] += 1
+    return histogram
+
+
+def merge_histograms(histogram_1: list[int], histogram_2: list[int]) -> list[int]:
+    length = max(len(histogram_1), len(histogram_2))
+    histogram_1 = histogram_1 + [0] * (length - len(histogram_1))
+    histogram_2 = histogram_2 + [0] * (length - len(histogram_2))
+    return [a + b for a, b in zip(histogram_1, histogram_2)]
+
+
+def histogram_percentile(histogram: list[int], bounds: list[float], percentile: float) -> float | None:
+    """
+    Returns the upper bound of the bucket containing the given percentile
+    (0-100), or infinity if it is in the last bucket.
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+    threshold = total * percentile / 100
+    running = 0
+    for i, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            break
+    return bounds[i] if i < len(bounds) else float("inf")
+
+
+def format_percentile(histogram: list[int], bounds: list[float], percentile: float) -> str:
+    value = histogram_percentile(histogram, bounds, percentile)
+    if value is None:
+        return ""
+    if value == float("inf"):
+        return f"> {bounds[-1]}"
+    return f"≤ {value}"
+
+
+# Reporting
+
+
+@dataclass
+class ViewStatsSummary:
+    view_name: str
+    request_count: int
+    average_queries: float
+    max_queries: int
+    average_duplicate_queries: float
+    max_duplicate_queries: int
+    worst_duplicate_sql: str
+    average_sql_time_ms: float
+    average_render_time_ms: float
+    average_response_time_ms: float
+    p95_response_time_ms: str
+    p95_queries: str
+
+
+def get_view_stats_summaries(*, days: int, limit: int) -> list[ViewStatsSummary]:
+    """
+    Returns summaries for each view over the last `days` days, worst N+1
+    offenders (by average duplicate queries) first.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    totals: dict[str, ViewStats] = {}
+    for row in ViewStats.objects.filter(recorded_on__gte=since):
+        merge_stats(totals.setdefault(row.view_name, ViewStats(view_name=row.view_name)), row)
+
+    summaries = []
+    for combined in totals.values():
+        count = combined.request_count
+        if count == 0:
+            continue
+        summaries.append(
+            ViewStatsSummary(
+                view_name=combined.view_name,
+                request_count=count,
+                average_queries=combined.query_count_total / count,
+                max_queries=combined.query_count_max,
+                average_duplicate_queries=combined.duplicate_query_count_total / count,
+                max_duplicate_queries=combined.duplicate_query_count_max,
+                worst_duplicate_sql=combined.worst_duplicate_sql,
+                average_sql_time_ms=combined.sql_time_total / count * 1000,
+                average_render_time_ms=combined.render_time_total / count * 1000,
+                average_response_time_ms=combined.response_time_total / count * 1000,
+                p95_response_time_ms=format_percentile(combined.response_time_histogram, RESPONSE_TIME_BUCKETS_MS, 95),
+                p95_queries=format_percentile(combined.query_count_histogram, QUERY_COUNT_BUCKETS, 95),
+            )
+        )
+    summaries.sort(key=lambda s: (s.average_duplicate_queries, s.average_queries), reverse=True)
+    return summaries[:limit]
+
+
+@dataclass
+class PoolStatsSummary:
+    date: date
+    request_count: int
+    queued_percent: float
+    average_wait_time_ms: float
+    timeout_count: int
+    connection_count: int
+    average_connection_time_ms: float
+    connection_error_count: int
+    connection_lost_count: int
+    max_checked_out: int
+    max_waiting: int
+
+
+def get_pool_stats_summaries(*, days: int) -> list[PoolStatsSummary]:
+    """
+    Returns database connection pool summaries for each of the last `days`
+    days that have stats, most recent first.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return [
+        PoolStatsSummary(
+            date=row.recorded_on,
+            request_count=row.request_count,
+            queued_percent=row.queued_count / row.request_count * 100,
+            average_wait_time_ms=row.wait_time_total_ms / row.queued_count if row.queued_count else 0,
+            timeout_count=row.timeout_count,
+            connection_count=row.connection_count,
+            average_connection_time_ms=(
+                row.connection_time_total_ms / row.connection_count if row.connection_count else 0
+            ),
+            connection_error_count=row.connection_error_count,
+            connection_lost_count=row.connection_lost_count,
+            max_checked_out=row.max_checked_out,
+            max_waiting=row.max_waiting,
+        )
+        for row in DatabasePoolStats.objects.filter(recorded_on__gte=since, request_count__gt=0).order_by(
+            "-recorded_on"
+        )
+    ]
@@ -25,6 +25,12 @@
 
 application = get_wsgi_application()
 
+# Do the work that would otherwise slow down the first requests, before the
+# server starts sending us any.
+from cciw.cciwmain.warmup import warm_up_web_worker  # noqa  isort:skip
+
+warm_up_web_worker()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
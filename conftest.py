@@ -1,5 +1,8 @@
+from pathlib import Path
+
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 
 BROWSER = "Firefox"
 SHOW_BROWSER = False
@@ -10,12 +13,34 @@ def pytest_addoption(parser):
         "--browser", type=str, default="Firefox", help="Selenium driver_name to use", choices=["Firefox", "Chrome"]
     )
     parser.addoption("--show-browser", action="store_true", default=False, help="Show web browser window")
+    parser.addoption(
+        "--benchmarks", action="store_true", default=False, help="Run benchmarks, which are skipped otherwise"
+    )
+    parser.addoption("--benchmark-json", type=str, default="", help="Save benchmark results to this JSON file")
 
 
 def pytest_configure(config):
     global SHOW_BROWSER, BROWSER
     BROWSER = config.option.browser
     SHOW_BROWSER = config.option.show_browser
+    if config.option.benchmarks and getattr(config.option, "numprocesses", None):
+        raise pytest.UsageError("Benchmarks must be run in a single process, use -n0")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.option.benchmarks:
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if session.config.option.benchmark_json:
+        from cciw.test_utils.benchmarks import collected_results, save_results
+
+        save_results(collected_results, Path(session.config.option.benchmark_json))
 
 
 @pytest.fixture(autouse=True)
@@ -25,6 +50,9 @@ def cciw_all():
     cciw.cciwmain.common._thisyear = None
     cciw.cciwmain.common._thisyear_timestamp = None
 
+    # Some things are cached e.g. `cciw.bookings.admission`
+    cache.clear()
+
     # To get our custom email backend to be used, we have to patch settings
     # at this point, due to how Django's test runner also sets this value:
     settings.EMAIL_BACKEND = "cciw.mail.tests.TestMailBackend"
@@ -35,3 +63,45 @@ def cciw_require_auth_roles():
     from cciw.accounts.models import setup_auth_roles
 
     setup_auth_roles()
+
+
+@pytest.fixture
+def local_s3():
+    """
+    Provides a LocalS3Stub for incoming mail, with mail handling tasks run immediately.
+    """
+    from unittest import mock
+
+    from django.test import override_settings
+
+    from cciw.test_utils.base import run_async_tasks_immediately
+    from cciw.test_utils.s3 import LocalS3Stub
+
+    stub = LocalS3Stub()
+    with (
+        override_settings(AWS_INCOMING_MAIL={"BUCKET_NAME": "incoming-mail"}),
+        mock.patch("cciw.mail.ses.get_incoming_mail_s3_client", return_value=stub.client),
+        # Both handle_mail_from_s3_async and handle_mail_from_s3 use this
+        run_async_tasks_immediately("cciw.mail.lists.async_task"),
+    ):
+        yield stub
+
+
+@pytest.fixture
+def mailchimp_stub():
+    """
+    Provides a local MailchimpStub server, with settings pointing to it.
+    """
+    from django.test import override_settings
+
+    from cciw.test_utils.mailchimp import MailchimpStub
+
+    stub = MailchimpStub()
+    stub.start()
+    try:
+        with override_settings(
+            MAILCHIMP_URL_BASE=stub.url_base, MAILCHIMP_API_KEY="test-key", MAILCHIMP_NEWSLETTER_LIST_ID="test-list"
+        ):
+            yield stub
+    finally:
+        stub.stop()
@@ -91,7 +91,7 @@
     "build-essential",
     "python3-dev",
     "python3.12-dev",
-    "libpq-dev",  # For psycopg2
+    "libpq-dev",  # For psycopg
     "libxml2-dev",  # For lxml
     "libxslt-dev",  # For lxml
     "libffi-dev",  # For cffi
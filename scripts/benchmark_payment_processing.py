@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Benchmark for payment processing under bursts of concurrent PayPal IPNs.
+
+This runs against your local development database. It creates its own booking
+accounts (with `@paymentbenchmark.example.com` email addresses), sends a burst
+of IPNs to them from several threads at once, checks the resulting
+`total_received` values, and then deletes everything it created.
+
+Usage:
+
+    ./scripts/benchmark_payment_processing.py --accounts 50 --ipns-per-account 4 --threads 16
+
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import django
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from cciw.bookings.factories import create_booking_account, create_ipn  # noqa: E402
+from cciw.bookings.models import BookingAccount, Payment, PaymentSource, PayPalIPN  # noqa: E402
+
+EMAIL_DOMAIN = "paymentbenchmark.example.com"
+
+
+def send_ipn(account_id: int, txn_id: str, amount: Decimal) -> float:
+    try:
+        start = time.perf_counter()
+        with transaction.atomic():
+            account = BookingAccount.objects.get(id=account_id)
+            create_ipn(account=account, amount=amount, txn_id=txn_id)
+        return time.perf_counter() - start
+    finally:
+        connection.close()
+
+
+def main(*, accounts: int, ipns_per_account: int, threads: int) -> None:
+    # Don't fill up the real mail queue:
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+    cleanup()
+    account_ids = [
+        create_booking_account(name=f"Benchmark {i}", email=f"account{i}@{EMAIL_DOMAIN}").id for i in range(accounts)
+    ]
+    amount = Decimal("10.00")
+    # Interleave accounts, as IPNs would arrive in a real burst:
+    jobs = [
+        (account_id, f"BENCH-{account_id}-{n}", amount) for n in range(ipns_per_account) for account_id in account_ids
+    ]
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(lambda job: send_ipn(*job), jobs))
+        elapsed = time.perf_counter() - start
+
+        expected = amount * ipns_per_account
+        wrong = BookingAccount.objects.filter(id__in=account_ids).exclude(total_received=expected).count()
+        unprocessed = Payment.objects.filter(account_id__in=account_ids, processed_at__isnull=True).count()
+
+        latencies.sort()
+        print(f"IPNs:           {len(jobs)} ({accounts} accounts, {threads} threads)")
+        print(f"Total time:     {elapsed:.2f}s")
+        print(f"Throughput:     {len(jobs) / elapsed:.1f} IPN/s")
+        print(f"Latency p50:    {statistics.median(latencies) * 1000:.1f}ms")
+        print(f"Latency p95:    {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+        print(f"Wrong balances: {wrong}")
+        print(f"Unprocessed:    {unprocessed}")
+    finally:
+        cleanup()
+
+
+def cleanup() -> None:
+    accounts = BookingAccount.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+    PaymentSource.objects.filter(ipn_payment__custom__in=[f"account:{a.id};" for a in accounts]).delete()
+    Payment.objects.filter(account__in=accounts).delete()
+    PayPalIPN.objects.filter(txn_id__startswith="BENCH-").delete()
+    accounts.delete()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--ipns-per-account", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    main(accounts=args.accounts, ipns_per_account=args.ipns_per_account, threads=args.threads)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Compare micro-benchmark results saved with `pytest --benchmarks --benchmark-json=...`
+
+Exits with a non-zero status if any benchmark is slower than the baseline by
+more than the threshold, or does more queries. See docs/development.rst
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cciw.test_utils.benchmarks import compare_results, format_comparisons, load_results  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Fractional slowdown counted as a regression, default 0.2"
+    )
+    args = parser.parse_args()
+
+    comparisons = compare_results(load_results(args.baseline), load_results(args.current), threshold=args.threshold)
+    print(format_comparisons(comparisons))
+    regressions = [c for c in comparisons if c.is_regression]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) found")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Run load test scenarios against a local server, and compare saved results.
+
+See docs/development.rst "Load testing"
+
+  uv run --with locust scripts/load_test.py run booking-open --users 200
+  uv run scripts/load_test.py compare load_test_results/before.json load_test_results/after.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cciw.utils.loadtests.report import ScenarioResult, format_comparison  # noqa: E402
+
+LOCUSTFILE = "cciw/utils/loadtests/locustfile.py"
+
+RESULTS_DIR = Path("load_test_results")
+
+# Scenario name -> locust user classes
+SCENARIOS = {
+    "booking-open": ["BookingOpenUser"],
+    "allocation-day": ["BookingSecretaryUser", "AllocationDayBookerUser"],
+    "officer-area": ["OfficerUser", "LeaderUser"],
+}
+
+
+def run(args: argparse.Namespace) -> int:
+    results_json = args.results_json or RESULTS_DIR / f"{args.scenario}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    command = [
+        sys.executable,
+        "-m",
+        "locust",
+        "--locustfile",
+        LOCUSTFILE,
+        "--headless",
+        "--only-summary",
+        "--host",
+        args.host,
+        "--users",
+        str(args.users),
+        "--spawn-rate",
+        str(args.spawn_rate),
+        "--run-time",
+        args.run_time,
+        "--scenario",
+        args.scenario,
+        "--results-json",
+        str(results_json),
+        *SCENARIOS[args.scenario],
+    ]
+    returncode = subprocess.run(command).returncode
+    print(f"Results saved to {results_json}")
+    return returncode
+
+
+def compare(args: argparse.Namespace) -> int:
+    print(format_comparison(ScenarioResult.load(args.before), ScenarioResult.load(args.after)))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run a scenario with locust")
+    run_parser.add_argument("scenario", choices=list(SCENARIOS))
+    run_parser.add_argument("--host", default="http://localhost:8000")
+    run_parser.add_argument("--users", type=int, default=100)
+    run_parser.add_argument("--spawn-rate", type=float, default=10)
+    run_parser.add_argument("--run-time", default="5m")
+    run_parser.add_argument("--results-json", type=Path, default=None)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the results of two runs of a scenario")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())